@@ -6,6 +6,7 @@ from sqlalchemy import engine_from_config, pool
 from alembic import context
 from app.core.database.init import Base
 from app.features.bookings import model as bookings_module  # noqa: F401
+from app.features.capacity import model as capacity_module  # noqa: F401
 from app.features.routes import model as routes_module  # noqa: F401
 from app.features.shipments import model as shipments_module  # noqa: F401
 
@@ -0,0 +1,147 @@
+"""partition shipment audit by month
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "a7b8c9d0e1f2"
+down_revision: Union[str, Sequence[str], None] = "f6a7b8c9d0e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+CREATE_PARTITIONS_FUNCTION = """
+    CREATE OR REPLACE FUNCTION create_shipment_audit_partitions(
+        first_month date, last_month date
+    )
+    RETURNS integer AS $$
+    DECLARE
+        m date := date_trunc('month', first_month)::date;
+        part text;
+        created integer := 0;
+    BEGIN
+        WHILE m <= last_month LOOP
+            part := format('shipment_audit_p%s', to_char(m, 'YYYYMM'));
+            IF to_regclass(part) IS NULL THEN
+                BEGIN
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF shipment_audit '
+                        'FOR VALUES FROM (%L) TO (%L)',
+                        part, m, (m + interval '1 month')::date
+                    );
+                    created := created + 1;
+                EXCEPTION WHEN duplicate_table THEN
+                    -- Another worker created it first.
+                    NULL;
+                END;
+            END IF;
+            m := (m + interval '1 month')::date;
+        END LOOP;
+        RETURN created;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE shipment_audit RENAME TO shipment_audit_old")
+    op.execute("ALTER INDEX shipment_audit_pkey RENAME TO shipment_audit_old_pkey")
+    op.execute(
+        "ALTER INDEX ix_shipment_audit_shipment_id "
+        "RENAME TO ix_shipment_audit_old_shipment_id"
+    )
+    op.execute("ALTER SEQUENCE shipment_audit_id_seq OWNED BY NONE")
+
+    # The partition key has to be part of the primary key.
+    op.execute(
+        """
+        CREATE TABLE shipment_audit (
+            id integer NOT NULL DEFAULT nextval('shipment_audit_id_seq'),
+            shipment_id integer NOT NULL,
+            old_status varchar,
+            new_status varchar NOT NULL,
+            changed_at timestamp without time zone NOT NULL DEFAULT now(),
+            CONSTRAINT shipment_audit_pkey PRIMARY KEY (id, changed_at)
+        ) PARTITION BY RANGE (changed_at)
+        """
+    )
+    op.execute("ALTER SEQUENCE shipment_audit_id_seq OWNED BY shipment_audit.id")
+    op.execute(
+        "CREATE INDEX ix_shipment_audit_shipment_id ON shipment_audit (shipment_id)"
+    )
+    # Rows arrive in changed_at order, so a BRIN index stays tiny and still
+    # prunes well for time-range scans and exports.
+    op.execute(
+        "CREATE INDEX ix_shipment_audit_changed_at ON shipment_audit "
+        "USING brin (changed_at)"
+    )
+    # Catches rows outside every monthly partition so audit inserts never fail.
+    op.execute(
+        "CREATE TABLE shipment_audit_default PARTITION OF shipment_audit DEFAULT"
+    )
+
+    op.execute(CREATE_PARTITIONS_FUNCTION)
+    op.execute(
+        f"""
+        SELECT create_shipment_audit_partitions(
+            coalesce((SELECT min(changed_at) FROM shipment_audit_old), now())::date,
+            (now() + interval '{MONTHS_AHEAD} months')::date
+        )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO shipment_audit (
+            id, shipment_id, old_status, new_status, changed_at
+        )
+        SELECT id, shipment_id, old_status, new_status, changed_at
+        FROM shipment_audit_old
+        """
+    )
+    op.execute("DROP TABLE shipment_audit_old")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE shipment_audit RENAME TO shipment_audit_partitioned")
+    op.execute(
+        "ALTER INDEX shipment_audit_pkey RENAME TO shipment_audit_partitioned_pkey"
+    )
+    op.execute(
+        "ALTER INDEX ix_shipment_audit_shipment_id "
+        "RENAME TO ix_shipment_audit_partitioned_shipment_id"
+    )
+    op.execute("ALTER SEQUENCE shipment_audit_id_seq OWNED BY NONE")
+    op.execute(
+        """
+        CREATE TABLE shipment_audit (
+            id integer NOT NULL DEFAULT nextval('shipment_audit_id_seq'),
+            shipment_id integer NOT NULL,
+            old_status varchar,
+            new_status varchar NOT NULL,
+            changed_at timestamp without time zone NOT NULL DEFAULT now(),
+            CONSTRAINT shipment_audit_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute("ALTER SEQUENCE shipment_audit_id_seq OWNED BY shipment_audit.id")
+    op.execute(
+        "CREATE INDEX ix_shipment_audit_shipment_id ON shipment_audit (shipment_id)"
+    )
+    op.execute(
+        """
+        INSERT INTO shipment_audit (
+            id, shipment_id, old_status, new_status, changed_at
+        )
+        SELECT id, shipment_id, old_status, new_status, changed_at
+        FROM shipment_audit_partitioned
+        """
+    )
+    op.execute("DROP TABLE shipment_audit_partitioned CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS create_shipment_audit_partitions(date, date)")
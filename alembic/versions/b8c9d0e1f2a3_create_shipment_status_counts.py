@@ -0,0 +1,269 @@
+"""create shipment status counts
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "b8c9d0e1f2a3"
+down_revision: Union[str, Sequence[str], None] = "a7b8c9d0e1f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+APPLY_FUNCTION = """
+    CREATE OR REPLACE FUNCTION apply_shipment_status_deltas(
+        vessel_ids integer[], ports text[], statuses text[], deltas bigint[]
+    )
+    RETURNS void AS $$
+    BEGIN
+        -- Sorted so concurrent writers lock counter rows in the same order.
+        -- Negative deltas go through the upsert too, which is why the table
+        -- has no CHECK (shipment_count >= 0): it is evaluated on the proposed
+        -- row before ON CONFLICT is resolved.
+        INSERT INTO shipment_status_counts AS c (
+            vessel_id, port_name, status, shipment_count
+        )
+        SELECT d.vessel_id, d.port_name, d.status, d.delta
+        FROM unnest(vessel_ids, ports, statuses, deltas)
+            AS d(vessel_id, port_name, status, delta)
+        WHERE d.delta <> 0
+        ORDER BY 1, 2, 3
+        ON CONFLICT (vessel_id, port_name, status) DO UPDATE
+        SET shipment_count = c.shipment_count + EXCLUDED.shipment_count;
+
+        DELETE FROM shipment_status_counts c
+        USING unnest(vessel_ids, ports, statuses) AS d(vessel_id, port_name, status)
+        WHERE c.vessel_id = d.vessel_id
+          AND c.port_name = d.port_name
+          AND c.status = d.status
+          AND c.shipment_count = 0;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+# Deltas are grouped per (vessel, port, status) before being applied, so a
+# statement touching N shipments costs one upsert per affected group.
+SHIPMENTS_FUNCTION = """
+    CREATE OR REPLACE FUNCTION maintain_shipment_status_counts()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        v integer[];
+        p text[];
+        s text[];
+        d bigint[];
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            SELECT array_agg(vessel_id), array_agg(port_name),
+                   array_agg(status), array_agg(delta)
+            INTO v, p, s, d
+            FROM (
+                SELECT b.vessel_id, b.port_name, n.status::text AS status,
+                       count(*) AS delta
+                FROM new_rows n JOIN bookings b ON b.id = n.booking_id
+                GROUP BY 1, 2, 3
+            ) g;
+        ELSIF TG_OP = 'UPDATE' THEN
+            SELECT array_agg(vessel_id), array_agg(port_name),
+                   array_agg(status), array_agg(delta)
+            INTO v, p, s, d
+            FROM (
+                SELECT b.vessel_id, b.port_name, c.status, sum(c.delta) AS delta
+                FROM (
+                    SELECT o.booking_id, o.status::text AS status, -1 AS delta
+                    FROM old_rows o JOIN new_rows n ON n.id = o.id
+                    WHERE o.status IS DISTINCT FROM n.status
+                       OR o.booking_id IS DISTINCT FROM n.booking_id
+                    UNION ALL
+                    SELECT n.booking_id, n.status::text, 1
+                    FROM old_rows o JOIN new_rows n ON n.id = o.id
+                    WHERE o.status IS DISTINCT FROM n.status
+                       OR o.booking_id IS DISTINCT FROM n.booking_id
+                ) c
+                JOIN bookings b ON b.id = c.booking_id
+                GROUP BY 1, 2, 3
+            ) g;
+        ELSE
+            -- Shipments removed by a booking delete cascade no longer have a
+            -- booking row; bookings_release_shipment_status_counts already
+            -- counted those out.
+            SELECT array_agg(vessel_id), array_agg(port_name),
+                   array_agg(status), array_agg(delta)
+            INTO v, p, s, d
+            FROM (
+                SELECT b.vessel_id, b.port_name, o.status::text AS status,
+                       -count(*) AS delta
+                FROM old_rows o JOIN bookings b ON b.id = o.booking_id
+                GROUP BY 1, 2, 3
+            ) g;
+        END IF;
+        IF v IS NOT NULL THEN
+            PERFORM apply_shipment_status_deltas(v, p, s, d);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+BOOKING_DELETE_FUNCTION = """
+    CREATE OR REPLACE FUNCTION bookings_release_shipment_status_counts()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        s text[];
+        d bigint[];
+    BEGIN
+        SELECT array_agg(status), array_agg(delta)
+        INTO s, d
+        FROM (
+            SELECT status::text AS status, -count(*) AS delta
+            FROM shipments WHERE booking_id = OLD.id
+            GROUP BY 1
+        ) g;
+        IF s IS NOT NULL THEN
+            PERFORM apply_shipment_status_deltas(
+                array_fill(OLD.vessel_id, ARRAY[cardinality(s)]),
+                array_fill(OLD.port_name::text, ARRAY[cardinality(s)]),
+                s,
+                d
+            );
+        END IF;
+        RETURN OLD;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+BOOKING_UPDATE_FUNCTION = """
+    CREATE OR REPLACE FUNCTION bookings_move_shipment_status_counts()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        v integer[];
+        p text[];
+        s text[];
+        d bigint[];
+    BEGIN
+        SELECT array_agg(vessel_id), array_agg(port_name),
+               array_agg(status), array_agg(delta)
+        INTO v, p, s, d
+        FROM (
+            SELECT c.vessel_id, c.port_name, sh.status::text AS status,
+                   sum(c.delta) AS delta
+            FROM (
+                SELECT o.id, o.vessel_id, o.port_name::text AS port_name,
+                       -1 AS delta
+                FROM old_rows o JOIN new_rows n ON n.id = o.id
+                WHERE (o.vessel_id, o.port_name)
+                      IS DISTINCT FROM (n.vessel_id, n.port_name)
+                UNION ALL
+                SELECT n.id, n.vessel_id, n.port_name::text, 1
+                FROM old_rows o JOIN new_rows n ON n.id = o.id
+                WHERE (o.vessel_id, o.port_name)
+                      IS DISTINCT FROM (n.vessel_id, n.port_name)
+            ) c
+            JOIN shipments sh ON sh.booking_id = c.id
+            GROUP BY 1, 2, 3
+        ) g;
+        IF v IS NOT NULL THEN
+            PERFORM apply_shipment_status_deltas(v, p, s, d);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+TRIGGERS = [
+    """
+    CREATE TRIGGER trigger_shipment_status_counts_insert
+    AFTER INSERT ON shipments
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION maintain_shipment_status_counts()
+    """,
+    """
+    CREATE TRIGGER trigger_shipment_status_counts_update
+    AFTER UPDATE ON shipments
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION maintain_shipment_status_counts()
+    """,
+    """
+    CREATE TRIGGER trigger_shipment_status_counts_delete
+    AFTER DELETE ON shipments
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION maintain_shipment_status_counts()
+    """,
+    # Row-level and BEFORE: the FK cascade removes the booking's shipments
+    # before any statement-level trigger could still see them.
+    """
+    CREATE TRIGGER trigger_booking_shipment_status_counts_delete
+    BEFORE DELETE ON bookings
+    FOR EACH ROW
+    EXECUTE FUNCTION bookings_release_shipment_status_counts()
+    """,
+    """
+    CREATE TRIGGER trigger_booking_shipment_status_counts_update
+    AFTER UPDATE ON bookings
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bookings_move_shipment_status_counts()
+    """,
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "shipment_status_counts",
+        sa.Column("vessel_id", sa.Integer(), nullable=False),
+        sa.Column("port_name", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("shipment_count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("vessel_id", "port_name", "status"),
+    )
+    op.execute(APPLY_FUNCTION)
+    op.execute(SHIPMENTS_FUNCTION)
+    op.execute(BOOKING_DELETE_FUNCTION)
+    op.execute(BOOKING_UPDATE_FUNCTION)
+    # Lock out writers so the backfill and the triggers agree.
+    op.execute("LOCK TABLE bookings, shipments IN SHARE ROW EXCLUSIVE MODE")
+    for trigger in TRIGGERS:
+        op.execute(trigger)
+    op.execute(
+        """
+        INSERT INTO shipment_status_counts (
+            vessel_id, port_name, status, shipment_count
+        )
+        SELECT b.vessel_id, b.port_name, s.status::text, count(*)
+        FROM shipments s JOIN bookings b ON b.id = s.booking_id
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "DROP TRIGGER IF EXISTS trigger_booking_shipment_status_counts_update "
+        "ON bookings"
+    )
+    op.execute(
+        "DROP TRIGGER IF EXISTS trigger_booking_shipment_status_counts_delete "
+        "ON bookings"
+    )
+    for event in ("delete", "update", "insert"):
+        op.execute(
+            f"DROP TRIGGER IF EXISTS trigger_shipment_status_counts_{event} "
+            "ON shipments"
+        )
+    op.execute("DROP FUNCTION IF EXISTS bookings_move_shipment_status_counts()")
+    op.execute("DROP FUNCTION IF EXISTS bookings_release_shipment_status_counts()")
+    op.execute("DROP FUNCTION IF EXISTS maintain_shipment_status_counts()")
+    op.execute(
+        "DROP FUNCTION IF EXISTS "
+        "apply_shipment_status_deltas(integer[], text[], text[], bigint[])"
+    )
+    op.drop_table("shipment_status_counts")
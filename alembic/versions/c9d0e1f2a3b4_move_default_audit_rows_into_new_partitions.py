@@ -0,0 +1,118 @@
+"""move default audit rows into new partitions
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "c9d0e1f2a3b4"
+down_revision: Union[str, Sequence[str], None] = "b8c9d0e1f2a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# CREATE TABLE ... PARTITION OF fails with check_violation as soon as the
+# default partition holds a row for that month, which used to abort the whole
+# call and leave every later month unpartitioned. Each month is now built as a
+# plain table, filled with its rows from the default partition and attached, in
+# one subtransaction. The default partition is locked first (attaching needs
+# that lock anyway) so no audit row for the month can land there in between.
+CREATE_PARTITIONS_FUNCTION = """
+    CREATE OR REPLACE FUNCTION create_shipment_audit_partitions(
+        first_month date, last_month date
+    )
+    RETURNS integer AS $$
+    DECLARE
+        m date := date_trunc('month', first_month)::date;
+        next_m date;
+        part text;
+        moved bigint;
+        created integer := 0;
+    BEGIN
+        WHILE m <= last_month LOOP
+            part := format('shipment_audit_p%s', to_char(m, 'YYYYMM'));
+            next_m := (m + interval '1 month')::date;
+            IF to_regclass(part) IS NULL THEN
+                BEGIN
+                    LOCK TABLE shipment_audit_default IN ACCESS EXCLUSIVE MODE;
+                    -- Another worker may have created it while we waited.
+                    IF to_regclass(part) IS NULL THEN
+                        EXECUTE format(
+                            'CREATE TABLE %I (LIKE shipment_audit)', part
+                        );
+                        EXECUTE format(
+                            'WITH moved AS ('
+                            '    DELETE FROM shipment_audit_default'
+                            '    WHERE changed_at >= %L AND changed_at < %L'
+                            '    RETURNING *'
+                            ') INSERT INTO %I SELECT * FROM moved',
+                            m, next_m, part
+                        );
+                        GET DIAGNOSTICS moved = ROW_COUNT;
+                        EXECUTE format(
+                            'ALTER TABLE shipment_audit ATTACH PARTITION %I '
+                            'FOR VALUES FROM (%L) TO (%L)',
+                            part, m, next_m
+                        );
+                        IF moved > 0 THEN
+                            RAISE NOTICE 'moved % rows from '
+                                'shipment_audit_default into %', moved, part;
+                        END IF;
+                        created := created + 1;
+                    END IF;
+                EXCEPTION WHEN OTHERS THEN
+                    -- Keep going so one bad month does not hold back the rest.
+                    RAISE WARNING 'could not create %: % (%)',
+                        part, SQLERRM, SQLSTATE;
+                END;
+            END IF;
+            m := next_m;
+        END LOOP;
+        RETURN created;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_PARTITIONS_FUNCTION = """
+    CREATE OR REPLACE FUNCTION create_shipment_audit_partitions(
+        first_month date, last_month date
+    )
+    RETURNS integer AS $$
+    DECLARE
+        m date := date_trunc('month', first_month)::date;
+        part text;
+        created integer := 0;
+    BEGIN
+        WHILE m <= last_month LOOP
+            part := format('shipment_audit_p%s', to_char(m, 'YYYYMM'));
+            IF to_regclass(part) IS NULL THEN
+                BEGIN
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF shipment_audit '
+                        'FOR VALUES FROM (%L) TO (%L)',
+                        part, m, (m + interval '1 month')::date
+                    );
+                    created := created + 1;
+                EXCEPTION WHEN duplicate_table THEN
+                    -- Another worker created it first.
+                    NULL;
+                END;
+            END IF;
+            m := (m + interval '1 month')::date;
+        END LOOP;
+        RETURN created;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.execute(CREATE_PARTITIONS_FUNCTION)
+
+
+def downgrade() -> None:
+    op.execute(PREVIOUS_PARTITIONS_FUNCTION)
@@ -0,0 +1,44 @@
+"""drop vessel current reserved capacity
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "d0e1f2a3b4c5"
+down_revision: Union[str, Sequence[str], None] = "c9d0e1f2a3b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Booked capacity lives in vessel_capacity_buckets; this column stopped
+    # being maintained there and only held stale values. Its CHECK constraints
+    # go with it.
+    op.drop_column("vessels", "current_reserved_capacity")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "vessels",
+        sa.Column(
+            "current_reserved_capacity",
+            sa.Float(),
+            nullable=False,
+            server_default="0",
+        ),
+    )
+    op.alter_column("vessels", "current_reserved_capacity", server_default=None)
+    op.create_check_constraint(
+        "check_capacity_limit", "vessels", "current_reserved_capacity <= max_capacity"
+    )
+    op.create_check_constraint(
+        "check_positive_capacity", "vessels", "current_reserved_capacity >= 0"
+    )
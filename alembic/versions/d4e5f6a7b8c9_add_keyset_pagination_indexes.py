@@ -0,0 +1,33 @@
+"""add keyset pagination indexes
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "d4e5f6a7b8c9"
+down_revision: Union[str, Sequence[str], None] = "c3d4e5f6a7b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Bookings are listed by (start_time DESC, id DESC); vessels, routes and
+    # shipments page on their primary key.
+    op.create_index(
+        "ix_bookings_start_time_id",
+        "bookings",
+        [sa.text("start_time DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bookings_start_time_id", table_name="bookings")
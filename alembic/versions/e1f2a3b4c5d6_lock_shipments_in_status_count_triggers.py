@@ -0,0 +1,182 @@
+"""lock shipments in status count triggers
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "e1f2a3b4c5d6"
+down_revision: Union[str, Sequence[str], None] = "d0e1f2a3b4c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The booking triggers used to read the booking's shipments without locking
+# them. A status UPDATE still in flight had already moved its shipment to the
+# new status in the counters, yet was counted out (or moved to the booking's
+# new vessel/port) under its old status, and the counters drifted. Locking the
+# shipments makes such an UPDATE either commit first, so the trigger reads the
+# new status, or wait for the booking change and then find its row deleted or
+# its booking already moved.
+BOOKING_DELETE_FUNCTION = """
+    CREATE OR REPLACE FUNCTION bookings_release_shipment_status_counts()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        s text[];
+        d bigint[];
+    BEGIN
+        SELECT array_agg(status), array_agg(delta)
+        INTO s, d
+        FROM (
+            SELECT status, -count(*) AS delta
+            FROM (
+                SELECT status::text AS status
+                FROM shipments WHERE booking_id = OLD.id
+                ORDER BY id
+                FOR UPDATE
+            ) locked
+            GROUP BY 1
+        ) g;
+        IF s IS NOT NULL THEN
+            PERFORM apply_shipment_status_deltas(
+                array_fill(OLD.vessel_id, ARRAY[cardinality(s)]),
+                array_fill(OLD.port_name::text, ARRAY[cardinality(s)]),
+                s,
+                d
+            );
+        END IF;
+        RETURN OLD;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+# A shipment INSERT only holds a key-share lock on its booking, which a
+# vessel/port UPDATE does not wait for. Re-locking the moved bookings FOR
+# UPDATE waits for such inserts to commit, so the shipments read below include
+# them; inserts arriving later wait and count under the new vessel/port.
+BOOKING_UPDATE_FUNCTION = """
+    CREATE OR REPLACE FUNCTION bookings_move_shipment_status_counts()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        moved integer[];
+        v integer[];
+        p text[];
+        s text[];
+        d bigint[];
+    BEGIN
+        SELECT array_agg(n.id ORDER BY n.id)
+        INTO moved
+        FROM old_rows o JOIN new_rows n ON n.id = o.id
+        WHERE (o.vessel_id, o.port_name) IS DISTINCT FROM (n.vessel_id, n.port_name);
+        IF moved IS NULL THEN
+            RETURN NULL;
+        END IF;
+        PERFORM 1 FROM bookings WHERE id = ANY (moved) ORDER BY id FOR UPDATE;
+
+        SELECT array_agg(vessel_id), array_agg(port_name),
+               array_agg(status), array_agg(delta)
+        INTO v, p, s, d
+        FROM (
+            SELECT c.vessel_id, c.port_name, sh.status, sum(c.delta) AS delta
+            FROM (
+                SELECT o.id, o.vessel_id, o.port_name::text AS port_name,
+                       -1 AS delta
+                FROM old_rows o WHERE o.id = ANY (moved)
+                UNION ALL
+                SELECT n.id, n.vessel_id, n.port_name::text, 1
+                FROM new_rows n WHERE n.id = ANY (moved)
+            ) c
+            JOIN (
+                SELECT booking_id, status::text AS status
+                FROM shipments WHERE booking_id = ANY (moved)
+                ORDER BY id
+                FOR UPDATE
+            ) sh ON sh.booking_id = c.id
+            GROUP BY 1, 2, 3
+        ) g;
+        IF v IS NOT NULL THEN
+            PERFORM apply_shipment_status_deltas(v, p, s, d);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_BOOKING_DELETE_FUNCTION = """
+    CREATE OR REPLACE FUNCTION bookings_release_shipment_status_counts()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        s text[];
+        d bigint[];
+    BEGIN
+        SELECT array_agg(status), array_agg(delta)
+        INTO s, d
+        FROM (
+            SELECT status::text AS status, -count(*) AS delta
+            FROM shipments WHERE booking_id = OLD.id
+            GROUP BY 1
+        ) g;
+        IF s IS NOT NULL THEN
+            PERFORM apply_shipment_status_deltas(
+                array_fill(OLD.vessel_id, ARRAY[cardinality(s)]),
+                array_fill(OLD.port_name::text, ARRAY[cardinality(s)]),
+                s,
+                d
+            );
+        END IF;
+        RETURN OLD;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_BOOKING_UPDATE_FUNCTION = """
+    CREATE OR REPLACE FUNCTION bookings_move_shipment_status_counts()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        v integer[];
+        p text[];
+        s text[];
+        d bigint[];
+    BEGIN
+        SELECT array_agg(vessel_id), array_agg(port_name),
+               array_agg(status), array_agg(delta)
+        INTO v, p, s, d
+        FROM (
+            SELECT c.vessel_id, c.port_name, sh.status::text AS status,
+                   sum(c.delta) AS delta
+            FROM (
+                SELECT o.id, o.vessel_id, o.port_name::text AS port_name,
+                       -1 AS delta
+                FROM old_rows o JOIN new_rows n ON n.id = o.id
+                WHERE (o.vessel_id, o.port_name)
+                      IS DISTINCT FROM (n.vessel_id, n.port_name)
+                UNION ALL
+                SELECT n.id, n.vessel_id, n.port_name::text, 1
+                FROM old_rows o JOIN new_rows n ON n.id = o.id
+                WHERE (o.vessel_id, o.port_name)
+                      IS DISTINCT FROM (n.vessel_id, n.port_name)
+            ) c
+            JOIN shipments sh ON sh.booking_id = c.id
+            GROUP BY 1, 2, 3
+        ) g;
+        IF v IS NOT NULL THEN
+            PERFORM apply_shipment_status_deltas(v, p, s, d);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.execute(BOOKING_DELETE_FUNCTION)
+    op.execute(BOOKING_UPDATE_FUNCTION)
+
+
+def downgrade() -> None:
+    op.execute(PREVIOUS_BOOKING_DELETE_FUNCTION)
+    op.execute(PREVIOUS_BOOKING_UPDATE_FUNCTION)
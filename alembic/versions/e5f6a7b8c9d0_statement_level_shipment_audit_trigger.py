@@ -0,0 +1,77 @@
+"""statement level shipment audit trigger
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "e5f6a7b8c9d0"
+down_revision: Union[str, Sequence[str], None] = "d4e5f6a7b8c9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATEMENT_FUNCTION = """
+    CREATE OR REPLACE FUNCTION log_shipment_status_change()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        INSERT INTO shipment_audit (
+            shipment_id, old_status, new_status, changed_at
+        )
+        SELECT n.id, o.status::text, n.status::text, now()
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+        WHERE o.status IS DISTINCT FROM n.status
+        ORDER BY n.id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+STATEMENT_TRIGGER = """
+    CREATE TRIGGER trigger_shipment_status_audit
+    AFTER UPDATE ON shipments
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION log_shipment_status_change();
+"""
+
+ROW_FUNCTION = """
+    CREATE OR REPLACE FUNCTION log_shipment_status_change()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF OLD.status IS DISTINCT FROM NEW.status THEN
+            INSERT INTO shipment_audit (
+                shipment_id, old_status, new_status, changed_at
+            )
+            VALUES (NEW.id, OLD.status::text, NEW.status::text, now());
+        END IF;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+ROW_TRIGGER = """
+    CREATE TRIGGER trigger_shipment_status_audit
+    AFTER UPDATE ON shipments
+    FOR EACH ROW
+    EXECUTE FUNCTION log_shipment_status_change();
+"""
+
+
+def upgrade() -> None:
+    # One plpgsql call and one INSERT ... SELECT per UPDATE statement instead
+    # of one per row; transition tables carry the before/after images.
+    op.execute("DROP TRIGGER IF EXISTS trigger_shipment_status_audit ON shipments")
+    op.execute(STATEMENT_FUNCTION)
+    op.execute(STATEMENT_TRIGGER)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trigger_shipment_status_audit ON shipments")
+    op.execute(ROW_FUNCTION)
+    op.execute(ROW_TRIGGER)
@@ -0,0 +1,64 @@
+"""create vessel capacity buckets
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "f6a7b8c9d0e1"
+down_revision: Union[str, Sequence[str], None] = "e5f6a7b8c9d0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vessel_capacity_buckets",
+        sa.Column("vessel_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "reserved_capacity",
+            sa.Float(),
+            server_default=sa.text("0"),
+            nullable=False,
+        ),
+        sa.CheckConstraint(
+            "reserved_capacity >= 0",
+            name="check_bucket_reserved_non_negative",
+        ),
+        sa.ForeignKeyConstraint(
+            ["vessel_id"],
+            ["vessels.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("vessel_id", "day"),
+    )
+
+    # Backfill: every booking reserves its capacity on each UTC day that
+    # [start_time, end_time) touches.
+    op.execute(
+        """
+        INSERT INTO vessel_capacity_buckets (vessel_id, day, reserved_capacity)
+        SELECT b.vessel_id, d::date, sum(b.reserved_capacity)
+        FROM bookings b
+        CROSS JOIN LATERAL generate_series(
+            date_trunc('day', b.start_time AT TIME ZONE 'UTC'),
+            date_trunc(
+                'day', (b.end_time - interval '1 microsecond') AT TIME ZONE 'UTC'
+            ),
+            interval '1 day'
+        ) AS d
+        GROUP BY b.vessel_id, d::date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("vessel_capacity_buckets")
@@ -1,11 +1,43 @@
+import argparse
+import importlib.util
+import os
 import subprocess
 import sys
+import time
 from pathlib import Path
 
 import uvicorn
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import (
+    AUDIT_PARTITION_MONTHS_AHEAD,
+    AUDIT_RETENTION_MONTHS,
+    DB_CONNECTION_RESERVE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    GRACEFUL_SHUTDOWN_TIMEOUT,
+    WEB_CONCURRENCY,
+)
+from app.core.database.bulk_import import FORMATS, run_import, write_rejects
+from app.core.database.init import engine
+from app.core.server import available_cpus, connection_limit, worker_pool_sizes
+from app.features.bookings.importer import booking_import
+from app.features.routes.importer import route_import
+from app.features.shipments.partitions import (
+    detach_expired_audit_partitions,
+    ensure_audit_partitions,
+    missing_audit_partitions,
+)
+from app.features.vessels.importer import vessel_import
 
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
+IMPORTS = {
+    "vessels": vessel_import,
+    "bookings": booking_import,
+    "routes": route_import,
+}
+
 
 def dev() -> None:
     uvicorn.run(
@@ -17,10 +49,73 @@ def dev() -> None:
 
 
 def prod() -> None:
+    parser = argparse.ArgumentParser(
+        prog="prod",
+        description=(
+            "Run the API with multiple uvicorn workers, sizing each worker's "
+            "connection pool to fit the database's max_connections."
+        ),
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WEB_CONCURRENCY or available_cpus(),
+        help="worker processes (default: WEB_CONCURRENCY, else one per CPU)",
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=float,
+        default=GRACEFUL_SHUTDOWN_TIMEOUT,
+        help="seconds SIGTERM waits for in-flight requests before closing them",
+    )
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    pool_size, max_overflow = DB_POOL_SIZE, DB_MAX_OVERFLOW
+    try:
+        with engine.connect() as conn:
+            limit = connection_limit(conn)
+    except OperationalError as e:
+        print(f"could not read max_connections, keeping pool settings: {e.orig}")
+    else:
+        try:
+            pool_size, max_overflow = worker_pool_sizes(
+                args.workers, limit, DB_CONNECTION_RESERVE, pool_size, max_overflow
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        if args.workers == 1 and (pool_size, max_overflow) != (
+            DB_POOL_SIZE,
+            DB_MAX_OVERFLOW,
+        ):
+            # A single worker runs in this process, whose engine already exists.
+            parser.error(
+                f"DB_POOL_SIZE + DB_MAX_OVERFLOW exceed the {limit} connections "
+                f"available ({DB_CONNECTION_RESERVE} reserved)"
+            )
+    finally:
+        engine.dispose()
+    # Workers are spawned as fresh interpreters and read these on import.
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    print(
+        f"starting {args.workers} worker(s) on {loop}/{http}, "
+        f"pool {pool_size}+{max_overflow} connections each"
+    )
     uvicorn.run(
         "app.main:app",
-        host="0.0.0.0",
-        port=8000,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        timeout_graceful_shutdown=args.graceful_timeout,
         reload=False,
     )
 
@@ -36,3 +131,104 @@ def docker_up() -> None:
             cwd=_PROJECT_ROOT,
         ).returncode
     )
+
+
+def audit_partitions() -> None:
+    parser = argparse.ArgumentParser(
+        prog="audit-partitions",
+        description=(
+            "Create upcoming monthly shipment_audit partitions and detach the "
+            "ones past the retention window."
+        ),
+    )
+    parser.add_argument(
+        "--months-ahead", type=int, default=AUDIT_PARTITION_MONTHS_AHEAD
+    )
+    parser.add_argument(
+        "--retain-months",
+        type=int,
+        default=AUDIT_RETENTION_MONTHS,
+        help="full months to keep before the current one",
+    )
+    parser.add_argument(
+        "--drop",
+        action="store_true",
+        help="drop expired partitions instead of leaving them as plain tables",
+    )
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        created = ensure_audit_partitions(conn, args.months_ahead)
+        missing = missing_audit_partitions(conn, args.months_ahead)
+        expired = detach_expired_audit_partitions(
+            conn, args.retain_months, drop=args.drop
+        )
+    action = "dropped" if args.drop else "detached"
+    print(f"created {created} partition(s)")
+    print(f"{action} {len(expired)} partition(s): {', '.join(expired) or '-'}")
+    if missing:
+        sys.exit(f"could not create partition(s): {', '.join(missing)}")
+
+
+def import_file() -> None:
+    parser = argparse.ArgumentParser(
+        prog="import",
+        description=(
+            "Bulk-load vessels, bookings or route legs from CSV or NDJSON with "
+            "COPY. Invalid records are written to a reject file; the rest are "
+            "imported in one transaction."
+        ),
+    )
+    parser.add_argument("kind", choices=sorted(IMPORTS))
+    parser.add_argument("path", type=Path, help="input file, or - for stdin")
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="input format (default: from the file extension, else csv)",
+    )
+    parser.add_argument(
+        "--rejects",
+        type=Path,
+        help="where to write rejected records (default: <path>.rejects.<format>)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="validate and write rejects, then roll back",
+    )
+    args = parser.parse_args()
+
+    stdin = str(args.path) == "-"
+    if not stdin and not args.path.is_file():
+        parser.error(f"no such file: {args.path}")
+    fmt = args.format or (
+        "ndjson" if args.path.suffix in (".ndjson", ".jsonl") else "csv"
+    )
+    rejects = args.rejects or Path(f"{'import' if stdin else args.path}.rejects.{fmt}")
+    spec = IMPORTS[args.kind]
+
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        source = sys.stdin.buffer if stdin else args.path.open("rb")
+        try:
+            result = run_import(conn, spec, source, fmt)
+        except ValueError as e:
+            parser.error(str(e))
+        finally:
+            if not stdin:
+                source.close()
+        if result.rejected:
+            with rejects.open("wb") as out:
+                write_rejects(conn, spec.columns, fmt, out)
+        if not args.dry_run:
+            conn.commit()
+    elapsed = time.perf_counter() - start
+
+    action = "validated" if args.dry_run else "imported"
+    print(
+        f"{result.rows} record(s) read, {result.imported} {action}, "
+        f"{result.rejected} rejected in {elapsed:.1f}s "
+        f"({result.rows / max(elapsed, 1e-9) * 60:,.0f} records/min)"
+    )
+    if result.rejected:
+        print(f"rejected records written to {rejects}")
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+import asyncpg
+from sqlalchemy import ColumnElement, Text, cast, func, literal, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import CACHE_ENABLED, CACHE_MAXSIZE, CACHE_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache_invalidation"
+
+
+class TTLCache:
+    """In-process LRU cache with per-entry TTL and hit/miss counters.
+
+    Entries are only served while the cross-worker invalidation listener is
+    connected; otherwise another worker's write could go unnoticed.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.active = False
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def generation(self) -> int:
+        """Token to pass to ``set`` so loads racing an invalidation are dropped."""
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.active:
+            self.misses += 1
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: int) -> None:
+        if not self.active or generation != self._generation:
+            return
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._generation += 1
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._generation += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+class CacheRegistry:
+    def __init__(self) -> None:
+        self.caches: Dict[str, TTLCache] = {}
+        self.followers: Dict[str, List[Any]] = {}
+
+    def create(self, name: str) -> TTLCache:
+        cache = TTLCache(name, CACHE_MAXSIZE, CACHE_TTL_SECONDS)
+        self.caches[name] = cache
+        return cache
+
+    def follow(self, name: str, follower: Any) -> None:
+        """Deliver invalidations of cache ``name`` to ``follower`` as well.
+
+        For in-memory structures derived from the same rows; the follower needs
+        ``name`` and ``active`` attributes and ``invalidate(key)``, ``clear()``
+        and ``stats()`` methods.
+        """
+        self.followers.setdefault(name, []).append(follower)
+
+    def set_active(self, active: bool) -> None:
+        for cache in self.caches.values():
+            cache.active = active and CACHE_ENABLED
+            cache.clear()
+        for followers in self.followers.values():
+            for follower in followers:
+                follower.active = active and CACHE_ENABLED
+                follower.clear()
+
+    def handle_notification(self, payload: str) -> None:
+        name, _, key = payload.partition(":")
+        cache = self.caches.get(name)
+        if cache is not None:
+            cache.invalidate(int(key))
+        for follower in self.followers.get(name, ()):
+            follower.invalidate(int(key))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        stats = {name: cache.stats() for name, cache in self.caches.items()}
+        for followers in self.followers.values():
+            for follower in followers:
+                stats[follower.name] = follower.stats()
+        return stats
+
+
+cache_registry = CacheRegistry()
+
+
+async def notify_invalidation(db: AsyncSession, cache: TTLCache, *keys: int) -> None:
+    """Queue invalidations that Postgres delivers to every worker on commit."""
+    if not keys:
+        return
+    await db.execute(
+        text(
+            "SELECT pg_notify(:channel, :prefix || k) "
+            "FROM unnest(CAST(:keys AS text[])) AS k"
+        ),
+        {
+            "channel": INVALIDATION_CHANNEL,
+            "prefix": f"{cache.name}:",
+            "keys": [str(k) for k in keys],
+        },
+    )
+
+
+def notify_clause(cache: TTLCache, key: ColumnElement) -> ColumnElement:
+    """``pg_notify`` call for embedding an invalidation in a larger statement."""
+    return func.pg_notify(
+        INVALIDATION_CHANNEL, literal(f"{cache.name}:") + cast(key, Text)
+    )
+
+
+class InvalidationListener:
+    """Keeps a dedicated LISTEN connection open and reconnects when it drops."""
+
+    def __init__(self, dsn: str, retry_seconds: float = 1.0) -> None:
+        self.dsn = dsn
+        self.retry_seconds = retry_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._lost: Optional[asyncio.Event] = None
+
+    def _on_notify(self, conn, pid, channel, payload) -> None:
+        cache_registry.handle_notification(payload)
+
+    def _on_termination(self, conn) -> None:
+        cache_registry.set_active(False)
+        if self._lost is not None:
+            self._lost.set()
+
+    async def _run(self) -> None:
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                self._lost = asyncio.Event()
+                conn.add_termination_listener(self._on_termination)
+                await conn.add_listener(INVALIDATION_CHANNEL, self._on_notify)
+                cache_registry.set_active(True)
+                await self._lost.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning(
+                    "cache invalidation listener disconnected", exc_info=True
+                )
+            finally:
+                cache_registry.set_active(False)
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(self.retry_seconds)
+
+    def start(self) -> None:
+        if CACHE_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
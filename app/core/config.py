@@ -0,0 +1,65 @@
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+DB_POOL_SIZE = env_int("DB_POOL_SIZE", 10)
+DB_MAX_OVERFLOW = env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_RECYCLE = env_int("DB_POOL_RECYCLE", 1800)
+DB_POOL_PRE_PING = env_bool("DB_POOL_PRE_PING", True)
+DB_POOL_TIMEOUT = env_float("DB_POOL_TIMEOUT", 10.0)
+DB_STATEMENT_TIMEOUT_MS = env_int("DB_STATEMENT_TIMEOUT_MS", 30000)
+
+# Threads beyond what the pool can serve would only queue on checkout.
+THREADPOOL_SIZE = env_int("THREADPOOL_SIZE", DB_POOL_SIZE + DB_MAX_OVERFLOW)
+
+EXPORT_BATCH_SIZE = env_int("EXPORT_BATCH_SIZE", 2000)
+
+CACHE_ENABLED = env_bool("CACHE_ENABLED", True)
+CACHE_MAXSIZE = env_int("CACHE_MAXSIZE", 10000)
+CACHE_TTL_SECONDS = env_float("CACHE_TTL_SECONDS", 60.0)
+# How old the route search index may get before a full reload, while no
+# invalidation listener reports other workers' leg writes.
+ROUTE_GRAPH_MAX_AGE_SECONDS = env_float("ROUTE_GRAPH_MAX_AGE_SECONDS", 5.0)
+
+AUDIT_PARTITION_MONTHS_AHEAD = env_int("AUDIT_PARTITION_MONTHS_AHEAD", 3)
+AUDIT_RETENTION_MONTHS = env_int("AUDIT_RETENTION_MONTHS", 24)
+
+METRICS_ENABLED = env_bool("METRICS_ENABLED", True)
+
+# X-DB-* response headers, N+1 warnings and per-route query budgets.
+QUERY_TRACKING_ENABLED = env_bool("QUERY_TRACKING_ENABLED", True)
+QUERY_BUDGET_STRICT = env_bool("QUERY_BUDGET_STRICT", False)
+QUERY_REPEAT_THRESHOLD = env_int("QUERY_REPEAT_THRESHOLD", 5)
+
+# `prod` launcher: workers (0 = one per available CPU), connections left free
+# for migrations, cron jobs and consoles, and how long SIGTERM waits for
+# in-flight requests.
+WEB_CONCURRENCY = env_int("WEB_CONCURRENCY", 0)
+DB_CONNECTION_RESERVE = env_int("DB_CONNECTION_RESERVE", 10)
+GRACEFUL_SHUTDOWN_TIMEOUT = env_float("GRACEFUL_SHUTDOWN_TIMEOUT", 25.0)
+
+# Startup warm-up: connections opened and hot read paths exercised before a
+# worker accepts traffic; /health/ready reports 503 until it has finished.
+WARMUP_ENABLED = env_bool("WARMUP_ENABLED", True)
+WARMUP_CONNECTIONS = min(env_int("WARMUP_CONNECTIONS", DB_POOL_SIZE), DB_POOL_SIZE)
+WARMUP_TIMEOUT = env_float("WARMUP_TIMEOUT", 30.0)
+
+# Optional group commit for POST /api/bookings/: concurrent bookings for one
+# vessel arriving within the window run as a single transaction.
+BOOKING_COALESCE_ENABLED = env_bool("BOOKING_COALESCE_ENABLED", False)
+BOOKING_COALESCE_WINDOW_MS = env_float("BOOKING_COALESCE_WINDOW_MS", 2.0)
+BOOKING_COALESCE_MAX_BATCH = env_int("BOOKING_COALESCE_MAX_BATCH", 64)
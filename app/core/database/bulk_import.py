@@ -0,0 +1,169 @@
+"""COPY-based bulk import of CSV or NDJSON files.
+
+The file is streamed into a temporary ``import_raw`` table of text columns
+with ``COPY``, so malformed values never abort the load. Each ``ImportSpec``
+then builds ``import_rows`` (typed values plus an ``error`` column) from it
+with set-based SQL and merges the rows without an error into the real tables.
+Everything runs in the caller's transaction; the temporary tables are dropped
+on commit or rollback.
+"""
+
+import csv
+from typing import BinaryIO, Callable, NamedTuple, Sequence, Tuple
+
+from sqlalchemy import Connection, text
+
+FORMATS = ("csv", "ndjson")
+
+COPY_CHUNK_BYTES = 1 << 20
+
+# NDJSON lines are copied verbatim into one text column: CSV mode with control
+# characters as quote and delimiter never splits or unescapes them.
+VERBATIM = "FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02'"
+
+
+class ImportSpec(NamedTuple):
+    columns: Tuple[str, ...]
+    # Builds import_rows(line, ..., error) from import_raw.
+    validate: Callable[[Connection], None]
+    # Inserts the rows without an error; returns how many were imported.
+    merge: Callable[[Connection], int]
+
+
+class ImportResult(NamedTuple):
+    rows: int
+    imported: int
+    rejected: int
+
+
+def trimmed(columns: Sequence[str]) -> str:
+    """Select list for ``import_raw`` with blank values turned into NULL."""
+    return ", ".join(f"nullif(btrim({name}), '') AS {name}" for name in columns)
+
+
+def parsed(name: str, type_name: str) -> str:
+    """``name`` cast to ``type_name`` as ``<name>_value``; NULL if it won't parse.
+
+    Select these in a ``MATERIALIZED`` CTE: a subquery gets flattened and the
+    cast re-evaluated in every CASE branch that checks the value.
+    """
+    return (
+        f"CASE WHEN pg_input_is_valid({name}, '{type_name}') "
+        f"THEN {name}::{type_name} END AS {name}_value"
+    )
+
+
+def _copy(conn: Connection, sql: str, file: BinaryIO) -> None:
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(sql, file, size=COPY_CHUNK_BYTES)
+    finally:
+        cursor.close()
+
+
+def _read_header(source: BinaryIO, columns: Sequence[str]) -> list:
+    line = source.readline().decode("utf-8-sig")
+    header = [name.strip().lower() for name in next(csv.reader([line]), [])]
+    unknown = sorted(set(header) - set(columns))
+    if unknown:
+        raise ValueError(f"unknown column(s) in header: {', '.join(unknown)}")
+    if len(set(header)) != len(header):
+        raise ValueError("duplicate column in header")
+    if not header:
+        raise ValueError("missing header row")
+    return header
+
+
+def stage(conn: Connection, columns: Sequence[str], source: BinaryIO, fmt: str) -> None:
+    """COPY ``source`` into ``import_raw(line, <columns>, malformed, doc)``.
+
+    ``line`` is the line number in the file for NDJSON and for CSV records
+    without embedded newlines. Blank NDJSON lines are skipped; lines that are
+    not a JSON object get ``malformed`` set and keep their text in ``doc``.
+    """
+    if fmt == "csv":
+        header = _read_header(source, columns)
+        conn.execute(
+            text(
+                "CREATE TEMP TABLE import_raw ("
+                "line bigint GENERATED ALWAYS AS IDENTITY (START WITH 2), "
+                + "".join(f"{name} text, " for name in columns)
+                + "malformed text, doc text) ON COMMIT DROP"
+            )
+        )
+        _copy(
+            conn,
+            f"COPY import_raw ({', '.join(header)}) FROM STDIN WITH (FORMAT csv)",
+            source,
+        )
+    elif fmt == "ndjson":
+        conn.execute(
+            text(
+                "CREATE TEMP TABLE import_lines ("
+                "line bigint GENERATED ALWAYS AS IDENTITY, doc text"
+                ") ON COMMIT DROP"
+            )
+        )
+        _copy(conn, f"COPY import_lines (doc) FROM STDIN WITH ({VERBATIM})", source)
+        fields = "".join(f"nullif(j ->> '{name}', '') AS {name}, " for name in columns)
+        conn.execute(
+            text(
+                f"""
+                CREATE TEMP TABLE import_raw ON COMMIT DROP AS
+                SELECT line, {fields}
+                       CASE WHEN jsonb_typeof(j) IS DISTINCT FROM 'object'
+                            THEN 'not a JSON object' END AS malformed,
+                       doc
+                FROM (
+                    SELECT line, doc,
+                           CASE WHEN pg_input_is_valid(doc, 'jsonb')
+                                THEN doc::jsonb END AS j
+                    FROM import_lines
+                    WHERE btrim(doc) <> ''
+                ) AS parsed
+                """
+            )
+        )
+    else:
+        raise ValueError(f"unsupported format: {fmt}")
+    # Autovacuum never analyzes temporary tables.
+    conn.execute(text("ANALYZE import_raw"))
+
+
+def run_import(
+    conn: Connection, spec: ImportSpec, source: BinaryIO, fmt: str
+) -> ImportResult:
+    stage(conn, spec.columns, source, fmt)
+    spec.validate(conn)
+    imported = spec.merge(conn)
+    rows, rejected = conn.execute(
+        text("SELECT count(*), count(error) FROM import_rows")
+    ).one()
+    return ImportResult(rows, imported, rejected)
+
+
+def write_rejects(
+    conn: Connection, columns: Sequence[str], fmt: str, out: BinaryIO
+) -> None:
+    """Write rejected records with their line and error, in the input format.
+
+    CSV rejects get ``line`` and ``error`` columns ahead of the original ones;
+    NDJSON rejects are ``{"line", "error", "record"}`` objects.
+    """
+    if fmt == "csv":
+        fields = "".join(f", r.{name}" for name in columns)
+        select = f"SELECT r.line, i.error{fields}"
+        options = "FORMAT csv, HEADER"
+    else:
+        select = (
+            "SELECT jsonb_build_object('line', r.line, 'error', i.error, 'record', "
+            "CASE WHEN r.malformed IS NULL THEN r.doc::jsonb "
+            "ELSE to_jsonb(r.doc) END)"
+        )
+        options = VERBATIM
+    _copy(
+        conn,
+        f"COPY ({select} FROM import_rows i JOIN import_raw r USING (line) "
+        f"WHERE i.error IS NOT NULL ORDER BY r.line) TO STDOUT WITH ({options})",
+        out,
+    )
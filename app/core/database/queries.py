@@ -0,0 +1,80 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+
+class QueryStats:
+    """Statements sent to the database and time spent waiting on them."""
+
+    __slots__ = ("count", "seconds", "budget", "_statements")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.budget: Optional[int] = None
+        # statement -> [runs, first params, params differed since]
+        self._statements: Dict[str, list] = {}
+
+    def record(
+        self, seconds: float, statement: Optional[str] = None, params: Any = None
+    ) -> None:
+        self.count += 1
+        self.seconds += seconds
+        if statement is None:
+            return
+        seen = self._statements.get(statement)
+        if seen is None:
+            self._statements[statement] = [1, params, False]
+        else:
+            seen[0] += 1
+            if not seen[2] and params != seen[1]:
+                seen[2] = True
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements run ``threshold``+ times with varying params: likely N+1."""
+        return [
+            (statement, runs)
+            for statement, (runs, _, varied) in self._statements.items()
+            if varied and runs >= threshold
+        ]
+
+
+# Process-wide totals, and the stats of the request being handled (set by the
+# request middlewares). SQLAlchemy runs the cursor events in a greenlet that
+# inherits the caller's context, so the request's stats object is visible there.
+query_totals = QueryStats()
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Stats for the current request, shared with any outer middleware."""
+    stats = current_query_stats.get()
+    if stats is not None:
+        yield stats
+        return
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+
+def instrument_queries(engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, params, context, many):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, params, context, many):
+        elapsed = time.perf_counter() - context._query_start
+        query_totals.record(elapsed)
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.record(elapsed, statement, params)
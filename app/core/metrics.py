@@ -0,0 +1,280 @@
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.database.pool import pool_stats
+from app.core.database.queries import QueryStats, query_totals, track_queries
+
+try:
+    from fastapi.routing import iter_route_contexts
+except ImportError:  # older FastAPI copies included routes with their full path
+    iter_route_contexts = None
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Requests that matched no route share one label, so unknown paths cannot
+# grow the series count.
+UNMATCHED_ROUTE = "<unmatched>"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    def __init__(self, name: str, doc: str, labels: Tuple[str, ...]) -> None:
+        self.name = name
+        self.doc = doc
+        self.labels = labels
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, label_values: LabelValues, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        for values, total in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, values)} {_number(total)}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram; buckets are stored per series, not cumulated."""
+
+    def __init__(
+        self,
+        name: str,
+        doc: str,
+        labels: Tuple[str, ...],
+        buckets: Tuple[float, ...],
+    ) -> None:
+        self.name = name
+        self.doc = doc
+        self.labels = labels
+        self.buckets = buckets
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, label_values: LabelValues, value: float) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            # One slot per bucket plus +Inf, then the sum.
+            series = self._series[label_values] = [0] * (len(self.buckets) + 1)
+            series.append(0.0)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        bounds = [_number(b) for b in self.buckets] + ["+Inf"]
+        for values, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                labels = _labels(self.labels, values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class HttpMetrics:
+    """Per-process request metrics; each worker exposes its own."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.requests = Counter(
+            "http_requests_total",
+            "HTTP requests handled.",
+            ("method", "route", "status"),
+        )
+        self.latency = Histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency.",
+            ("method", "route"),
+            LATENCY_BUCKETS,
+        )
+        self.db_queries = Histogram(
+            "http_request_db_queries",
+            "Database statements executed per HTTP request.",
+            ("method", "route"),
+            QUERY_COUNT_BUCKETS,
+        )
+        self.db_seconds = Histogram(
+            "http_request_db_seconds",
+            "Time spent in database statements per HTTP request.",
+            ("method", "route"),
+            LATENCY_BUCKETS,
+        )
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        queries: QueryStats,
+    ) -> None:
+        key = (method, route)
+        self.requests.inc((method, route, str(status)))
+        self.latency.observe(key, seconds)
+        self.db_queries.observe(key, queries.count)
+        self.db_seconds.observe(key, queries.seconds)
+
+
+http_metrics = HttpMetrics()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and database time for every request."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self._route_paths: Optional[Dict[int, str]] = None
+
+    def _route_label(self, scope) -> str:
+        route = scope.get("route")
+        if route is None:
+            return UNMATCHED_ROUTE
+        if self._route_paths is None:
+            # Routes of included routers only know their path within the
+            # router; map them to the full path template once.
+            routes = scope["app"].routes
+            self._route_paths = (
+                {
+                    id(ctx.original_route): ctx.path
+                    for ctx in iter_route_contexts(routes)
+                }
+                if iter_route_contexts is not None
+                else {}
+            )
+        return self._route_paths.get(id(route)) or route.path
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope.get("warmup"):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with track_queries() as queries:
+            http_metrics.in_flight += 1
+            start = time.perf_counter()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                elapsed = time.perf_counter() - start
+                http_metrics.in_flight -= 1
+                # Label by path template, not the raw path, to bound the series.
+                http_metrics.observe(
+                    scope["method"],
+                    self._route_label(scope),
+                    status_code,
+                    elapsed,
+                    queries,
+                )
+
+
+# Feature-level metrics rendered after the built-in ones.
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def register_collector(render: Callable[[], List[str]]) -> None:
+    _collectors.append(render)
+
+
+def _sample(name: str, doc: str, value: float, kind: str = "gauge") -> List[str]:
+    return [f"# HELP {name} {doc}", f"# TYPE {name} {kind}", f"{name} {value}"]
+
+
+def render_metrics(pool) -> str:
+    snapshot = pool_stats.snapshot()
+    lines = [
+        *_sample(
+            "http_requests_in_flight",
+            "HTTP requests currently being handled.",
+            http_metrics.in_flight,
+        ),
+        *http_metrics.requests.render(),
+        *http_metrics.latency.render(),
+        *http_metrics.db_queries.render(),
+        *http_metrics.db_seconds.render(),
+        *_sample(
+            "db_queries_total",
+            "Database statements executed.",
+            query_totals.count,
+            "counter",
+        ),
+        *_sample(
+            "db_query_seconds_total",
+            "Time spent in database statements.",
+            _number(query_totals.seconds),
+            "counter",
+        ),
+        *_sample("db_pool_size", "Persistent pool connections.", pool.size()),
+        *_sample(
+            "db_pool_checked_out",
+            "Connections currently checked out.",
+            pool.checkedout(),
+        ),
+        *_sample(
+            "db_pool_overflow",
+            "Overflow connections open.",
+            max(pool.overflow(), 0),
+        ),
+        *_sample(
+            "db_pool_checkouts_total",
+            "Connection checkouts.",
+            snapshot["checkouts"],
+            "counter",
+        ),
+        *_sample(
+            "db_pool_checkout_timeouts_total",
+            "Checkouts that timed out waiting for a connection.",
+            snapshot["timeouts"],
+            "counter",
+        ),
+        *_sample(
+            "db_pool_checkout_wait_seconds_total",
+            "Time spent waiting for a connection.",
+            _number(snapshot["wait_seconds_total"]),
+            "counter",
+        ),
+        *_sample(
+            "db_pool_checkout_wait_seconds_max",
+            "Longest wait for a connection.",
+            _number(snapshot["wait_seconds_max"]),
+        ),
+        *_sample(
+            "db_pool_max_in_use",
+            "Most connections checked out at once.",
+            snapshot["max_in_use"],
+        ),
+    ]
+    for render in _collectors:
+        lines += render()
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,82 @@
+import logging
+
+from fastapi import Depends
+from starlette.datastructures import MutableHeaders
+
+from app.core.database.queries import QueryStats, current_query_stats, track_queries
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+def query_budget(max_queries: int):
+    """Route dependency declaring how many statements the endpoint may run.
+
+    Usage: ``@router.get("/", dependencies=[query_budget(2)])``.
+    """
+
+    async def _declare_budget() -> None:
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.budget = max_queries
+
+    return Depends(_declare_budget)
+
+
+class QueryBudgetMiddleware:
+    """Adds ``X-DB-Queries``/``X-DB-Time`` and checks statement counts.
+
+    Statements repeated ``repeat_threshold`` or more times with different
+    parameters are logged as likely N+1 queries and counted in
+    ``X-DB-Repeated``. Going over a route's ``query_budget`` is logged, or
+    raises ``QueryBudgetExceeded`` (a 500) when ``strict`` is set, so tests
+    running in strict mode fail on query-count regressions.
+    """
+
+    def __init__(self, app, strict: bool = False, repeat_threshold: int = 5) -> None:
+        self.app = app
+        self.strict = strict
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as queries:
+
+            async def send_wrapper(message) -> None:
+                if message["type"] == "http.response.start":
+                    repeated = self._check(scope, queries)
+                    headers = MutableHeaders(scope=message)
+                    # Set, not appended: a nested instance shares the stats
+                    # and has already written the same values.
+                    headers["X-DB-Queries"] = str(queries.count)
+                    headers["X-DB-Time"] = f"{queries.seconds * 1000:.2f}"
+                    if repeated:
+                        headers["X-DB-Repeated"] = str(repeated)
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+    def _check(self, scope, queries: QueryStats) -> int:
+        endpoint = f"{scope['method']} {scope['path']}"
+        repeated = queries.repeated(self.repeat_threshold)
+        for statement, runs in repeated:
+            logger.warning(
+                "possible N+1 in %s: statement ran %d times: %s",
+                endpoint,
+                runs,
+                statement,
+            )
+        if queries.budget is not None and queries.count > queries.budget:
+            message = (
+                f"{endpoint} ran {queries.count} statements, budget is {queries.budget}"
+            )
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return len(repeated)
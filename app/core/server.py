@@ -0,0 +1,54 @@
+import math
+import os
+from pathlib import Path
+from typing import Tuple
+
+from sqlalchemy import Connection, text
+
+CGROUP_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on, capped by a cgroup v2 CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = CGROUP_CPU_MAX.read_text().split()
+    except (OSError, ValueError):
+        return cpus
+    if quota != "max":
+        cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    return cpus
+
+
+def connection_limit(conn: Connection) -> int:
+    """Connections the server accepts from non-superuser roles."""
+    return conn.execute(
+        text(
+            "SELECT current_setting('max_connections')::int "
+            "- current_setting('superuser_reserved_connections')::int "
+            "- coalesce(current_setting('reserved_connections', true)::int, 0)"
+        )
+    ).scalar_one()
+
+
+def worker_pool_sizes(
+    workers: int, limit: int, reserve: int, pool_size: int, max_overflow: int
+) -> Tuple[int, int]:
+    """Per-worker ``(pool_size, max_overflow)`` keeping all workers under ``limit``.
+
+    ``reserve`` connections are left for other clients, and each worker also
+    holds one LISTEN connection for cache invalidation. The configured sizes
+    are only ever lowered; overflow gives way first.
+    """
+    per_worker = (limit - reserve) // workers - 1
+    if per_worker < 1:
+        raise ValueError(
+            f"{workers} workers do not fit in {limit} connections "
+            f"({reserve} reserved); lower the worker count or "
+            "DB_CONNECTION_RESERVE"
+        )
+    pool_size = min(pool_size, per_worker)
+    return pool_size, min(max_overflow, per_worker - pool_size)
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import configure_mappers
+
+from app.features.bookings.schema import BookingBatchCreate
+from app.features.routes.schema import RouteCreate
+from app.features.vessels.schema import VesselCreate
+
+logger = logging.getLogger(__name__)
+
+# List endpoints whose first row supplies the id for the item requests.
+LISTS = ("vessels", "bookings", "shipments", "routes")
+
+# Write payloads are validated without being sent, so their validators and
+# serializers are exercised without touching data.
+SAMPLE_PAYLOADS = (
+    (
+        VesselCreate,
+        {
+            "name": "warmup",
+            "imo_number": "IMO0000000",
+            "max_capacity": 1000,
+            "vessel_type": "tanker",
+        },
+    ),
+    (
+        BookingBatchCreate,
+        {
+            "items": [
+                {
+                    "vessel_id": 1,
+                    "reserved_capacity": 1,
+                    "start_time": "2030-01-01T00:00:00Z",
+                    "end_time": "2030-01-01T01:00:00Z",
+                    "port_name": "Singapore",
+                }
+            ]
+        },
+    ),
+    (
+        RouteCreate,
+        {
+            "name": "warmup",
+            "legs": [
+                {
+                    "sequence": 0,
+                    "origin_port": "Singapore",
+                    "destination_port": "Rotterdam",
+                }
+            ],
+        },
+    ),
+)
+
+
+class WarmupState:
+    def __init__(self) -> None:
+        self.done = False
+        self.seconds: Optional[float] = None
+        self.requests = 0
+        self.errors = 0
+
+
+warmup_state = WarmupState()
+
+
+async def _get(app, url: str) -> Tuple[int, bytes]:
+    """Send a GET straight into the ASGI app; no socket involved."""
+    path, _, query = url.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", b"warmup")],
+        "client": ("127.0.0.1", 0),
+        "server": ("warmup", 80),
+        # Keeps these requests out of the request metrics.
+        "warmup": True,
+    }
+    status = 0
+    body: List[bytes] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(body)
+
+
+def _first_id(body: bytes) -> int:
+    try:
+        rows = json.loads(body)["data"]
+        return rows[0]["id"] if rows else 0
+    except (ValueError, KeyError, TypeError):
+        return 0
+
+
+def hot_paths(ids: Dict[str, int]) -> List[str]:
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    window = urlencode(
+        {"start": now.isoformat(), "end": (now + timedelta(days=3)).isoformat()}
+    )
+    days = urlencode(
+        {"start": now.date().isoformat(), "end": (now + timedelta(days=7)).date()}
+    )
+    return [
+        *(f"/api/{name}/?limit=1" for name in LISTS),
+        f"/api/vessels/{ids['vessels']}",
+        f"/api/vessels/{ids['vessels']}/capacity?{days}",
+        f"/api/vessels/available?{window}&min_capacity=1",
+        f"/api/bookings/{ids['bookings']}",
+        f"/api/shipments/{ids['shipments']}",
+        f"/api/shipments/{ids['shipments']}/audit",
+        "/api/shipments/stats?group_by=status",
+        f"/api/routes/{ids['routes']}",
+        "/api/routes/search?from=Singapore&to=Rotterdam",
+        # A validation failure, for the 422 handler.
+        "/api/vessels/?limit=0",
+    ]
+
+
+async def _pass(app, ids: Dict[str, int]) -> None:
+    for url in hot_paths(ids):
+        status, _ = await _get(app, url)
+        warmup_state.requests += 1
+        if status >= 500:
+            warmup_state.errors += 1
+
+
+async def open_connections(engine: AsyncEngine, count: int) -> None:
+    """Check out ``count`` connections at once so the pool keeps them open."""
+    connections = [engine.connect() for _ in range(count)]
+    try:
+        await asyncio.gather(*(conn.start() for conn in connections))
+    finally:
+        await asyncio.gather(*(conn.close() for conn in connections))
+
+
+async def warm_up(app, engine: AsyncEngine, connections: int) -> None:
+    """Do the first-request work before the worker starts accepting traffic.
+
+    Opens ``connections`` pool connections and configures the mappers. Then
+    it sends the read endpoints through the app once per connection,
+    concurrently. That fills the SQL compilation cache, each connection's
+    prepared statements, the response adapters and the route graph. Failures
+    are logged and never block startup.
+    """
+    start = time.perf_counter()
+    try:
+        configure_mappers()
+        for schema, payload in SAMPLE_PAYLOADS:
+            schema.model_validate(payload).model_dump_json()
+        await open_connections(engine, connections)
+        ids = {}
+        for name in LISTS:
+            status, body = await _get(app, f"/api/{name}/?limit=1")
+            warmup_state.requests += 1
+            ids[name] = _first_id(body) if status == 200 else 0
+        await asyncio.gather(*(_pass(app, ids) for _ in range(max(connections, 1))))
+    except Exception:
+        logger.warning("warm-up failed", exc_info=True)
+        warmup_state.errors += 1
+    finally:
+        warmup_state.seconds = round(time.perf_counter() - start, 3)
+        warmup_state.done = True
+    logger.info(
+        "warm-up finished in %.3fs: %d requests, %d errors",
+        warmup_state.seconds,
+        warmup_state.requests,
+        warmup_state.errors,
+    )
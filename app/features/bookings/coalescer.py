@@ -0,0 +1,129 @@
+import asyncio
+import contextvars
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import (
+    BOOKING_COALESCE_ENABLED,
+    BOOKING_COALESCE_MAX_BATCH,
+    BOOKING_COALESCE_WINDOW_MS,
+)
+from app.core.database.init import AsyncSessionLocal
+from app.core.metrics import Histogram, register_collector
+from app.features.bookings.model import Booking
+from app.features.bookings.schema import (
+    MAX_BATCH_SIZE,
+    BookingBatchCreate,
+    BookingCreate,
+)
+from app.features.bookings.service import BookingService
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 500)
+
+Pending = List[Tuple[BookingCreate, asyncio.Future]]
+
+
+class BookingCoalescer:
+    """Group-commits concurrent single bookings for the same vessel.
+
+    The first request for a vessel opens a batch; requests for that vessel
+    arriving within ``window`` seconds join it, up to ``max_batch``. The
+    batch then runs through ``BookingService.create_batch`` in best-effort
+    mode: one transaction, one vessel lock, capacity checked in arrival
+    order and one multi-row insert. Each caller gets its own booking or
+    HTTPException back.
+    """
+
+    def __init__(self, window: float, max_batch: int) -> None:
+        self.window = window
+        self.max_batch = min(max_batch, MAX_BATCH_SIZE)
+        self._pending: Dict[int, Pending] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.batched = 0
+        self.batch_sizes = Histogram(
+            "booking_coalescer_batch_size",
+            "Bookings committed per coalesced transaction.",
+            (),
+            BATCH_SIZE_BUCKETS,
+        )
+
+    async def submit(self, payload: BookingCreate) -> Booking:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.get(payload.vessel_id)
+        if pending is None:
+            pending = self._pending[payload.vessel_id] = []
+            loop.call_later(self.window, self._flush, payload.vessel_id, pending)
+        pending.append((payload, future))
+        if len(pending) >= self.max_batch:
+            self._flush(payload.vessel_id, pending)
+        return await future
+
+    def _flush(self, vessel_id: int, pending: Pending) -> None:
+        if self._pending.get(vessel_id) is not pending:
+            return  # already flushed when it reached max_batch
+        del self._pending[vessel_id]
+        # A fresh context keeps the batch's statements out of the query stats
+        # of whichever request happened to close the batch.
+        task = contextvars.Context().run(asyncio.create_task, self._run(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pending: Pending) -> None:
+        self.batches += 1
+        self.batched += len(pending)
+        self.batch_sizes.observe((), len(pending))
+        try:
+            if len(pending) == 1:
+                await self._run_single(*pending[0])
+                return
+            payload = BookingBatchCreate(
+                items=[item for item, _ in pending], mode="best_effort"
+            )
+            async with AsyncSessionLocal() as db:
+                outcomes = await BookingService.create_batch(db, payload)
+        except HTTPException:
+            # The whole transaction was rejected (create_batch checks overlaps
+            # under the bucket locks, so this should not happen); settle each
+            # request on its own.
+            for item, future in pending:
+                await self._run_single(item, future)
+            return
+        except Exception as e:
+            logger.exception("coalesced booking batch failed")
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), (code, booking, error) in zip(pending, outcomes):
+            if future.done():
+                continue
+            if booking is not None:
+                future.set_result(booking)
+            else:
+                future.set_exception(HTTPException(status_code=code, detail=error))
+
+    @staticmethod
+    async def _run_single(payload: BookingCreate, future: asyncio.Future) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                booking = await BookingService.create(db, payload)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(booking)
+
+
+booking_coalescer: Optional[BookingCoalescer] = None
+if BOOKING_COALESCE_ENABLED:
+    booking_coalescer = BookingCoalescer(
+        BOOKING_COALESCE_WINDOW_MS / 1000, BOOKING_COALESCE_MAX_BATCH
+    )
+    register_collector(booking_coalescer.batch_sizes.render)
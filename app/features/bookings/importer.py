@@ -0,0 +1,274 @@
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Tuple, get_args
+
+from sqlalchemy import Connection, text
+
+from app.core.database.bulk_import import ImportSpec, parsed, trimmed
+from app.features.bookings.service import OVERLAP_DETAIL
+from app.features.capacity.service import BucketKey, covered_days
+from app.shared.ports import AVAILABLE_PORTS
+
+COLUMNS = ("vessel_id", "reserved_capacity", "start_time", "end_time", "port_name")
+
+FILE_OVERLAP_DETAIL = "Overlaps an earlier line in the file for this vessel"
+
+
+def _admit_in_file_order(conn: Connection) -> None:
+    """Admit the remaining lines one by one, in file order.
+
+    A line is rejected if it overlaps a line already admitted for the same
+    vessel or if one of its days lacks room for it on top of what is booked
+    and admitted so far. Rejected lines hold no time slot and no capacity, so
+    they never push out a later line. This has to run sequentially, so it is
+    done here rather than in SQL; the locked buckets are read once up front.
+    """
+    buckets = conn.execute(
+        text(
+            """
+            SELECT b.vessel_id, b.day, v.max_capacity - b.reserved_capacity
+            FROM vessel_capacity_buckets b
+            JOIN vessels v ON v.id = b.vessel_id
+            WHERE (b.vessel_id, b.day) IN (SELECT vessel_id, day FROM import_days)
+            """
+        )
+    )
+    room: Dict[BucketKey, float] = {(v, d): free for v, d, free in buckets}
+    # Admitted (start_time, end_time) per vessel, kept sorted by start_time;
+    # they never overlap, so only the neighbours of a new line can.
+    admitted: Dict[int, List[Tuple[datetime, datetime]]] = defaultdict(list)
+    lines: List[int] = []
+    errors: List[str] = []
+    rows = conn.execute(
+        text(
+            """
+            SELECT line, vessel_id, reserved_capacity, start_time, end_time
+            FROM import_rows
+            WHERE error IS NULL
+            ORDER BY line
+            """
+        ).execution_options(yield_per=10_000)
+    )
+    for line, vessel_id, reserved, start, end in rows:
+        slots = admitted[vessel_id]
+        i = bisect_right(slots, (start, end))
+        if (i > 0 and slots[i - 1][1] > start) or (
+            i < len(slots) and slots[i][0] < end
+        ):
+            lines.append(line)
+            errors.append(FILE_OVERLAP_DETAIL)
+            continue
+        days = [(vessel_id, day) for day in covered_days(start, end)]
+        available = min(room[key] for key in days)
+        if available < reserved:
+            lines.append(line)
+            errors.append(f"Insufficient capacity. Available: {available:.2f}")
+            continue
+        slots.insert(i, (start, end))
+        for key in days:
+            room[key] -= reserved
+    conn.execute(
+        text(
+            """
+            UPDATE import_rows r
+            SET error = x.error
+            FROM unnest(CAST(:lines AS bigint[]), CAST(:errors AS text[]))
+                AS x (line, error)
+            WHERE r.line = x.line
+            """
+        ),
+        {"lines": lines, "errors": errors},
+    )
+
+
+def validate(conn: Connection) -> None:
+    # Timestamps without an offset are taken as UTC, like the capacity days.
+    conn.execute(text("SET LOCAL TimeZone = 'UTC'"))
+    conn.execute(
+        text(
+            f"""
+            CREATE TEMP TABLE import_rows ON COMMIT DROP AS
+            WITH typed AS MATERIALIZED (
+                SELECT raw.*,
+                       {parsed("vessel_id", "integer")},
+                       {parsed("reserved_capacity", "float8")},
+                       {parsed("start_time", "timestamptz")},
+                       {parsed("end_time", "timestamptz")}
+                FROM (SELECT line, malformed, {trimmed(COLUMNS)} FROM import_raw) AS raw
+            )
+            SELECT line,
+                   vessel_id_value AS vessel_id,
+                   reserved_capacity_value AS reserved_capacity,
+                   start_time_value AS start_time,
+                   end_time_value AS end_time,
+                   port_name,
+                   CASE
+                   WHEN malformed IS NOT NULL THEN malformed
+                   WHEN vessel_id IS NULL THEN 'vessel_id is required'
+                   WHEN vessel_id_value IS NULL THEN 'vessel_id must be an integer'
+                   WHEN vessel_id_value <= 0 THEN 'vessel_id must be greater than 0'
+                   WHEN reserved_capacity IS NULL THEN 'reserved_capacity is required'
+                   WHEN reserved_capacity_value IS NULL
+                       THEN 'reserved_capacity must be a number'
+                   WHEN NOT (reserved_capacity_value > 0
+                             AND reserved_capacity_value < 'Infinity')
+                       THEN 'reserved_capacity must be greater than 0'
+                   WHEN start_time IS NULL THEN 'start_time is required'
+                   WHEN start_time_value IS NULL THEN 'start_time must be a timestamp'
+                   WHEN NOT isfinite(start_time_value)
+                       THEN 'start_time must be finite'
+                   WHEN end_time IS NULL THEN 'end_time is required'
+                   WHEN end_time_value IS NULL THEN 'end_time must be a timestamp'
+                   WHEN NOT isfinite(end_time_value) THEN 'end_time must be finite'
+                   WHEN end_time_value <= start_time_value
+                       THEN 'end_time must be after start_time'
+                   WHEN port_name IS NULL
+                        OR port_name <> ALL (CAST(:ports AS text[]))
+                       THEN 'invalid port_name'
+                   END AS error
+            FROM typed
+            """
+        ),
+        {"ports": list(get_args(AVAILABLE_PORTS))},
+    )
+    conn.execute(text("ANALYZE import_rows"))
+    # Share locks keep max_capacity/is_active stable until commit; taken in id
+    # order like BookingService.create_batch so concurrent writers cannot
+    # deadlock with the import.
+    conn.execute(
+        text(
+            """
+            SELECT count(*) FROM (
+                SELECT 1 FROM vessels
+                WHERE id IN (
+                    SELECT vessel_id FROM import_rows WHERE error IS NULL
+                )
+                ORDER BY id
+                FOR SHARE
+            ) AS locked
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            UPDATE import_rows r
+            SET error = 'Vessel ' || r.vessel_id || ' not found'
+            WHERE r.error IS NULL
+              AND NOT EXISTS (SELECT 1 FROM vessels v WHERE v.id = r.vessel_id)
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            UPDATE import_rows r
+            SET error = 'Cannot book inactive vessel'
+            FROM vessels v
+            WHERE r.error IS NULL AND v.id = r.vessel_id AND NOT v.is_active
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            CREATE TEMP TABLE import_days ON COMMIT DROP AS
+            SELECT r.line, r.vessel_id, d::date AS day, r.reserved_capacity
+            FROM import_rows r,
+                 generate_series(
+                     date_trunc('day', r.start_time AT TIME ZONE 'UTC'),
+                     date_trunc(
+                         'day',
+                         (r.end_time - interval '1 microsecond') AT TIME ZONE 'UTC'
+                     ),
+                     interval '1 day'
+                 ) AS d
+            WHERE r.error IS NULL
+            """
+        )
+    )
+    conn.execute(text("ANALYZE import_days"))
+    # Same bucket protocol as CapacityService.lock_buckets: create the missing
+    # days, then lock them in (vessel_id, day) order.
+    conn.execute(
+        text(
+            """
+            INSERT INTO vessel_capacity_buckets (vessel_id, day)
+            SELECT DISTINCT vessel_id, day FROM import_days
+            ORDER BY vessel_id, day
+            ON CONFLICT DO NOTHING
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            SELECT count(*) FROM (
+                SELECT 1 FROM vessel_capacity_buckets
+                WHERE (vessel_id, day) IN (SELECT vessel_id, day FROM import_days)
+                ORDER BY vessel_id, day
+                FOR UPDATE
+            ) AS locked
+            """
+        )
+    )
+    # Checked only now: with the buckets locked, any API booking that overlaps
+    # a line is either committed and visible here, or waits for this import.
+    conn.execute(
+        text(
+            """
+            UPDATE import_rows r
+            SET error = :detail
+            WHERE r.error IS NULL
+              AND EXISTS (
+                  SELECT 1 FROM bookings b
+                  WHERE b.vessel_id = r.vessel_id
+                    AND tstzrange(b.start_time, b.end_time)
+                        && tstzrange(r.start_time, r.end_time)
+              )
+            """
+        ),
+        {"detail": OVERLAP_DETAIL},
+    )
+    _admit_in_file_order(conn)
+
+
+def merge(conn: Connection) -> int:
+    imported = conn.execute(
+        text(
+            """
+            WITH inserted AS (
+                INSERT INTO bookings (
+                    vessel_id, reserved_capacity, start_time, end_time, port_name
+                )
+                SELECT vessel_id, reserved_capacity, start_time, end_time, port_name
+                FROM import_rows
+                WHERE error IS NULL
+                ORDER BY line
+                RETURNING 1
+            )
+            SELECT count(*) FROM inserted
+            """
+        )
+    ).scalar_one()
+    conn.execute(
+        text(
+            """
+            UPDATE vessel_capacity_buckets b
+            SET reserved_capacity = b.reserved_capacity + s.reserved
+            FROM (
+                SELECT d.vessel_id, d.day, sum(d.reserved_capacity) AS reserved
+                FROM import_days d
+                JOIN import_rows r ON r.line = d.line
+                WHERE r.error IS NULL
+                GROUP BY d.vessel_id, d.day
+            ) AS s
+            WHERE b.vessel_id = s.vessel_id AND b.day = s.day
+            """
+        )
+    )
+    return imported
+
+
+booking_import = ImportSpec(COLUMNS, validate, merge)
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 
 import sqlalchemy as sa
-from sqlalchemy import CheckConstraint, ForeignKey, func
+from sqlalchemy import CheckConstraint, ForeignKey, Index, func
 from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -39,7 +39,10 @@ class Booking(Base):
 
     vessel: Mapped["Vessel"] = relationship("Vessel", back_populates="bookings")
     shipments: Mapped[list["Shipment"]] = relationship(
-        "Shipment", back_populates="booking", cascade="all, delete-orphan"
+        "Shipment",
+        back_populates="booking",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     __table_args__ = (
@@ -57,4 +60,5 @@ class Booking(Base):
             name="excl_vessel_no_overlapping_bookings",
             using="gist",
         ),
+        Index("ix_bookings_start_time_id", sa.desc(start_time), sa.desc(id)),
     )
@@ -1,33 +1,103 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database.init import get_db
-from app.features.bookings.schema import BookingCreate, BookingResponse
+from app.core.query_budget import query_budget
+from app.features.bookings.coalescer import booking_coalescer
+from app.features.bookings.schema import (
+    BookingBatchCreate,
+    BookingBatchItemResult,
+    BookingBatchResponse,
+    BookingCreate,
+    BookingResponse,
+)
 from app.features.bookings.service import BookingService
-from app.shared.api_response import api_response
+from app.shared.api_response import api_json_response
+from app.shared.etag import etag_matches, item_etag, not_modified
+from app.shared.export import ExportFormat, export_response
+from app.shared.pagination import PageParams
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
 
 
-@router.get("/", response_model=dict)
-def list_bookings(db: Session = Depends(get_db)):
-    bookings = BookingService.list_all(db)
-    data = [BookingResponse.model_validate(b) for b in bookings]
-    return api_response(data)
+@router.get("/", response_model=dict, dependencies=[query_budget(1)])
+async def list_bookings(
+    page: PageParams = Depends(),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    bookings, next_cursor, etag = await BookingService.list_all(
+        db, page.limit, page.cursor
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return api_json_response(
+        bookings, BookingResponse, headers={"ETag": etag}, next_cursor=next_cursor
+    )
+
+
+@router.get("/export")
+async def export_bookings(fmt: ExportFormat = Query("ndjson", alias="format")):
+    return export_response(BookingService.export_stmt(), "bookings", fmt)
+
+
+@router.get("/{booking_id}", response_model=dict, dependencies=[query_budget(1)])
+async def get_booking(
+    booking_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    booking = await BookingService.get_by_id(db, booking_id)
+    etag = item_etag(booking)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return api_json_response(booking, BookingResponse, headers={"ETag": etag})
 
 
-@router.get("/{booking_id}", response_model=dict)
-def get_booking(booking_id: int, db: Session = Depends(get_db)):
-    booking = BookingService.get_by_id(db, booking_id)
-    return api_response(BookingResponse.model_validate(booking))
+@router.post(
+    "/",
+    response_model=dict,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[query_budget(3)],
+)
+async def create_booking(payload: BookingCreate, db: AsyncSession = Depends(get_db)):
+    if booking_coalescer is not None:
+        booking = await booking_coalescer.submit(payload)
+    else:
+        booking = await BookingService.create(db, payload)
+    return api_json_response(
+        booking, BookingResponse, status_code=status.HTTP_201_CREATED
+    )
 
 
-@router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
-def create_booking(payload: BookingCreate, db: Session = Depends(get_db)):
-    booking = BookingService.create(db, payload)
-    return api_response(BookingResponse.model_validate(booking))
+@router.post("/batch", response_model=dict, dependencies=[query_budget(6)])
+async def create_bookings_batch(
+    payload: BookingBatchCreate, db: AsyncSession = Depends(get_db)
+):
+    outcomes = await BookingService.create_batch(db, payload)
+    results = [
+        BookingBatchItemResult(
+            index=i,
+            status_code=code,
+            booking=BookingResponse.model_validate(booking) if booking else None,
+            error=error,
+        )
+        for i, (code, booking, error) in enumerate(outcomes)
+    ]
+    created = sum(1 for r in results if r.booking is not None)
+    return api_json_response(
+        BookingBatchResponse(
+            created=created, failed=len(results) - created, results=results
+        )
+    )
 
 
-@router.delete("/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_booking(booking_id: int, db: Session = Depends(get_db)):
-    BookingService.delete(db, booking_id)
+@router.delete(
+    "/{booking_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[query_budget(4)],
+)
+async def delete_booking(booking_id: int, db: AsyncSession = Depends(get_db)):
+    await BookingService.delete(db, booking_id)
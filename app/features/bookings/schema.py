@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field, model_validator
 
@@ -32,3 +33,31 @@ class BookingResponse(BaseModel):
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+MAX_BATCH_SIZE = 500
+
+BatchMode = Literal["all_or_nothing", "best_effort"]
+
+
+class BookingBatchCreate(BaseModel):
+    items: List[BookingCreate] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_SIZE, description="Bookings to create"
+    )
+    mode: BatchMode = Field(
+        "all_or_nothing",
+        description="all_or_nothing rejects the whole batch if any item fails",
+    )
+
+
+class BookingBatchItemResult(BaseModel):
+    index: int
+    status_code: int
+    booking: Optional[BookingResponse] = None
+    error: Optional[str] = None
+
+
+class BookingBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BookingBatchItemResult]
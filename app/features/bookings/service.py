@@ -1,19 +1,89 @@
-from typing import List
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
 
+import sqlalchemy as sa
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Select, exists, func, insert, select, text, tuple_
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.features.bookings.model import Booking
-from app.features.bookings.schema import BookingCreate
+from app.features.bookings.schema import BookingBatchCreate, BookingCreate
+from app.features.capacity.model import VesselCapacityBucket
+from app.features.capacity.service import CapacityService, covered_days
 from app.features.vessels.model import Vessel
+from app.shared.etag import page_etag
+from app.shared.pagination import decode_cursor, split_page
+
+OVERLAP_DETAIL = "Vessel has overlapping booking for this time range"
+
+# Charges the covered day buckets and inserts the booking in one statement.
+# The upsert takes the bucket locks in day order, like
+# CapacityService.lock_buckets, and re-checks each bucket against its latest
+# committed value before adding to it. The booking row is only inserted if
+# every day was charged; otherwise the caller rolls the partial charge back.
+# The share lock on the vessel keeps max_capacity/is_active stable until
+# commit.
+CREATE_BOOKING = text(
+    """
+    WITH vessel AS (
+        SELECT id, max_capacity FROM vessels
+        WHERE id = :vessel_id AND is_active
+        FOR SHARE
+    ), reserved AS (
+        INSERT INTO vessel_capacity_buckets AS b (vessel_id, day, reserved_capacity)
+        SELECT vessel.id, days.day, CAST(:reserved_capacity AS float8)
+        FROM vessel, unnest(CAST(:days AS date[])) AS days (day)
+        WHERE vessel.max_capacity >= :reserved_capacity
+        ORDER BY days.day
+        ON CONFLICT (vessel_id, day) DO UPDATE
+        SET reserved_capacity = b.reserved_capacity + excluded.reserved_capacity
+        WHERE b.reserved_capacity + excluded.reserved_capacity
+              <= (SELECT max_capacity FROM vessel)
+        RETURNING b.day
+    )
+    INSERT INTO bookings (
+        vessel_id, reserved_capacity, start_time, end_time, port_name
+    )
+    SELECT :vessel_id, :reserved_capacity, :start_time, :end_time, :port_name
+    WHERE (SELECT count(*) FROM reserved) = cardinality(CAST(:days AS date[]))
+    RETURNING *
+    """
+)
+
+# (status_code, booking, error) for one item of a batch request.
+BatchOutcome = Tuple[int, Optional[Booking], Optional[str]]
+
+
+def _is_overlap_violation(e: IntegrityError) -> bool:
+    err_msg = str(e.orig) if e.orig else str(e)
+    return "excl_vessel_no_overlapping_bookings" in err_msg
+
+
+async def _overlapping_items(db: AsyncSession, items: List[BookingCreate]) -> set:
+    """Return indexes of items that overlap a booking already in the database."""
+    candidates = sa.values(
+        sa.column("idx", sa.Integer),
+        sa.column("vessel_id", sa.Integer),
+        sa.column("start_time", sa.DateTime(timezone=True)),
+        sa.column("end_time", sa.DateTime(timezone=True)),
+        name="candidates",
+    ).data([(i, b.vessel_id, b.start_time, b.end_time) for i, b in enumerate(items)])
+    overlap = exists().where(
+        Booking.vessel_id == candidates.c.vessel_id,
+        func.tstzrange(Booking.start_time, Booking.end_time).op("&&")(
+            func.tstzrange(candidates.c.start_time, candidates.c.end_time)
+        ),
+    )
+    result = await db.execute(select(candidates.c.idx).where(overlap))
+    return set(result.scalars().all())
 
 
 class BookingService:
     @staticmethod
-    def get_or_404(db: Session, booking_id: int) -> Booking:
-        booking = db.get(Booking, booking_id)
+    async def get_or_404(db: AsyncSession, booking_id: int) -> Booking:
+        booking = await db.get(Booking, booking_id)
         if booking is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -22,64 +92,229 @@ class BookingService:
         return booking
 
     @staticmethod
-    def list_all(db: Session) -> List[Booking]:
-        stmt = select(Booking).order_by(Booking.start_time.desc())
-        result = db.execute(stmt)
-        return list(result.scalars().all())
+    def _page_stmt(limit: int, cursor: Optional[str], *columns) -> Select:
+        stmt = (
+            select(*columns)
+            .order_by(Booking.start_time.desc(), Booking.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            start_time, last_id = decode_cursor(cursor, datetime.fromisoformat, int)
+            stmt = stmt.where(
+                tuple_(Booking.start_time, Booking.id) < (start_time, last_id)
+            )
+        return stmt
+
+    @staticmethod
+    async def list_all(
+        db: AsyncSession, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Booking], Optional[str], str]:
+        result = await db.execute(BookingService._page_stmt(limit, cursor, Booking))
+        rows = list(result.scalars().all())
+        page, next_cursor = split_page(rows, limit, lambda b: [b.start_time, b.id])
+        return page, next_cursor, page_etag(rows)
 
     @staticmethod
-    def get_by_id(db: Session, booking_id: int) -> Booking:
-        return BookingService.get_or_404(db, booking_id)
+    def export_stmt() -> Select:
+        return select(Booking.__table__).order_by(Booking.id)
 
     @staticmethod
-    def create(db: Session, payload: BookingCreate) -> Booking:
-        stmt = select(Vessel).where(Vessel.id == payload.vessel_id).with_for_update()
-        vessel = db.execute(stmt).scalar_one_or_none()
+    async def get_by_id(db: AsyncSession, booking_id: int) -> Booking:
+        return await BookingService.get_or_404(db, booking_id)
 
+    @staticmethod
+    async def _rejection(db: AsyncSession, payload: BookingCreate) -> HTTPException:
+        """Explain why ``create`` reserved nothing; runs after its rollback."""
+        vessel = (
+            await db.execute(
+                select(Vessel.is_active, Vessel.max_capacity).where(
+                    Vessel.id == payload.vessel_id
+                )
+            )
+        ).one_or_none()
         if vessel is None:
-            raise HTTPException(
+            return HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Vessel {payload.vessel_id} not found",
             )
         if not vessel.is_active:
-            raise HTTPException(
+            return HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot book inactive vessel",
             )
-
-        new_total = vessel.current_reserved_capacity + payload.reserved_capacity
-        if new_total > vessel.max_capacity:
-            available = vessel.max_capacity - vessel.current_reserved_capacity
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Insufficient capacity. Available: {available:.2f}",
+        days = covered_days(payload.start_time, payload.end_time)
+        peak = (
+            await db.execute(
+                select(func.max(VesselCapacityBucket.reserved_capacity)).where(
+                    VesselCapacityBucket.vessel_id == payload.vessel_id,
+                    VesselCapacityBucket.day.in_(days),
+                )
             )
+        ).scalar() or 0.0
+        available = vessel.max_capacity - peak
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Insufficient capacity. Available: {available:.2f}",
+        )
 
-        booking = Booking(**payload.model_dump())
-        db.add(booking)
-        vessel.current_reserved_capacity = new_total
+    @staticmethod
+    async def create(db: AsyncSession, payload: BookingCreate) -> Booking:
+        days = covered_days(payload.start_time, payload.end_time)
+        stmt = select(Booking).from_statement(CREATE_BOOKING)
+        params = {**payload.model_dump(), "days": days}
 
         try:
-            db.commit()
-            db.refresh(booking)
+            booking = (await db.scalars(stmt, params)).one_or_none()
+            if booking is None:
+                await db.rollback()
+                raise await BookingService._rejection(db, payload)
+            await db.commit()
         except IntegrityError as e:
-            db.rollback()
-            err_msg = str(e.orig) if e.orig else str(e)
-            if "excl_vessel_no_overlapping_bookings" in err_msg:
+            await db.rollback()
+            if _is_overlap_violation(e):
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
-                    detail="Vessel has overlapping booking for this time range",
+                    detail=OVERLAP_DETAIL,
                 )
             raise
 
         return booking
 
     @staticmethod
-    def delete(db: Session, booking_id: int) -> None:
-        booking = BookingService.get_or_404(db, booking_id)
-        vessel = booking.vessel
-        vessel.current_reserved_capacity = max(
-            0, vessel.current_reserved_capacity - booking.reserved_capacity
+    async def create_batch(
+        db: AsyncSession, payload: BookingBatchCreate
+    ) -> List[BatchOutcome]:
+        items = payload.items
+        vessel_ids = sorted({item.vessel_id for item in items})
+        # Locking in id order keeps concurrent batches from deadlocking.
+        stmt = (
+            select(Vessel)
+            .where(Vessel.id.in_(vessel_ids))
+            .order_by(Vessel.id)
+            .with_for_update(read=True)
+        )
+        vessels = {v.id: v for v in (await db.execute(stmt)).scalars().all()}
+        reserved = await CapacityService.lock_buckets(
+            db,
+            [
+                (item.vessel_id, item.start_time, item.end_time)
+                for item in items
+                if item.vessel_id in vessels and vessels[item.vessel_id].is_active
+            ],
+        )
+        # Only checked under the bucket locks: an overlapping booking shares a
+        # day with its item, so it is either committed and visible here or
+        # waiting for this transaction. Checked before, it could commit in
+        # between and fail the whole insert instead of one item.
+        overlapping = await _overlapping_items(db, items)
+        deltas: Dict[Tuple[int, date], float] = defaultdict(float)
+        accepted_ranges: Dict[int, list] = defaultdict(list)
+        outcomes: List[BatchOutcome] = []
+        accepted: List[int] = []
+
+        for i, item in enumerate(items):
+            vessel = vessels.get(item.vessel_id)
+            if vessel is None:
+                outcomes.append(
+                    (
+                        status.HTTP_404_NOT_FOUND,
+                        None,
+                        f"Vessel {item.vessel_id} not found",
+                    )
+                )
+                continue
+            if not vessel.is_active:
+                outcomes.append(
+                    (status.HTTP_400_BAD_REQUEST, None, "Cannot book inactive vessel")
+                )
+                continue
+            if i in overlapping or any(
+                item.start_time < end and start < item.end_time
+                for start, end in accepted_ranges[vessel.id]
+            ):
+                outcomes.append((status.HTTP_409_CONFLICT, None, OVERLAP_DETAIL))
+                continue
+            days = covered_days(item.start_time, item.end_time)
+            peak = CapacityService.peak(reserved, vessel.id, days)
+            if peak + item.reserved_capacity > vessel.max_capacity:
+                available = vessel.max_capacity - peak
+                outcomes.append(
+                    (
+                        status.HTTP_409_CONFLICT,
+                        None,
+                        f"Insufficient capacity. Available: {available:.2f}",
+                    )
+                )
+                continue
+            for day in days:
+                reserved[(vessel.id, day)] += item.reserved_capacity
+                deltas[(vessel.id, day)] += item.reserved_capacity
+            accepted_ranges[vessel.id].append((item.start_time, item.end_time))
+            accepted.append(i)
+            outcomes.append((status.HTTP_201_CREATED, None, None))
+
+        failed = len(items) - len(accepted)
+        if not accepted or (failed and payload.mode == "all_or_nothing"):
+            await db.rollback()
+            return [
+                (
+                    (status.HTTP_424_FAILED_DEPENDENCY, None, "Batch rejected")
+                    if code == status.HTTP_201_CREATED
+                    else (code, booking, error)
+                )
+                for code, booking, error in outcomes
+            ]
+
+        rows = [items[i].model_dump() for i in accepted]
+        try:
+            bookings = (
+                await db.scalars(
+                    insert(Booking).returning(Booking, sort_by_parameter_order=True),
+                    rows,
+                )
+            ).all()
+            await CapacityService.apply(db, deltas)
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if _is_overlap_violation(e):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=OVERLAP_DETAIL,
+                )
+            raise
+
+        for i, booking in zip(accepted, bookings):
+            outcomes[i] = (status.HTTP_201_CREATED, booking, None)
+        return outcomes
+
+    @staticmethod
+    async def delete(db: AsyncSession, booking_id: int) -> None:
+        # Deleting first takes the row lock: a concurrent delete of the same
+        # booking waits, then gets no row back and a 404 instead of releasing
+        # the capacity a second time.
+        deleted = (
+            await db.execute(
+                sa.delete(Booking)
+                .where(Booking.id == booking_id)
+                .returning(
+                    Booking.vessel_id,
+                    Booking.start_time,
+                    Booking.end_time,
+                    Booking.reserved_capacity,
+                )
+                .execution_options(synchronize_session=False)
+            )
+        ).one_or_none()
+        if deleted is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Booking {booking_id} not found",
+            )
+        vessel_id, start_time, end_time, reserved_capacity = deleted
+        span = (vessel_id, start_time, end_time)
+        await CapacityService.lock_buckets(db, [span])
+        await CapacityService.apply(
+            db, CapacityService.span_deltas([(span, -reserved_capacity)])
         )
-        db.delete(booking)
-        db.commit()
+        await db.commit()
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import CheckConstraint, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database.init import Base
+
+
+class VesselCapacityBucket(Base):
+    """Capacity reserved on a vessel for one UTC day."""
+
+    __tablename__ = "vessel_capacity_buckets"
+
+    vessel_id: Mapped[int] = mapped_column(
+        ForeignKey("vessels.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day: Mapped[date] = mapped_column(primary_key=True)
+    reserved_capacity: Mapped[float] = mapped_column(
+        nullable=False, default=0.0, server_default="0"
+    )
+
+    __table_args__ = (
+        CheckConstraint(
+            "reserved_capacity >= 0",
+            name="check_bucket_reserved_non_negative",
+        ),
+    )
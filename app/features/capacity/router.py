@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database.init import get_db
+from app.core.query_budget import query_budget
+from app.features.capacity.schema import (
+    CapacityDayResponse,
+    CapacityWindowQuery,
+    CapacityWindowResponse,
+)
+from app.features.capacity.service import CapacityService
+from app.features.vessels.service import VesselService
+from app.shared.api_response import api_json_response
+
+router = APIRouter(prefix="/vessels", tags=["capacity"])
+
+
+@router.get(
+    "/{vessel_id}/capacity", response_model=dict, dependencies=[query_budget(2)]
+)
+async def get_vessel_capacity(
+    vessel_id: int,
+    query: CapacityWindowQuery = Query(),
+    db: AsyncSession = Depends(get_db),
+):
+    vessel = await VesselService.get_or_404(db, vessel_id)
+    window = await CapacityService.get_window(db, vessel_id, query.start, query.end)
+    days = [
+        CapacityDayResponse(
+            day=day,
+            reserved_capacity=reserved,
+            free_capacity=vessel.max_capacity - reserved,
+        )
+        for day, reserved in window.items()
+    ]
+    peak = max(d.reserved_capacity for d in days)
+    return api_json_response(
+        CapacityWindowResponse(
+            vessel_id=vessel_id,
+            max_capacity=vessel.max_capacity,
+            peak_reserved_capacity=peak,
+            min_free_capacity=vessel.max_capacity - peak,
+            days=days,
+        )
+    )
@@ -0,0 +1,33 @@
+from datetime import date
+from typing import List
+
+from pydantic import BaseModel, Field, model_validator
+
+MAX_WINDOW_DAYS = 366
+
+
+class CapacityWindowQuery(BaseModel):
+    start: date = Field(..., description="First day (UTC) of the window")
+    end: date = Field(..., description="Last day (UTC) of the window, inclusive")
+
+    @model_validator(mode="after")
+    def validate_window(self):
+        if self.end < self.start:
+            raise ValueError("end must not be before start")
+        if (self.end - self.start).days >= MAX_WINDOW_DAYS:
+            raise ValueError(f"window cannot exceed {MAX_WINDOW_DAYS} days")
+        return self
+
+
+class CapacityDayResponse(BaseModel):
+    day: date
+    reserved_capacity: float
+    free_capacity: float
+
+
+class CapacityWindowResponse(BaseModel):
+    vessel_id: int
+    max_capacity: float
+    peak_reserved_capacity: float
+    min_free_capacity: float
+    days: List[CapacityDayResponse]
@@ -0,0 +1,135 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.features.capacity.model import VesselCapacityBucket
+
+BucketKey = Tuple[int, date]
+# (vessel_id, start_time, end_time) of a booking.
+Span = Tuple[int, datetime, datetime]
+
+# Bucket keys travel as parallel arrays, so a statement has the same three or
+# four bind parameters however many days and vessels it covers; one parameter
+# per key would run into asyncpg's 32767-argument limit on long bookings and
+# large batches.
+CREATE_BUCKETS = text(
+    """
+    INSERT INTO vessel_capacity_buckets (vessel_id, day)
+    SELECT * FROM unnest(CAST(:vessel_ids AS integer[]), CAST(:days AS date[]))
+    ON CONFLICT DO NOTHING
+    """
+)
+LOCK_BUCKETS = text(
+    """
+    SELECT b.vessel_id, b.day, b.reserved_capacity
+    FROM vessel_capacity_buckets AS b
+    JOIN unnest(CAST(:vessel_ids AS integer[]), CAST(:days AS date[]))
+        AS k (vessel_id, day) USING (vessel_id, day)
+    ORDER BY b.vessel_id, b.day
+    FOR UPDATE OF b
+    """
+)
+APPLY_DELTAS = text(
+    """
+    UPDATE vessel_capacity_buckets AS b
+    SET reserved_capacity = greatest(0, b.reserved_capacity + c.delta)
+    FROM unnest(
+        CAST(:vessel_ids AS integer[]),
+        CAST(:days AS date[]),
+        CAST(:deltas AS float8[])
+    ) AS c (vessel_id, day, delta)
+    WHERE b.vessel_id = c.vessel_id AND b.day = c.day
+    """
+)
+
+
+def _utc_day(value: datetime) -> date:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def covered_days(start: datetime, end: datetime) -> List[date]:
+    """UTC days touched by the half-open interval ``[start, end)``."""
+    first = _utc_day(start)
+    last = _utc_day(end - timedelta(microseconds=1))
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+class CapacityService:
+    @staticmethod
+    async def lock_buckets(
+        db: AsyncSession, spans: Iterable[Span]
+    ) -> Dict[BucketKey, float]:
+        """Create any missing buckets for ``spans`` and lock them for update.
+
+        Rows are locked in (vessel_id, day) order so concurrent bookings
+        touching overlapping buckets cannot deadlock.
+        """
+        keys = sorted(
+            {
+                (vessel_id, day)
+                for vessel_id, start, end in spans
+                for day in covered_days(start, end)
+            }
+        )
+        if not keys:
+            return {}
+        params = {
+            "vessel_ids": [v for v, _ in keys],
+            "days": [d for _, d in keys],
+        }
+        await db.execute(CREATE_BUCKETS, params)
+        result = await db.execute(LOCK_BUCKETS, params)
+        return {(v, d): reserved for v, d, reserved in result.all()}
+
+    @staticmethod
+    def peak(
+        reserved: Dict[BucketKey, float], vessel_id: int, days: Iterable[date]
+    ) -> float:
+        return max(reserved.get((vessel_id, day), 0.0) for day in days)
+
+    @staticmethod
+    async def apply(db: AsyncSession, deltas: Dict[BucketKey, float]) -> None:
+        """Add ``deltas`` to already-locked buckets in one UPDATE."""
+        if not deltas:
+            return
+        changes = sorted(deltas.items())
+        await db.execute(
+            APPLY_DELTAS,
+            {
+                "vessel_ids": [v for (v, _), _ in changes],
+                "days": [d for (_, d), _ in changes],
+                "deltas": [delta for _, delta in changes],
+            },
+        )
+
+    @staticmethod
+    def span_deltas(spans: Iterable[Tuple[Span, float]]) -> Dict[BucketKey, float]:
+        deltas: Dict[BucketKey, float] = defaultdict(float)
+        for (vessel_id, start, end), amount in spans:
+            for day in covered_days(start, end):
+                deltas[(vessel_id, day)] += amount
+        return deltas
+
+    @staticmethod
+    async def get_window(
+        db: AsyncSession, vessel_id: int, start: date, end: date
+    ) -> Dict[date, float]:
+        result = await db.execute(
+            select(VesselCapacityBucket.day, VesselCapacityBucket.reserved_capacity)
+            .where(
+                VesselCapacityBucket.vessel_id == vessel_id,
+                VesselCapacityBucket.day.between(start, end),
+            )
+            .order_by(VesselCapacityBucket.day)
+        )
+        reserved = dict(result.all())
+        days = (end - start).days + 1
+        return {
+            start + timedelta(days=i): reserved.get(start + timedelta(days=i), 0.0)
+            for i in range(days)
+        }
@@ -0,0 +1,247 @@
+import asyncio
+import heapq
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import ROUTE_GRAPH_MAX_AGE_SECONDS
+from app.features.routes.model import Leg
+
+LEG_COLUMNS = (
+    Leg.id,
+    Leg.route_id,
+    Leg.sequence,
+    Leg.origin_port,
+    Leg.destination_port,
+    Leg.vessel_id,
+)
+
+
+class LegRef(NamedTuple):
+    id: int
+    route_id: int
+    sequence: int
+    origin_port: str
+    destination_port: str
+    vessel_id: Optional[int]
+
+
+class Hop(NamedTuple):
+    origin_port: str
+    destination_port: str
+    leg_count: int
+    options: List[LegRef]
+
+
+class PortPath(NamedTuple):
+    hops: int
+    ports: List[str]
+    legs: List[Hop]
+
+
+class _Edge:
+    __slots__ = ("legs", "assigned", "_options")
+
+    def __init__(self) -> None:
+        self.legs: Dict[int, LegRef] = {}
+        self.assigned = 0
+        self._options: Dict[Tuple[bool, int], List[LegRef]] = {}
+
+    def add(self, leg: LegRef) -> None:
+        self.legs[leg.id] = leg
+        if leg.vessel_id is not None:
+            self.assigned += 1
+        self._options.clear()
+
+    def remove(self, leg: LegRef) -> None:
+        del self.legs[leg.id]
+        if leg.vessel_id is not None:
+            self.assigned -= 1
+        self._options.clear()
+
+    def options(self, vessel_assigned: bool, n: int) -> List[LegRef]:
+        """Up to ``n`` legs, assigned ones first; memoized until the edge changes."""
+        key = (vessel_assigned, n)
+        options = self._options.get(key)
+        if options is None:
+            candidates: Iterable[LegRef] = self.legs.values()
+            if vessel_assigned:
+                candidates = (leg for leg in candidates if leg.vessel_id is not None)
+            options = self._options[key] = heapq.nsmallest(
+                n, candidates, key=lambda leg: (leg.vessel_id is None, leg.id)
+            )
+        return options
+
+
+class RouteGraph:
+    """Per-worker adjacency index of legs, keyed by origin and destination port.
+
+    Writes and ``routes`` invalidations only mark a route dirty; ``sync``
+    re-reads the legs of dirty routes before the next search. While no
+    invalidation listener is running (it is down, or ``CACHE_ENABLED`` is off)
+    other workers' writes go unnoticed, so the index is also reloaded in full
+    once it is ``max_age`` seconds old; this worker's own writes still apply
+    at the next search.
+    """
+
+    def __init__(self, name: str, max_age: float) -> None:
+        self.name = name
+        self.max_age = max_age
+        self.active = False
+        self._loaded_at = 0.0
+        self._edges: Dict[str, Dict[str, _Edge]] = {}
+        self._route_legs: Dict[int, List[LegRef]] = {}
+        self._dirty: Set[int] = set()
+        self._stale = True
+        self._lock: Optional[asyncio.Lock] = None
+        self.rebuilds = 0
+        self.refreshes = 0
+
+    def invalidate(self, route_id: int) -> None:
+        self._dirty.add(route_id)
+
+    def clear(self) -> None:
+        self._stale = True
+
+    def load(self, legs: Iterable[LegRef]) -> None:
+        self._edges = {}
+        self._route_legs = {}
+        for leg in legs:
+            self._route_legs.setdefault(leg.route_id, []).append(leg)
+            self._add(leg)
+
+    def replace_route(self, route_id: int, legs: List[LegRef]) -> None:
+        for leg in self._route_legs.pop(route_id, ()):
+            edge = self._edges[leg.origin_port][leg.destination_port]
+            edge.remove(leg)
+            if not edge.legs:
+                del self._edges[leg.origin_port][leg.destination_port]
+        if legs:
+            self._route_legs[route_id] = legs
+            for leg in legs:
+                self._add(leg)
+
+    def _add(self, leg: LegRef) -> None:
+        dests = self._edges.setdefault(leg.origin_port, {})
+        edge = dests.get(leg.destination_port)
+        if edge is None:
+            edge = dests[leg.destination_port] = _Edge()
+        edge.add(leg)
+
+    async def sync(self, db: AsyncSession) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            try:
+                expired = (
+                    not self.active
+                    and time.monotonic() - self._loaded_at >= self.max_age
+                )
+                if self._stale or expired:
+                    self._stale = False
+                    self._dirty.clear()
+                    result = await db.execute(select(*LEG_COLUMNS))
+                    self.load(LegRef(*row) for row in result)
+                    self._loaded_at = time.monotonic()
+                    self.rebuilds += 1
+                elif self._dirty:
+                    route_ids, self._dirty = self._dirty, set()
+                    result = await db.execute(
+                        select(*LEG_COLUMNS)
+                        .where(Leg.route_id.in_(list(route_ids)))
+                        .order_by(Leg.route_id, Leg.sequence)
+                    )
+                    legs: Dict[int, List[LegRef]] = {rid: [] for rid in route_ids}
+                    for row in result:
+                        legs[row.route_id].append(LegRef(*row))
+                    for route_id, route_legs in legs.items():
+                        self.replace_route(route_id, route_legs)
+                    self.refreshes += 1
+            except BaseException:
+                self._stale = True
+                raise
+
+    def search(
+        self,
+        origin: str,
+        destination: str,
+        max_legs: int,
+        vessel_assigned: bool = False,
+        limit: int = 10,
+        options_per_hop: int = 5,
+    ) -> List[PortPath]:
+        """Simple port paths from ``origin`` to ``destination``, fewest hops first."""
+        usable: Dict[str, List[str]] = {
+            port: sorted(
+                dest
+                for dest, edge in dests.items()
+                if (edge.assigned if vessel_assigned else edge.legs)
+            )
+            for port, dests in self._edges.items()
+        }
+        # Hops left to the destination, to prune walks that cannot reach it.
+        reverse: Dict[str, List[str]] = {}
+        for port, dests in usable.items():
+            for dest in dests:
+                reverse.setdefault(dest, []).append(port)
+        distance = {destination: 0}
+        queue = deque([destination])
+        while queue:
+            port = queue.popleft()
+            for prev in reverse.get(port, ()):
+                if prev not in distance:
+                    distance[prev] = distance[port] + 1
+                    queue.append(prev)
+        if origin not in distance:
+            return []
+
+        paths: List[Tuple[str, ...]] = []
+
+        def walk(path: List[str], remaining: int) -> None:
+            if remaining == 0:
+                paths.append(tuple(path))
+                return
+            for dest in usable.get(path[-1], ()):
+                if len(paths) >= limit:
+                    return
+                if dest in path or distance.get(dest, max_legs + 1) > remaining - 1:
+                    continue
+                if dest == destination and remaining > 1:
+                    continue
+                path.append(dest)
+                walk(path, remaining - 1)
+                path.pop()
+
+        for hops in range(distance[origin], max_legs + 1):
+            walk([origin], hops)
+            if len(paths) >= limit:
+                break
+        return [self._describe(p, vessel_assigned, options_per_hop) for p in paths]
+
+    def _describe(
+        self, ports: Tuple[str, ...], vessel_assigned: bool, options_per_hop: int
+    ) -> PortPath:
+        legs = []
+        for origin, dest in zip(ports, ports[1:]):
+            edge = self._edges[origin][dest]
+            count = edge.assigned if vessel_assigned else len(edge.legs)
+            options = edge.options(vessel_assigned, options_per_hop)
+            legs.append(Hop(origin, dest, count, options))
+        return PortPath(len(legs), list(ports), legs)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "max_age_seconds": self.max_age,
+            "routes": len(self._route_legs),
+            "legs": sum(len(legs) for legs in self._route_legs.values()),
+            "dirty": len(self._dirty),
+            "rebuilds": self.rebuilds,
+            "refreshes": self.refreshes,
+        }
+
+
+route_graph = RouteGraph("route_graph", ROUTE_GRAPH_MAX_AGE_SECONDS)
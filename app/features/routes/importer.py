@@ -0,0 +1,171 @@
+from typing import get_args
+
+from sqlalchemy import Connection, text
+
+from app.core.cache import INVALIDATION_CHANNEL
+from app.core.database.bulk_import import ImportSpec, parsed, trimmed
+from app.features.routes.service import route_cache
+from app.shared.ports import AVAILABLE_PORTS
+
+# One line per leg; legs sharing a route_name form one new route.
+COLUMNS = ("route_name", "sequence", "origin_port", "destination_port", "vessel_id")
+
+
+def validate(conn: Connection) -> None:
+    conn.execute(
+        text(
+            f"""
+            CREATE TEMP TABLE import_rows ON COMMIT DROP AS
+            WITH typed AS MATERIALIZED (
+                SELECT raw.*,
+                       {parsed("sequence", "integer")},
+                       {parsed("vessel_id", "integer")}
+                FROM (SELECT line, malformed, {trimmed(COLUMNS)} FROM import_raw) AS raw
+            )
+            SELECT line, route_name,
+                   sequence_value AS sequence,
+                   origin_port, destination_port,
+                   vessel_id_value AS vessel_id,
+                   CASE
+                   WHEN malformed IS NOT NULL THEN malformed
+                   WHEN route_name IS NULL OR length(route_name) > 255
+                       THEN 'route_name must be 1-255 characters'
+                   WHEN sequence IS NULL THEN 'sequence is required'
+                   WHEN sequence_value IS NULL THEN 'sequence must be an integer'
+                   WHEN sequence_value < 0
+                       THEN 'sequence must be greater than or equal to 0'
+                   WHEN origin_port IS NULL
+                        OR origin_port <> ALL (CAST(:ports AS text[]))
+                       THEN 'invalid origin_port'
+                   WHEN destination_port IS NULL
+                        OR destination_port <> ALL (CAST(:ports AS text[]))
+                       THEN 'invalid destination_port'
+                   WHEN origin_port = destination_port
+                       THEN 'origin_port and destination_port must be different'
+                   WHEN vessel_id IS NOT NULL AND vessel_id_value IS NULL
+                       THEN 'vessel_id must be an integer'
+                   WHEN vessel_id_value <= 0 THEN 'vessel_id must be greater than 0'
+                   END AS error
+            FROM typed
+            """
+        ),
+        {"ports": list(get_args(AVAILABLE_PORTS))},
+    )
+    conn.execute(text("ANALYZE import_rows"))
+    # Keeps the assigned vessels from being deleted before the legs land.
+    conn.execute(
+        text(
+            """
+            SELECT count(*) FROM (
+                SELECT 1 FROM vessels
+                WHERE id IN (
+                    SELECT vessel_id FROM import_rows WHERE error IS NULL
+                )
+                ORDER BY id
+                FOR KEY SHARE
+            ) AS locked
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            UPDATE import_rows r
+            SET error = 'Vessel with id ' || r.vessel_id || ' not found'
+            WHERE r.error IS NULL
+              AND r.vessel_id IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM vessels v WHERE v.id = r.vessel_id)
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            UPDATE import_rows r
+            SET error = 'duplicate sequence ' || r.sequence || ' in route'
+            FROM (
+                SELECT line,
+                       min(line) OVER (PARTITION BY route_name, sequence)
+                           AS first_line
+                FROM import_rows
+                WHERE error IS NULL
+            ) AS d
+            WHERE r.line = d.line AND d.line <> d.first_line
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            UPDATE import_rows r
+            SET error = 'Leg ' || r.sequence || ': origin_port must match '
+                        || 'previous leg''s destination_port ('
+                        || c.previous_port || ' -> ' || r.origin_port || ')'
+            FROM (
+                SELECT line,
+                       lag(destination_port) OVER (
+                           PARTITION BY route_name ORDER BY sequence
+                       ) AS previous_port
+                FROM import_rows
+                WHERE error IS NULL
+            ) AS c
+            WHERE r.line = c.line AND c.previous_port <> r.origin_port
+            """
+        )
+    )
+    # Routes are imported whole or not at all.
+    conn.execute(
+        text(
+            """
+            UPDATE import_rows
+            SET error = 'route has rejected legs'
+            WHERE error IS NULL
+              AND route_name IN (
+                  SELECT route_name FROM import_rows WHERE error IS NOT NULL
+              )
+            """
+        )
+    )
+
+
+def merge(conn: Connection) -> int:
+    """Insert the routes and their legs; returns the number of legs imported.
+
+    Each new route is announced on the invalidation channel, as
+    ``RouteService.create`` does, so running workers add it to their route
+    graph.
+    """
+    return conn.execute(
+        text(
+            """
+            WITH new_routes AS (
+                INSERT INTO routes (name)
+                SELECT route_name
+                FROM import_rows
+                WHERE error IS NULL
+                GROUP BY route_name
+                ORDER BY min(line)
+                RETURNING id, name
+            ), new_legs AS (
+                INSERT INTO legs (
+                    route_id, sequence, origin_port, destination_port, vessel_id
+                )
+                SELECT n.id, r.sequence, r.origin_port, r.destination_port,
+                       r.vessel_id
+                FROM import_rows r
+                JOIN new_routes n ON n.name = r.route_name
+                WHERE r.error IS NULL
+                ORDER BY n.id, r.sequence
+                RETURNING 1
+            ), notice AS (
+                SELECT count(pg_notify(:channel, :prefix || id)) FROM new_routes
+            )
+            SELECT (SELECT count(*) FROM new_legs)
+            FROM notice
+            """
+        ),
+        {"channel": INVALIDATION_CHANNEL, "prefix": f"{route_cache.name}:"},
+    ).scalar_one()
+
+
+route_import = ImportSpec(COLUMNS, validate, merge)
@@ -1,39 +1,120 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database.init import get_db
-from app.features.routes.schema import RouteCreate, RouteResponse, RouteUpdate
+from app.core.query_budget import query_budget
+from app.features.routes.schema import (
+    LegCreate,
+    LegResponse,
+    LegUpdate,
+    RouteCreate,
+    RouteResponse,
+    RouteSearchPath,
+    RouteSearchQuery,
+    RouteUpdate,
+)
 from app.features.routes.service import RouteService
-from app.shared.api_response import api_response
+from app.shared.api_response import api_json_response
+from app.shared.etag import etag_matches, not_modified
+from app.shared.pagination import PageParams
 
 router = APIRouter(prefix="/routes", tags=["routes"])
 
 
-@router.get("/", response_model=dict)
-def list_routes(db: Session = Depends(get_db)):
-    routes = RouteService.list_all(db)
-    data = [RouteResponse.model_validate(r) for r in routes]
-    return api_response(data)
+@router.get("/", response_model=dict, dependencies=[query_budget(1)])
+async def list_routes(
+    page: PageParams = Depends(),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    routes, next_cursor, etag = await RouteService.list_all(db, page.limit, page.cursor)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return api_json_response(
+        routes, RouteResponse, headers={"ETag": etag}, next_cursor=next_cursor
+    )
+
+
+@router.get("/search", response_model=dict, dependencies=[query_budget(1)])
+async def search_routes(
+    query: RouteSearchQuery = Query(), db: AsyncSession = Depends(get_db)
+):
+    paths = await RouteService.search(db, query)
+    return api_json_response(paths, RouteSearchPath)
+
+
+@router.get("/{route_id}", response_model=dict, dependencies=[query_budget(1)])
+async def get_route(
+    route_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    etag, route = await RouteService.get_response(db, route_id, if_none_match)
+    if route is None:
+        return not_modified(etag)
+    return api_json_response(route, headers={"ETag": etag})
+
+
+@router.post(
+    "/",
+    response_model=dict,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[query_budget(1)],
+)
+async def create_route(payload: RouteCreate, db: AsyncSession = Depends(get_db)):
+    route = await RouteService.create(db, payload)
+    return api_json_response(route, status_code=status.HTTP_201_CREATED)
+
+
+@router.patch("/{route_id}", response_model=dict, dependencies=[query_budget(4)])
+async def update_route(
+    route_id: int, payload: RouteUpdate, db: AsyncSession = Depends(get_db)
+):
+    route = await RouteService.update(db, route_id, payload)
+    return api_json_response(route, RouteResponse)
 
 
-@router.get("/{route_id}", response_model=dict)
-def get_route(route_id: int, db: Session = Depends(get_db)):
-    route = RouteService.get_by_id(db, route_id)
-    return api_response(RouteResponse.model_validate(route))
+@router.delete(
+    "/{route_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[query_budget(4)],
+)
+async def delete_route(route_id: int, db: AsyncSession = Depends(get_db)):
+    await RouteService.delete(db, route_id)
 
 
-@router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
-def create_route(payload: RouteCreate, db: Session = Depends(get_db)):
-    route = RouteService.create(db, payload)
-    return api_response(RouteResponse.model_validate(route))
+@router.post(
+    "/{route_id}/legs",
+    response_model=dict,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[query_budget(6)],
+)
+async def add_leg(
+    route_id: int, payload: LegCreate, db: AsyncSession = Depends(get_db)
+):
+    leg = await RouteService.add_leg(db, route_id, payload)
+    return api_json_response(leg, LegResponse, status_code=status.HTTP_201_CREATED)
 
 
-@router.patch("/{route_id}", response_model=dict)
-def update_route(route_id: int, payload: RouteUpdate, db: Session = Depends(get_db)):
-    route = RouteService.update(db, route_id, payload)
-    return api_response(RouteResponse.model_validate(route))
+@router.patch(
+    "/{route_id}/legs/{leg_id}", response_model=dict, dependencies=[query_budget(8)]
+)
+async def update_leg(
+    route_id: int,
+    leg_id: int,
+    payload: LegUpdate,
+    db: AsyncSession = Depends(get_db),
+):
+    leg = await RouteService.update_leg(db, route_id, leg_id, payload)
+    return api_json_response(leg, LegResponse)
 
 
-@router.delete("/{route_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_route(route_id: int, db: Session = Depends(get_db)):
-    RouteService.delete(db, route_id)
+@router.delete(
+    "/{route_id}/legs/{leg_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[query_budget(5)],
+)
+async def delete_leg(route_id: int, leg_id: int, db: AsyncSession = Depends(get_db)):
+    await RouteService.delete_leg(db, route_id, leg_id)
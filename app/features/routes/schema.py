@@ -1,10 +1,12 @@
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 from app.shared.ports import AVAILABLE_PORTS
 
+MAX_SEARCH_LEGS = 6
+
 
 class LegCreate(BaseModel):
     sequence: int = Field(..., ge=0, description="Order of leg in route")
@@ -27,6 +29,14 @@ class LegUpdate(BaseModel):
     destination_port: Optional[AVAILABLE_PORTS] = None
     vessel_id: Optional[int] = Field(None, gt=0)
 
+    @field_validator("sequence", "origin_port", "destination_port")
+    @classmethod
+    def reject_null(cls, v):
+        # Omit a field to leave it unchanged; only vessel_id can be cleared.
+        if v is None:
+            raise ValueError("may be omitted but not null")
+        return v
+
     @model_validator(mode="after")
     def validate_ports(self):
         origin = self.origin_port
@@ -80,3 +90,45 @@ class RouteResponse(BaseModel):
     legs: List[LegResponse] = []
 
     model_config = {"from_attributes": True}
+
+
+class RouteSearchQuery(BaseModel):
+    origin: AVAILABLE_PORTS = Field(..., alias="from")
+    destination: AVAILABLE_PORTS = Field(..., alias="to")
+    max_legs: int = Field(3, ge=1, le=MAX_SEARCH_LEGS)
+    vessel_assigned: bool = Field(
+        False, description="Only travel over legs that have a vessel assigned"
+    )
+    limit: int = Field(10, ge=1, le=50)
+
+    @model_validator(mode="after")
+    def validate_ports(self):
+        if self.origin == self.destination:
+            raise ValueError("from and to must be different ports")
+        return self
+
+
+class RouteSearchLegOption(BaseModel):
+    id: int
+    route_id: int
+    sequence: int
+    vessel_id: Optional[int]
+
+    model_config = {"from_attributes": True}
+
+
+class RouteSearchHop(BaseModel):
+    origin_port: str
+    destination_port: str
+    leg_count: int
+    options: List[RouteSearchLegOption]
+
+    model_config = {"from_attributes": True}
+
+
+class RouteSearchPath(BaseModel):
+    hops: int
+    ports: List[str]
+    legs: List[RouteSearchHop]
+
+    model_config = {"from_attributes": True}
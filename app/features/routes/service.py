@@ -1,21 +1,99 @@
-from typing import List
+from itertools import chain
+from typing import Any, List, Optional, Tuple, Union
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import (
+    JSON,
+    DateTime,
+    Integer,
+    Row,
+    Select,
+    String,
+    and_,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
+from app.core.cache import cache_registry, notify_clause, notify_invalidation
+from app.features.routes.graph import PortPath, route_graph
 from app.features.routes.model import Leg, Route
-from app.features.routes.schema import RouteCreate, RouteUpdate
+from app.features.routes.schema import (
+    LegCreate,
+    LegResponse,
+    LegUpdate,
+    RouteCreate,
+    RouteResponse,
+    RouteSearchQuery,
+    RouteUpdate,
+)
+from app.features.vessels.model import Vessel
+from app.shared.etag import compute_etag, etag_matches, page_etag
+from app.shared.pagination import decode_cursor, split_page
+
+route_cache = cache_registry.create("routes")
+cache_registry.follow("routes", route_graph)
+
+
+def _check_link(prev: Any, leg: Any) -> None:
+    """Require ``leg`` to start where ``prev`` ends; either may be missing."""
+    if prev is None or leg is None:
+        return
+    if prev.destination_port != leg.origin_port:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Leg {leg.sequence}: origin_port must match previous leg's "
+                f"destination_port ({prev.destination_port} -> {leg.origin_port})"
+            ),
+        )
+
+
+def _json_value(col: Any) -> Any:
+    """Render ``col`` for ``json_build_object`` the way the item response does.
+
+    Postgres writes ``timestamptz`` values into JSON in the session TimeZone and
+    trims trailing zeros from the fraction, so timestamps are spelled out in UTC
+    with a fixed format instead.
+    """
+    if not isinstance(col.type, DateTime):
+        return col
+    if col.type.timezone:
+        return func.to_char(
+            func.timezone("UTC", col), 'YYYY-MM-DD"T"HH24:MI:SS.US"+00:00"'
+        )
+    return func.to_char(col, 'YYYY-MM-DD"T"HH24:MI:SS.US')
+
+
+def route_etag(route: Union[Route, RouteResponse]) -> str:
+    # Legs carry their own updated_at, so they are part of the route's version.
+    return compute_etag(
+        route.id, route.updated_at, [(leg.id, leg.updated_at) for leg in route.legs]
+    )
+
+
+def _row_version(row: Row) -> tuple:
+    # A list row carries its legs as JSON objects.
+    return row.id, row.updated_at, [(leg["id"], leg["updated_at"]) for leg in row.legs]
 
 
 class RouteService:
     @staticmethod
-    def get_or_404(db: Session, route_id: int) -> Route:
+    async def get_or_404(db: AsyncSession, route_id: int) -> Route:
         route = (
-            db.execute(
-                select(Route)
-                .where(Route.id == route_id)
-                .options(joinedload(Route.legs))
+            (
+                await db.execute(
+                    select(Route)
+                    .where(Route.id == route_id)
+                    .options(joinedload(Route.legs))
+                )
             )
             .unique()
             .scalar_one_or_none()
@@ -28,44 +106,325 @@ class RouteService:
         return route
 
     @staticmethod
-    def list_all(db: Session) -> List[Route]:
-        stmt = select(Route).options(joinedload(Route.legs)).order_by(Route.id)
-        result = db.execute(stmt)
-        return list(result.unique().scalars().all())
+    def _page_stmt(limit: int, cursor: Optional[str], *columns) -> Select:
+        stmt = select(*columns).order_by(Route.id).limit(limit + 1)
+        if cursor is not None:
+            (last_id,) = decode_cursor(cursor, int)
+            stmt = stmt.where(Route.id > last_id)
+        return stmt
+
+    @staticmethod
+    async def list_all(
+        db: AsyncSession, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Row], Optional[str], str]:
+        # One row per route with its legs aggregated to JSON, instead of a
+        # joined row per leg that has to be de-duplicated into ORM objects.
+        legs = (
+            select(
+                func.json_agg(
+                    aggregate_order_by(
+                        func.json_build_object(
+                            *chain.from_iterable(
+                                (col.key, _json_value(col)) for col in Leg.__table__.c
+                            )
+                        ),
+                        Leg.sequence,
+                    ),
+                    type_=JSON,
+                )
+            )
+            .where(Leg.route_id == Route.id)
+            .scalar_subquery()
+        )
+        stmt = RouteService._page_stmt(
+            limit,
+            cursor,
+            *Route.__table__.c,
+            func.coalesce(legs, literal_column("'[]'::json")).label("legs"),
+        )
+        rows = list((await db.execute(stmt)).all())
+        page, next_cursor = split_page(rows, limit, lambda r: [r.id])
+        return page, next_cursor, page_etag(rows, _row_version)
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, route_id: int) -> Route:
+        return await RouteService.get_or_404(db, route_id)
 
     @staticmethod
-    def get_by_id(db: Session, route_id: int) -> Route:
-        return RouteService.get_or_404(db, route_id)
+    async def get_response(
+        db: AsyncSession, route_id: int, if_none_match: Optional[str] = None
+    ) -> Tuple[str, Optional[RouteResponse]]:
+        """Return the route's ETag and response model.
+
+        The model is ``None`` when ``if_none_match`` already matches, in which
+        case the row is never converted.
+        """
+        cached = route_cache.get(route_id)
+        if cached is not None:
+            etag = route_etag(cached)
+            return etag, None if etag_matches(if_none_match, etag) else cached
+        generation = route_cache.generation()
+        route = await RouteService.get_or_404(db, route_id)
+        etag = route_etag(route)
+        if etag_matches(if_none_match, etag):
+            return etag, None
+        response = RouteResponse.model_validate(route)
+        route_cache.set(route_id, response, generation)
+        return etag, response
 
     @staticmethod
-    def create(db: Session, payload: RouteCreate) -> Route:
-        route = Route(name=payload.name)
-        db.add(route)
-        db.flush()
-        sorted_legs = sorted(payload.legs, key=lambda leg: leg.sequence)
-        for leg_data in sorted_legs:
-            leg = Leg(
-                route_id=route.id,
-                sequence=leg_data.sequence,
-                origin_port=leg_data.origin_port,
-                destination_port=leg_data.destination_port,
-                vessel_id=leg_data.vessel_id,
+    async def search(db: AsyncSession, query: RouteSearchQuery) -> List[PortPath]:
+        await route_graph.sync(db)
+        return route_graph.search(
+            query.origin,
+            query.destination,
+            query.max_legs,
+            vessel_assigned=query.vessel_assigned,
+            limit=query.limit,
+        )
+
+    @staticmethod
+    async def create(db: AsyncSession, payload: RouteCreate) -> RouteResponse:
+        """Insert the route, its legs and the invalidation notice in one statement.
+
+        The response is built from the RETURNING rows, so nothing is re-read.
+        """
+        # Array parameters keep the statement text (and its compiled form)
+        # the same for any number of legs.
+        leg_values = (
+            func.unnest(
+                literal([leg.sequence for leg in payload.legs], ARRAY(Integer)),
+                literal([leg.origin_port for leg in payload.legs], ARRAY(String)),
+                literal([leg.destination_port for leg in payload.legs], ARRAY(String)),
+                literal([leg.vessel_id for leg in payload.legs], ARRAY(Integer)),
+            )
+            .table_valued("sequence", "origin_port", "destination_port", "vessel_id")
+            .render_derived(name="leg_values")
+        )
+        new_route = (
+            insert(Route.__table__)
+            .values(name=payload.name)
+            .returning(*Route.__table__.c)
+            .cte("new_route")
+        )
+        new_legs = (
+            insert(Leg.__table__)
+            .from_select(
+                ["route_id", *leg_values.c.keys()],
+                select(new_route.c.id, *leg_values.c).select_from(
+                    new_route.join(leg_values, true())
+                ),
+            )
+            .returning(*Leg.__table__.c)
+            .cte("new_legs")
+        )
+        notice = (
+            select(notify_clause(route_cache, new_route.c.id).label("notified"))
+            .select_from(new_route)
+            .cte("notice")
+        )
+        rows = (
+            await db.execute(
+                select(
+                    new_route.c.name.label("route_name"),
+                    new_route.c.created_at.label("route_created_at"),
+                    new_route.c.updated_at.label("route_updated_at"),
+                    *new_legs.c,
+                )
+                .select_from(new_route)
+                .join(new_legs, new_legs.c.route_id == new_route.c.id)
+                .join(notice, true())
+                .order_by(new_legs.c.sequence)
             )
-            db.add(leg)
-        db.commit()
-        return RouteService.get_or_404(db, route.id)
+        ).all()
+        await db.commit()
+        first = rows[0]
+        route_graph.invalidate(first.route_id)
+        return RouteResponse(
+            id=first.route_id,
+            name=first.route_name,
+            created_at=first.route_created_at,
+            updated_at=first.route_updated_at,
+            legs=[LegResponse.model_validate(row) for row in rows],
+        )
 
     @staticmethod
-    def update(db: Session, route_id: int, payload: RouteUpdate) -> Route:
-        route = RouteService.get_or_404(db, route_id)
+    async def update(db: AsyncSession, route_id: int, payload: RouteUpdate) -> Route:
+        route = await RouteService.get_or_404(db, route_id)
         update_data = payload.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(route, key, value)
-        db.commit()
-        return RouteService.get_or_404(db, route.id)
+        await notify_invalidation(db, route_cache, route_id)
+        await db.commit()
+        route_cache.invalidate(route_id)
+        return await RouteService.get_or_404(db, route.id)
+
+    @staticmethod
+    async def delete(db: AsyncSession, route_id: int) -> None:
+        route = await RouteService.get_or_404(db, route_id)
+        await db.delete(route)
+        await notify_invalidation(db, route_cache, route_id)
+        await db.commit()
+        route_cache.invalidate(route_id)
+        route_graph.invalidate(route_id)
 
     @staticmethod
-    def delete(db: Session, route_id: int) -> None:
-        route = RouteService.get_or_404(db, route_id)
-        db.delete(route)
-        db.commit()
+    async def _lock_route(db: AsyncSession, route_id: int) -> None:
+        """Bump the route's updated_at, which also serializes leg edits on it."""
+        touched = (
+            await db.execute(
+                update(Route)
+                .where(Route.id == route_id)
+                .values(updated_at=func.now())
+                .returning(Route.id)
+            )
+        ).scalar_one_or_none()
+        if touched is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Route {route_id} not found",
+            )
+
+    @staticmethod
+    async def _get_leg_or_404(db: AsyncSession, route_id: int, leg_id: int) -> Leg:
+        leg = (
+            await db.execute(
+                select(Leg).where(Leg.id == leg_id, Leg.route_id == route_id)
+            )
+        ).scalar_one_or_none()
+        if leg is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Leg {leg_id} not found on route {route_id}",
+            )
+        return leg
+
+    @staticmethod
+    async def _neighbours(
+        db: AsyncSession, route_id: int, sequence: int, exclude_id: Optional[int]
+    ) -> Tuple[Optional[Leg], Optional[Leg], Optional[Leg]]:
+        """Legs just before, at and just after ``sequence``, in one query."""
+        others = [Leg.route_id == route_id]
+        if exclude_id is not None:
+            others.append(Leg.id != exclude_id)
+        prev_seq = (
+            select(func.max(Leg.sequence))
+            .where(*others, Leg.sequence < sequence)
+            .scalar_subquery()
+        )
+        next_seq = (
+            select(func.min(Leg.sequence))
+            .where(*others, Leg.sequence > sequence)
+            .scalar_subquery()
+        )
+        legs = (
+            (
+                await db.execute(
+                    select(Leg).where(
+                        and_(*others),
+                        Leg.sequence.in_([prev_seq, literal(sequence), next_seq]),
+                    )
+                )
+            )
+            .scalars()
+            .all()
+        )
+        prev = next((leg for leg in legs if leg.sequence < sequence), None)
+        at = next((leg for leg in legs if leg.sequence == sequence), None)
+        after = next((leg for leg in legs if leg.sequence > sequence), None)
+        return prev, at, after
+
+    @staticmethod
+    async def _check_vessel(db: AsyncSession, vessel_id: Optional[int]) -> None:
+        if vessel_id is not None and await db.get(Vessel, vessel_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Vessel with id {vessel_id} not found",
+            )
+
+    @staticmethod
+    async def _commit_leg_change(db: AsyncSession, route_id: int) -> None:
+        await notify_invalidation(db, route_cache, route_id)
+        await db.commit()
+        route_cache.invalidate(route_id)
+        route_graph.invalidate(route_id)
+
+    @staticmethod
+    async def add_leg(db: AsyncSession, route_id: int, payload: LegCreate) -> Leg:
+        await RouteService._lock_route(db, route_id)
+        await RouteService._check_vessel(db, payload.vessel_id)
+        prev, at, after = await RouteService._neighbours(
+            db, route_id, payload.sequence, None
+        )
+        if at is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Route {route_id} already has a leg {payload.sequence}",
+            )
+        _check_link(prev, payload)
+        _check_link(payload, after)
+        leg = Leg(route_id=route_id, **payload.model_dump())
+        db.add(leg)
+        await RouteService._commit_leg_change(db, route_id)
+        await db.refresh(leg)
+        return leg
+
+    @staticmethod
+    async def update_leg(
+        db: AsyncSession, route_id: int, leg_id: int, payload: LegUpdate
+    ) -> Leg:
+        await RouteService._lock_route(db, route_id)
+        leg = await RouteService._get_leg_or_404(db, route_id, leg_id)
+        update_data = payload.model_dump(exclude_unset=True)
+        if "vessel_id" in update_data:
+            await RouteService._check_vessel(db, update_data["vessel_id"])
+
+        old_sequence = leg.sequence
+        for key, value in update_data.items():
+            setattr(leg, key, value)
+        if leg.origin_port == leg.destination_port:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="origin_port and destination_port must be different",
+            )
+
+        ports_changed = (
+            "origin_port" in update_data or "destination_port" in update_data
+        )
+        if leg.sequence != old_sequence:
+            # The legs on either side of the old position become adjacent.
+            old_prev, _, old_next = await RouteService._neighbours(
+                db, route_id, old_sequence, leg.id
+            )
+            _check_link(old_prev, old_next)
+        if leg.sequence != old_sequence or ports_changed:
+            prev, at, after = await RouteService._neighbours(
+                db, route_id, leg.sequence, leg.id
+            )
+            if at is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Route {route_id} already has a leg {leg.sequence}",
+                )
+            _check_link(prev, leg)
+            _check_link(leg, after)
+
+        await RouteService._commit_leg_change(db, route_id)
+        await db.refresh(leg)
+        return leg
+
+    @staticmethod
+    async def delete_leg(db: AsyncSession, route_id: int, leg_id: int) -> None:
+        await RouteService._lock_route(db, route_id)
+        leg = await RouteService._get_leg_or_404(db, route_id, leg_id)
+        prev, _, after = await RouteService._neighbours(
+            db, route_id, leg.sequence, leg.id
+        )
+        if prev is None and after is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A route must keep at least one leg",
+            )
+        _check_link(prev, after)
+        await db.delete(leg)
+        await RouteService._commit_leg_change(db, route_id)
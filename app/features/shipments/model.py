@@ -4,7 +4,7 @@ from datetime import datetime
 from enum import Enum as PyEnum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Enum, ForeignKey, func
+from sqlalchemy import BigInteger, Enum, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database.init import Base
@@ -52,6 +52,24 @@ class ShipmentAudit(Base):
     old_status: Mapped[str] = mapped_column(nullable=True)
     new_status: Mapped[str] = mapped_column(nullable=False)
     changed_at: Mapped[datetime] = mapped_column(
+        primary_key=True,
         server_default=func.now(),
         nullable=False,
     )
+
+    # Monthly range partitions, managed by app/features/shipments/partitions.py.
+    __table_args__ = (
+        Index("ix_shipment_audit_changed_at", changed_at, postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (changed_at)"},
+    )
+
+
+class ShipmentStatusCount(Base):
+    """Shipments per (vessel, port, status), kept current by database triggers."""
+
+    __tablename__ = "shipment_status_counts"
+
+    vessel_id: Mapped[int] = mapped_column(primary_key=True)
+    port_name: Mapped[str] = mapped_column(primary_key=True)
+    status: Mapped[str] = mapped_column(primary_key=True)
+    shipment_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -0,0 +1,75 @@
+import re
+from datetime import date
+from typing import List
+
+from sqlalchemy import Connection, text
+
+PARTITION_NAME = re.compile(r"^shipment_audit_p(\d{4})(\d{2})$")
+
+
+def ensure_audit_partitions(conn: Connection, months_ahead: int) -> int:
+    """Create monthly partitions from the current month ``months_ahead`` out.
+
+    Rows for a new month that already sit in the default partition are moved
+    into it. Returns how many were created; existing partitions are left alone.
+    A month that cannot be created is skipped with a warning from the database
+    and shows up in ``missing_audit_partitions``.
+    """
+    return conn.execute(
+        text(
+            "SELECT create_shipment_audit_partitions("
+            "now()::date, (now() + make_interval(months => :ahead))::date)"
+        ),
+        {"ahead": months_ahead},
+    ).scalar_one()
+
+
+def missing_audit_partitions(conn: Connection, months_ahead: int) -> List[str]:
+    """Names of the monthly partitions up to ``months_ahead`` that do not exist."""
+    return list(
+        conn.execute(
+            text(
+                "SELECT name FROM ("
+                "  SELECT 'shipment_audit_p' || to_char(m, 'YYYYMM') AS name"
+                "  FROM generate_series(date_trunc('month', now()),"
+                "    now() + make_interval(months => :ahead), interval '1 month') m"
+                ") months WHERE to_regclass(name) IS NULL ORDER BY name"
+            ),
+            {"ahead": months_ahead},
+        ).scalars()
+    )
+
+
+def detach_expired_audit_partitions(
+    conn: Connection, retain_months: int, drop: bool = False
+) -> List[str]:
+    """Detach monthly partitions older than ``retain_months`` full months.
+
+    Detached partitions stay behind as plain tables for archiving unless
+    ``drop`` is set. Returns the affected partition names.
+    """
+    cutoff = conn.execute(
+        text(
+            "SELECT (date_trunc('month', now()) "
+            "- make_interval(months => :retain))::date"
+        ),
+        {"retain": retain_months},
+    ).scalar_one()
+    names = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'shipment_audit'::regclass "
+            "ORDER BY c.relname"
+        )
+    ).scalars()
+    expired = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match and date(int(match[1]), int(match[2]), 1) < cutoff:
+            expired.append(name)
+    for name in expired:
+        conn.execute(text(f'ALTER TABLE shipment_audit DETACH PARTITION "{name}"'))
+        if drop:
+            conn.execute(text(f'DROP TABLE "{name}"'))
+    return expired
@@ -1,48 +1,108 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database.init import get_db
+from app.core.query_budget import query_budget
 from app.features.shipments.schema import (
     ShipmentAuditResponse,
+    ShipmentBulkStatusResponse,
+    ShipmentBulkStatusUpdate,
     ShipmentCreate,
     ShipmentResponse,
+    ShipmentStatsGroup,
+    ShipmentStatsQuery,
     ShipmentUpdate,
 )
 from app.features.shipments.service import ShipmentService
-from app.shared.api_response import api_response
+from app.shared.api_response import api_json_response
+from app.shared.etag import etag_matches, item_etag, not_modified
+from app.shared.export import ExportFormat, export_response
+from app.shared.pagination import PageParams
 
 router = APIRouter(prefix="/shipments", tags=["shipments"])
 
 
-@router.get("/", response_model=dict)
-def list_shipments(db: Session = Depends(get_db)):
-    shipments = ShipmentService.list_all(db)
-    return api_response([ShipmentResponse.model_validate(s) for s in shipments])
+@router.get("/", response_model=dict, dependencies=[query_budget(1)])
+async def list_shipments(
+    page: PageParams = Depends(),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    shipments, next_cursor, etag = await ShipmentService.list_all(
+        db, page.limit, page.cursor
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return api_json_response(
+        shipments, ShipmentResponse, headers={"ETag": etag}, next_cursor=next_cursor
+    )
+
 
+@router.get("/export")
+async def export_shipments(fmt: ExportFormat = Query("ndjson", alias="format")):
+    return export_response(ShipmentService.export_stmt(), "shipments", fmt)
 
-@router.get("/{shipment_id}", response_model=dict)
-def get_shipment(shipment_id: int, db: Session = Depends(get_db)):
-    shipment = ShipmentService.get_by_id(db, shipment_id)
-    return api_response(ShipmentResponse.model_validate(shipment))
+
+@router.get("/audit/export")
+async def export_shipment_audit(fmt: ExportFormat = Query("ndjson", alias="format")):
+    return export_response(ShipmentService.export_audit_stmt(), "shipment_audit", fmt)
+
+
+@router.get("/stats", response_model=dict, dependencies=[query_budget(1)])
+async def shipment_stats(
+    query: ShipmentStatsQuery = Query(), db: AsyncSession = Depends(get_db)
+):
+    groups = await ShipmentService.stats(db, query.group_by)
+    return api_json_response(groups, ShipmentStatsGroup)
 
 
-@router.get("/{shipment_id}/audit", response_model=dict)
-def get_shipment_audit(shipment_id: int, db: Session = Depends(get_db)):
-    audit_records = ShipmentService.get_audit(db, shipment_id)
-    return api_response(
-        [ShipmentAuditResponse.model_validate(a) for a in audit_records]
+@router.get("/{shipment_id}", response_model=dict, dependencies=[query_budget(1)])
+async def get_shipment(
+    shipment_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    shipment = await ShipmentService.get_by_id(db, shipment_id)
+    etag = item_etag(shipment)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return api_json_response(shipment, ShipmentResponse, headers={"ETag": etag})
+
+
+@router.get("/{shipment_id}/audit", response_model=dict, dependencies=[query_budget(2)])
+async def get_shipment_audit(shipment_id: int, db: AsyncSession = Depends(get_db)):
+    audit_records = await ShipmentService.get_audit(db, shipment_id)
+    return api_json_response(audit_records, ShipmentAuditResponse)
+
+
+@router.post(
+    "/",
+    response_model=dict,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[query_budget(3)],
+)
+async def create_shipment(payload: ShipmentCreate, db: AsyncSession = Depends(get_db)):
+    shipment = await ShipmentService.create(db, payload)
+    return api_json_response(
+        shipment, ShipmentResponse, status_code=status.HTTP_201_CREATED
     )
 
 
-@router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
-def create_shipment(payload: ShipmentCreate, db: Session = Depends(get_db)):
-    shipment = ShipmentService.create(db, payload)
-    return api_response(ShipmentResponse.model_validate(shipment))
+@router.patch("/{shipment_id}", response_model=dict, dependencies=[query_budget(3)])
+async def update_shipment_status(
+    shipment_id: int, payload: ShipmentUpdate, db: AsyncSession = Depends(get_db)
+):
+    shipment = await ShipmentService.update_status(db, shipment_id, payload)
+    return api_json_response(shipment, ShipmentResponse)
 
 
-@router.patch("/{shipment_id}", response_model=dict)
-def update_shipment_status(
-    shipment_id: int, payload: ShipmentUpdate, db: Session = Depends(get_db)
+@router.post("/bulk-status", response_model=dict, dependencies=[query_budget(1)])
+async def bulk_update_shipment_status(
+    payload: ShipmentBulkStatusUpdate, db: AsyncSession = Depends(get_db)
 ):
-    shipment = ShipmentService.update_status(db, shipment_id, payload)
-    return api_response(ShipmentResponse.model_validate(shipment))
+    updated_ids = await ShipmentService.bulk_update_status(db, payload)
+    return api_json_response(
+        ShipmentBulkStatusResponse(updated=len(updated_ids), ids=updated_ids)
+    )
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Literal, Optional
+from typing import Dict, List, Literal, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 ShipmentStatus = Literal[
     "PENDING",
@@ -21,6 +21,29 @@ class ShipmentUpdate(BaseModel):
     status: ShipmentStatus = Field(..., description="New status")
 
 
+MAX_BULK_IDS = 10_000
+
+
+class ShipmentBulkStatusUpdate(BaseModel):
+    status: ShipmentStatus = Field(..., description="New status")
+    ids: Optional[List[int]] = Field(
+        None, min_length=1, max_length=MAX_BULK_IDS, description="Shipment ids"
+    )
+    booking_id: Optional[int] = Field(None, gt=0, description="Filter by booking")
+    vessel_id: Optional[int] = Field(None, gt=0, description="Filter by vessel")
+
+    @model_validator(mode="after")
+    def validate_selector(self):
+        if self.ids is None and self.booking_id is None and self.vessel_id is None:
+            raise ValueError("one of ids, booking_id or vessel_id is required")
+        return self
+
+
+class ShipmentBulkStatusResponse(BaseModel):
+    updated: int
+    ids: List[int]
+
+
 class ShipmentResponse(BaseModel):
     id: int
     booking_id: int
@@ -39,3 +62,15 @@ class ShipmentAuditResponse(BaseModel):
     changed_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class ShipmentStatsQuery(BaseModel):
+    group_by: Literal["vessel", "port", "status"] = Field(
+        "status", description="Dimension to count shipments by"
+    )
+
+
+class ShipmentStatsGroup(BaseModel):
+    group: Union[int, str]
+    total: int
+    by_status: Dict[str, int]
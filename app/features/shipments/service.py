@@ -1,18 +1,30 @@
-from typing import List
+from typing import Dict, List, Optional, Tuple, Union
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.features.bookings.model import Booking
-from app.features.shipments.model import Shipment, ShipmentAudit, ShipmentStatus
-from app.features.shipments.schema import ShipmentCreate, ShipmentUpdate
+from app.features.shipments.model import (
+    Shipment,
+    ShipmentAudit,
+    ShipmentStatus,
+    ShipmentStatusCount,
+)
+from app.features.shipments.schema import (
+    ShipmentBulkStatusUpdate,
+    ShipmentCreate,
+    ShipmentStatsGroup,
+    ShipmentUpdate,
+)
+from app.shared.etag import page_etag
+from app.shared.pagination import decode_cursor, split_page
 
 
 class ShipmentService:
     @staticmethod
-    def get_or_404(db: Session, shipment_id: int) -> Shipment:
-        shipment = db.get(Shipment, shipment_id)
+    async def get_or_404(db: AsyncSession, shipment_id: int) -> Shipment:
+        shipment = await db.get(Shipment, shipment_id)
         if shipment is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -21,18 +33,38 @@ class ShipmentService:
         return shipment
 
     @staticmethod
-    def list_all(db: Session) -> List[Shipment]:
-        result = db.execute(select(Shipment).order_by(Shipment.id))
-        return list(result.scalars().all())
+    def _page_stmt(limit: int, cursor: Optional[str], *columns) -> Select:
+        stmt = select(*columns).order_by(Shipment.id).limit(limit + 1)
+        if cursor is not None:
+            (last_id,) = decode_cursor(cursor, int)
+            stmt = stmt.where(Shipment.id > last_id)
+        return stmt
+
+    @staticmethod
+    async def list_all(
+        db: AsyncSession, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Shipment], Optional[str], str]:
+        result = await db.execute(ShipmentService._page_stmt(limit, cursor, Shipment))
+        rows = list(result.scalars().all())
+        page, next_cursor = split_page(rows, limit, lambda s: [s.id])
+        return page, next_cursor, page_etag(rows)
+
+    @staticmethod
+    def export_stmt() -> Select:
+        return select(Shipment.__table__).order_by(Shipment.id)
+
+    @staticmethod
+    def export_audit_stmt() -> Select:
+        return select(ShipmentAudit.__table__).order_by(ShipmentAudit.id)
 
     @staticmethod
-    def get_by_id(db: Session, shipment_id: int) -> Shipment:
-        return ShipmentService.get_or_404(db, shipment_id)
+    async def get_by_id(db: AsyncSession, shipment_id: int) -> Shipment:
+        return await ShipmentService.get_or_404(db, shipment_id)
 
     @staticmethod
-    def get_audit(db: Session, shipment_id: int) -> List[ShipmentAudit]:
-        ShipmentService.get_or_404(db, shipment_id)
-        result = db.execute(
+    async def get_audit(db: AsyncSession, shipment_id: int) -> List[ShipmentAudit]:
+        await ShipmentService.get_or_404(db, shipment_id)
+        result = await db.execute(
             select(ShipmentAudit)
             .where(ShipmentAudit.shipment_id == shipment_id)
             .order_by(ShipmentAudit.changed_at.asc())
@@ -40,8 +72,41 @@ class ShipmentService:
         return list(result.scalars().all())
 
     @staticmethod
-    def create(db: Session, payload: ShipmentCreate) -> Shipment:
-        booking = db.get(Booking, payload.booking_id)
+    async def stats(db: AsyncSession, group_by: str) -> List[ShipmentStatsGroup]:
+        # Reads the trigger-maintained counters: one row per (vessel, port,
+        # status), however many shipments there are.
+        key = {
+            "vessel": ShipmentStatusCount.vessel_id,
+            "port": ShipmentStatusCount.port_name,
+            "status": ShipmentStatusCount.status,
+        }[group_by]
+        result = await db.execute(
+            select(
+                key,
+                ShipmentStatusCount.status,
+                func.sum(ShipmentStatusCount.shipment_count),
+            )
+            .group_by(key, ShipmentStatusCount.status)
+            .order_by(key)
+        )
+        groups: Dict[Union[int, str], Dict[str, int]] = {}
+        for group, status_name, count in result:
+            by_status = groups.get(group)
+            if by_status is None:
+                by_status = groups[group] = dict.fromkeys(
+                    (s.value for s in ShipmentStatus), 0
+                )
+            by_status[status_name] = int(count)
+        return [
+            ShipmentStatsGroup(
+                group=group, total=sum(by_status.values()), by_status=by_status
+            )
+            for group, by_status in groups.items()
+        ]
+
+    @staticmethod
+    async def create(db: AsyncSession, payload: ShipmentCreate) -> Shipment:
+        booking = await db.get(Booking, payload.booking_id)
         if booking is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -49,16 +114,44 @@ class ShipmentService:
             )
         shipment = Shipment(booking_id=payload.booking_id)
         db.add(shipment)
-        db.commit()
-        db.refresh(shipment)
+        await db.commit()
+        await db.refresh(shipment)
         return shipment
 
     @staticmethod
-    def update_status(
-        db: Session, shipment_id: int, payload: ShipmentUpdate
+    async def update_status(
+        db: AsyncSession, shipment_id: int, payload: ShipmentUpdate
     ) -> Shipment:
-        shipment = ShipmentService.get_or_404(db, shipment_id)
+        shipment = await ShipmentService.get_or_404(db, shipment_id)
         shipment.status = ShipmentStatus(payload.status)
-        db.commit()
-        db.refresh(shipment)
+        await db.commit()
+        await db.refresh(shipment)
         return shipment
+
+    @staticmethod
+    async def bulk_update_status(
+        db: AsyncSession, payload: ShipmentBulkStatusUpdate
+    ) -> List[int]:
+        new_status = ShipmentStatus(payload.status)
+        stmt = (
+            update(Shipment)
+            .where(Shipment.status != new_status)
+            .values(status=new_status, updated_at=func.now())
+            .returning(Shipment.id)
+            .execution_options(synchronize_session=False)
+        )
+        if payload.ids is not None:
+            stmt = stmt.where(Shipment.id.in_(payload.ids))
+        if payload.booking_id is not None:
+            stmt = stmt.where(Shipment.booking_id == payload.booking_id)
+        if payload.vessel_id is not None:
+            stmt = stmt.where(
+                Shipment.booking_id.in_(
+                    select(Booking.id).where(Booking.vessel_id == payload.vessel_id)
+                )
+            )
+        # Rows already in the target status are skipped, so the audit trigger
+        # fires exactly for the rows that change, as with update_status.
+        updated_ids = sorted((await db.execute(stmt)).scalars().all())
+        await db.commit()
+        return updated_ids
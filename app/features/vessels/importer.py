@@ -0,0 +1,116 @@
+from typing import get_args
+
+from sqlalchemy import Connection, text
+
+from app.core.database.bulk_import import ImportSpec, parsed, trimmed
+from app.features.vessels.schema import VESSEL_TYPE
+
+COLUMNS = (
+    "name",
+    "imo_number",
+    "max_capacity",
+    "vessel_type",
+    "is_active",
+)
+
+
+def validate(conn: Connection) -> None:
+    conn.execute(
+        text(
+            f"""
+            CREATE TEMP TABLE import_rows ON COMMIT DROP AS
+            WITH typed AS MATERIALIZED (
+                SELECT raw.*,
+                       {parsed("max_capacity", "float8")},
+                       {parsed("is_active", "boolean")}
+                FROM (SELECT line, malformed, {trimmed(COLUMNS)} FROM import_raw) AS raw
+            )
+            SELECT line, name, upper(imo_number) AS imo_number,
+                   max_capacity_value AS max_capacity,
+                   vessel_type,
+                   coalesce(is_active_value, true) AS is_active,
+                   CASE
+                   WHEN malformed IS NOT NULL THEN malformed
+                   WHEN name IS NULL OR length(name) > 255
+                       THEN 'name must be 1-255 characters'
+                   WHEN imo_number IS NULL OR imo_number !~* '^IMO[0-9]{{7}}$'
+                       THEN 'IMO number must be in format IMO followed by 7 digits'
+                   WHEN max_capacity IS NULL THEN 'max_capacity is required'
+                   WHEN max_capacity_value IS NULL
+                       THEN 'max_capacity must be a number'
+                   WHEN NOT (max_capacity_value > 0
+                             AND max_capacity_value < 'Infinity')
+                       THEN 'max_capacity must be greater than 0'
+                   WHEN vessel_type IS NULL
+                        OR vessel_type <> ALL (CAST(:vessel_types AS text[]))
+                       THEN 'invalid vessel_type'
+                   WHEN is_active IS NOT NULL AND is_active_value IS NULL
+                       THEN 'is_active must be a boolean'
+                   END AS error
+            FROM typed
+            """
+        ),
+        {"vessel_types": list(get_args(VESSEL_TYPE))},
+    )
+    conn.execute(text("ANALYZE import_rows"))
+    # The first line with an IMO number wins; later ones are rejected.
+    conn.execute(
+        text(
+            """
+            UPDATE import_rows r
+            SET error = 'duplicate imo_number in file (first on line '
+                        || d.first_line || ')'
+            FROM (
+                SELECT line,
+                       min(line) OVER (PARTITION BY imo_number) AS first_line
+                FROM import_rows
+                WHERE error IS NULL
+            ) AS d
+            WHERE r.line = d.line AND d.line <> d.first_line
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            UPDATE import_rows r
+            SET error = 'Vessel with IMO number ' || r.imo_number
+                        || ' already exists'
+            FROM vessels v
+            WHERE r.error IS NULL AND v.imo_number = r.imo_number
+            """
+        )
+    )
+
+
+def merge(conn: Connection) -> int:
+    # Vessels created concurrently since validation are rejected, not updated.
+    return conn.execute(
+        text(
+            """
+            WITH inserted AS (
+                INSERT INTO vessels (
+                    name, imo_number, max_capacity, vessel_type, is_active
+                )
+                SELECT name, imo_number, max_capacity, vessel_type, is_active
+                FROM import_rows
+                WHERE error IS NULL
+                ORDER BY line
+                ON CONFLICT (imo_number) DO NOTHING
+                RETURNING imo_number
+            ), raced AS (
+                UPDATE import_rows r
+                SET error = 'Vessel with IMO number ' || r.imo_number
+                            || ' already exists'
+                WHERE r.error IS NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM inserted i WHERE i.imo_number = r.imo_number
+                  )
+            )
+            SELECT count(*) FROM inserted
+            """
+        )
+    ).scalar_one()
+
+
+vessel_import = ImportSpec(COLUMNS, validate, merge)
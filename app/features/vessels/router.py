@@ -1,47 +1,101 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database.init import get_db
-from app.features.vessels.schema import VesselCreate, VesselResponse, VesselUpdate
+from app.core.query_budget import query_budget
+from app.features.vessels.schema import (
+    VesselAvailabilityQuery,
+    VesselAvailabilityResponse,
+    VesselCreate,
+    VesselResponse,
+    VesselUpdate,
+)
 from app.features.vessels.service import VesselService
-from app.shared.api_response import api_response
+from app.shared.api_response import api_json_response
+from app.shared.etag import etag_matches, not_modified
+from app.shared.pagination import PageParams
 
 router = APIRouter(prefix="/vessels", tags=["vessels"])
 
 
-@router.get("/", response_model=dict)
-def list_vessels(db: Session = Depends(get_db)):
-    vessels = VesselService.list_all(db)
-    data = [VesselResponse.model_validate(v) for v in vessels]
-    return api_response(data)
+@router.get("/", response_model=dict, dependencies=[query_budget(1)])
+async def list_vessels(
+    page: PageParams = Depends(),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    vessels, next_cursor, etag = await VesselService.list_all(
+        db, page.limit, page.cursor
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return api_json_response(
+        vessels, VesselResponse, headers={"ETag": etag}, next_cursor=next_cursor
+    )
 
 
-@router.get("/{vessel_id}", response_model=dict)
-def get_vessel(vessel_id: int, db: Session = Depends(get_db)):
-    vessel = VesselService.get_by_id(db, vessel_id)
-    return api_response(VesselResponse.model_validate(vessel))
+@router.get("/available", response_model=dict, dependencies=[query_budget(1)])
+async def list_available_vessels(
+    query: VesselAvailabilityQuery = Query(), db: AsyncSession = Depends(get_db)
+):
+    rows = await VesselService.list_available(db, query)
+    data = [
+        VesselAvailabilityResponse(
+            **VesselResponse.model_validate(vessel).model_dump(),
+            free_capacity=free,
+        )
+        for vessel, free in rows
+    ]
+    return api_json_response(data)
 
 
-@router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
-def create_vessel(payload: VesselCreate, db: Session = Depends(get_db)):
-    vessel = VesselService.create(db, payload)
-    return api_response(VesselResponse.model_validate(vessel))
+@router.get("/{vessel_id}", response_model=dict, dependencies=[query_budget(1)])
+async def get_vessel(
+    vessel_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    etag, vessel = await VesselService.get_response(db, vessel_id, if_none_match)
+    if vessel is None:
+        return not_modified(etag)
+    return api_json_response(vessel, headers={"ETag": etag})
 
 
-@router.put("/{vessel_id}", response_model=dict)
-def update_vessel(vessel_id: int, payload: VesselUpdate, db: Session = Depends(get_db)):
-    vessel = VesselService.update(db, vessel_id, payload)
-    return api_response(VesselResponse.model_validate(vessel))
+@router.post(
+    "/",
+    response_model=dict,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[query_budget(3)],
+)
+async def create_vessel(payload: VesselCreate, db: AsyncSession = Depends(get_db)):
+    vessel = await VesselService.create(db, payload)
+    return api_json_response(
+        vessel, VesselResponse, status_code=status.HTTP_201_CREATED
+    )
+
+
+@router.put("/{vessel_id}", response_model=dict, dependencies=[query_budget(6)])
+async def update_vessel(
+    vessel_id: int, payload: VesselUpdate, db: AsyncSession = Depends(get_db)
+):
+    vessel = await VesselService.update(db, vessel_id, payload)
+    return api_json_response(vessel, VesselResponse)
 
 
-@router.patch("/{vessel_id}", response_model=dict)
-def partial_update_vessel(
-    vessel_id: int, payload: VesselUpdate, db: Session = Depends(get_db)
+@router.patch("/{vessel_id}", response_model=dict, dependencies=[query_budget(6)])
+async def partial_update_vessel(
+    vessel_id: int, payload: VesselUpdate, db: AsyncSession = Depends(get_db)
 ):
-    vessel = VesselService.update(db, vessel_id, payload)
-    return api_response(VesselResponse.model_validate(vessel))
+    vessel = await VesselService.update(db, vessel_id, payload)
+    return api_json_response(vessel, VesselResponse)
 
 
-@router.delete("/{vessel_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_vessel(vessel_id: int, db: Session = Depends(get_db)):
-    VesselService.delete(db, vessel_id)
+@router.delete(
+    "/{vessel_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[query_budget(4)],
+)
+async def delete_vessel(vessel_id: int, db: AsyncSession = Depends(get_db)):
+    await VesselService.delete(db, vessel_id)
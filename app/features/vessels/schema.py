@@ -4,6 +4,9 @@ from typing import Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
+from app.shared.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from app.shared.ports import AVAILABLE_PORTS
+
 VESSEL_TYPE = Literal[
     "bulk_carrier",
     "container_ship",
@@ -25,9 +28,6 @@ class VesselBase(BaseModel):
     max_capacity: float = Field(
         ..., gt=0, description="Maximum capacity in metric tons"
     )
-    current_reserved_capacity: float = Field(
-        0.0, ge=0, description="Currently reserved capacity"
-    )
     vessel_type: VESSEL_TYPE = Field(..., description="Type of vessel")
     is_active: bool = Field(True, description="Whether the vessel is active")
 
@@ -41,12 +41,6 @@ class VesselBase(BaseModel):
             )
         return v.upper()
 
-    @model_validator(mode="after")
-    def validate_reserved_capacity(self):
-        if self.current_reserved_capacity > self.max_capacity:
-            raise ValueError("current_reserved_capacity cannot exceed max_capacity")
-        return self
-
 
 class VesselCreate(VesselBase):
     pass
@@ -56,7 +50,6 @@ class VesselUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=255)
     imo_number: Optional[str] = Field(None, min_length=10, max_length=10)
     max_capacity: Optional[float] = Field(None, gt=0)
-    current_reserved_capacity: Optional[float] = Field(None, ge=0)
     vessel_type: Optional[VESSEL_TYPE] = None
     is_active: Optional[bool] = None
 
@@ -78,10 +71,30 @@ class VesselResponse(BaseModel):
     name: str
     imo_number: str
     max_capacity: float
-    current_reserved_capacity: float
     vessel_type: str
     is_active: bool
     created_at: datetime
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class VesselAvailabilityQuery(BaseModel):
+    start: datetime = Field(..., description="Window start")
+    end: datetime = Field(..., description="Window end")
+    port: Optional[AVAILABLE_PORTS] = Field(
+        None, description="Only vessels assigned to a leg calling at this port"
+    )
+    min_capacity: float = Field(0.0, ge=0, description="Required free capacity")
+    vessel_type: Optional[VESSEL_TYPE] = None
+    limit: int = Field(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT)
+
+    @model_validator(mode="after")
+    def validate_time_range(self):
+        if self.end <= self.start:
+            raise ValueError("end must be after start")
+        return self
+
+
+class VesselAvailabilityResponse(VesselResponse):
+    free_capacity: float
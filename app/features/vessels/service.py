@@ -1,17 +1,44 @@
-from typing import List
+from datetime import date, datetime
+from typing import List, Optional, Tuple
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, exists, func, or_, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import cache_registry, notify_invalidation
+from app.features.bookings.model import Booking
+from app.features.capacity.model import VesselCapacityBucket
+from app.features.capacity.service import covered_days
+from app.features.routes.graph import route_graph
+from app.features.routes.model import Leg
+from app.features.routes.service import route_cache
 from app.features.vessels.model import Vessel
-from app.features.vessels.schema import VesselCreate, VesselUpdate
+from app.features.vessels.schema import (
+    VesselAvailabilityQuery,
+    VesselCreate,
+    VesselResponse,
+    VesselUpdate,
+)
+from app.shared.etag import etag_matches, item_etag, page_etag
+from app.shared.pagination import decode_cursor, split_page
+
+vessel_cache = cache_registry.create("vessels")
+
+
+def _window_days(start: datetime, end: datetime) -> Tuple[date, date]:
+    days = covered_days(start, end)
+    return days[0], days[-1]
 
 
 class VesselService:
     @staticmethod
-    def get_or_404(db: Session, vessel_id: int) -> Vessel:
-        vessel = db.get(Vessel, vessel_id)
+    async def get_or_404(
+        db: AsyncSession, vessel_id: int, lock: bool = False
+    ) -> Vessel:
+        # FOR NO KEY UPDATE, the lock the UPDATE itself would take: it waits
+        # for bookings holding FOR SHARE on the vessel and blocks new ones.
+        with_for_update = {"key_share": True} if lock else None
+        vessel = await db.get(Vessel, vessel_id, with_for_update=with_for_update)
         if vessel is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -20,32 +47,112 @@ class VesselService:
         return vessel
 
     @staticmethod
-    def list_all(db: Session) -> List[Vessel]:
-        stmt = select(Vessel).order_by(Vessel.id)
-        result = db.execute(stmt)
-        return list(result.scalars().all())
+    def _page_stmt(limit: int, cursor: Optional[str], *columns) -> Select:
+        stmt = select(*columns).order_by(Vessel.id).limit(limit + 1)
+        if cursor is not None:
+            (last_id,) = decode_cursor(cursor, int)
+            stmt = stmt.where(Vessel.id > last_id)
+        return stmt
+
+    @staticmethod
+    async def list_all(
+        db: AsyncSession, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Vessel], Optional[str], str]:
+        result = await db.execute(VesselService._page_stmt(limit, cursor, Vessel))
+        rows = list(result.scalars().all())
+        page, next_cursor = split_page(rows, limit, lambda v: [v.id])
+        return page, next_cursor, page_etag(rows)
+
+    @staticmethod
+    async def list_available(
+        db: AsyncSession, query: VesselAvailabilityQuery
+    ) -> List[Tuple[Vessel, float]]:
+        peak_reserved = (
+            select(func.max(VesselCapacityBucket.reserved_capacity))
+            .where(
+                VesselCapacityBucket.vessel_id == Vessel.id,
+                VesselCapacityBucket.day.between(*_window_days(query.start, query.end)),
+            )
+            .scalar_subquery()
+        )
+        free_capacity = (Vessel.max_capacity - func.coalesce(peak_reserved, 0)).label(
+            "free_capacity"
+        )
+        # Probes the GiST index behind excl_vessel_no_overlapping_bookings.
+        booked = exists().where(
+            Booking.vessel_id == Vessel.id,
+            func.tstzrange(Booking.start_time, Booking.end_time).op("&&")(
+                func.tstzrange(query.start, query.end)
+            ),
+        )
+        stmt = (
+            select(Vessel, free_capacity)
+            # "= true" (not "IS true") so the planner can use idx_active_vessels.
+            .where(Vessel.is_active == true(), ~booked)
+            .where(free_capacity >= query.min_capacity)
+            .order_by(free_capacity.desc(), Vessel.id)
+            .limit(query.limit)
+        )
+        if query.vessel_type is not None:
+            stmt = stmt.where(Vessel.vessel_type == query.vessel_type)
+        if query.port is not None:
+            stmt = stmt.where(
+                exists().where(
+                    Leg.vessel_id == Vessel.id,
+                    or_(
+                        Leg.origin_port == query.port,
+                        Leg.destination_port == query.port,
+                    ),
+                )
+            )
+        result = await db.execute(stmt)
+        return [(vessel, free) for vessel, free in result.all()]
 
     @staticmethod
-    def get_by_id(db: Session, vessel_id: int) -> Vessel:
-        return VesselService.get_or_404(db, vessel_id)
+    async def get_by_id(db: AsyncSession, vessel_id: int) -> Vessel:
+        return await VesselService.get_or_404(db, vessel_id)
 
     @staticmethod
-    def create(db: Session, payload: VesselCreate) -> Vessel:
+    async def get_response(
+        db: AsyncSession, vessel_id: int, if_none_match: Optional[str] = None
+    ) -> Tuple[str, Optional[VesselResponse]]:
+        """Return the vessel's ETag and response model.
+
+        The model is ``None`` when ``if_none_match`` already matches, in which
+        case the row is never converted.
+        """
+        cached = vessel_cache.get(vessel_id)
+        if cached is not None:
+            etag = item_etag(cached)
+            return etag, None if etag_matches(if_none_match, etag) else cached
+        generation = vessel_cache.generation()
+        vessel = await VesselService.get_or_404(db, vessel_id)
+        etag = item_etag(vessel)
+        if etag_matches(if_none_match, etag):
+            return etag, None
+        response = VesselResponse.model_validate(vessel)
+        vessel_cache.set(vessel_id, response, generation)
+        return etag, response
+
+    @staticmethod
+    async def create(db: AsyncSession, payload: VesselCreate) -> Vessel:
         stmt = select(Vessel).where(Vessel.imo_number == payload.imo_number)
-        if db.execute(stmt).scalar_one_or_none():
+        if (await db.execute(stmt)).scalar_one_or_none():
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=f"Vessel with IMO number {payload.imo_number} already exists",
             )
         vessel = Vessel(**payload.model_dump())
         db.add(vessel)
-        db.commit()
-        db.refresh(vessel)
+        await db.commit()
+        await db.refresh(vessel)
         return vessel
 
     @staticmethod
-    def update(db: Session, vessel_id: int, payload: VesselUpdate) -> Vessel:
-        vessel = VesselService.get_or_404(db, vessel_id)
+    async def update(db: AsyncSession, vessel_id: int, payload: VesselUpdate) -> Vessel:
+        # Locked before the booked peak is read, so no booking can charge the
+        # buckets between that check and the new max_capacity being committed.
+        vessel = await VesselService.get_or_404(db, vessel_id, lock=True)
         update_data = payload.model_dump(exclude_unset=True)
 
         if "imo_number" in update_data:
@@ -53,7 +160,7 @@ class VesselService:
                 Vessel.imo_number == update_data["imo_number"],
                 Vessel.id != vessel_id,
             )
-            if db.execute(stmt).scalar_one_or_none():
+            if (await db.execute(stmt)).scalar_one_or_none():
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail=(
@@ -63,24 +170,55 @@ class VesselService:
                 )
 
         max_cap = update_data.get("max_capacity", vessel.max_capacity)
-        reserved = update_data.get(
-            "current_reserved_capacity", vessel.current_reserved_capacity
-        )
-        if reserved > max_cap:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="current_reserved_capacity cannot exceed max_capacity",
-            )
+        if max_cap < vessel.max_capacity:
+            booked_peak = (
+                await db.execute(
+                    select(func.max(VesselCapacityBucket.reserved_capacity)).where(
+                        VesselCapacityBucket.vessel_id == vessel_id,
+                        VesselCapacityBucket.day >= func.current_date(),
+                    )
+                )
+            ).scalar()
+            if booked_peak is not None and booked_peak > max_cap:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=(
+                        "max_capacity cannot be below booked capacity "
+                        f"({booked_peak:.2f})"
+                    ),
+                )
 
         for key, value in update_data.items():
             setattr(vessel, key, value)
 
-        db.commit()
-        db.refresh(vessel)
+        await notify_invalidation(db, vessel_cache, vessel_id)
+        await db.commit()
+        vessel_cache.invalidate(vessel_id)
+        await db.refresh(vessel)
         return vessel
 
     @staticmethod
-    def delete(db: Session, vessel_id: int) -> None:
-        vessel = VesselService.get_or_404(db, vessel_id)
-        db.delete(vessel)
-        db.commit()
+    async def delete(db: AsyncSession, vessel_id: int) -> None:
+        vessel = await VesselService.get_or_404(db, vessel_id)
+        # Detach legs here rather than via ON DELETE SET NULL so their
+        # updated_at moves too; cached routes that use the vessel go stale.
+        route_ids = set(
+            (
+                await db.execute(
+                    update(Leg)
+                    .where(Leg.vessel_id == vessel_id)
+                    .values(vessel_id=None)
+                    .returning(Leg.route_id)
+                )
+            )
+            .scalars()
+            .all()
+        )
+        await db.delete(vessel)
+        await notify_invalidation(db, vessel_cache, vessel_id)
+        await notify_invalidation(db, route_cache, *route_ids)
+        await db.commit()
+        vessel_cache.invalidate(vessel_id)
+        for route_id in route_ids:
+            route_cache.invalidate(route_id)
+            route_graph.invalidate(route_id)
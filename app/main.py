@@ -1,21 +1,148 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
+from app.core.cache import InvalidationListener, cache_registry
+from app.core.config import (
+    AUDIT_PARTITION_MONTHS_AHEAD,
+    METRICS_ENABLED,
+    QUERY_BUDGET_STRICT,
+    QUERY_REPEAT_THRESHOLD,
+    QUERY_TRACKING_ENABLED,
+    THREADPOOL_SIZE,
+    WARMUP_CONNECTIONS,
+    WARMUP_ENABLED,
+    WARMUP_TIMEOUT,
+)
+from app.core.database.init import async_engine
+from app.core.database.pool import pool_stats
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, render_metrics
+from app.core.query_budget import QueryBudgetMiddleware
+from app.core.warmup import warm_up, warmup_state
 from app.features.bookings.router import router as bookings_router
+from app.features.capacity.router import router as capacity_router
 from app.features.routes.router import router as routes_router
+from app.features.shipments.partitions import (
+    ensure_audit_partitions,
+    missing_audit_partitions,
+)
 from app.features.shipments.router import router as shipments_router
 from app.features.vessels.router import router as vessels_router
 from app.shared.api_response import api_response
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+
+async def _ensure_audit_partitions() -> None:
+    # Keeps future months partitioned even if the cron job is not set up; rows
+    # would otherwise pile up in the default partition.
+    try:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(ensure_audit_partitions, AUDIT_PARTITION_MONTHS_AHEAD)
+            missing = await conn.run_sync(
+                missing_audit_partitions, AUDIT_PARTITION_MONTHS_AHEAD
+            )
+    except Exception:
+        logger.warning("could not create shipment_audit partitions", exc_info=True)
+        return
+    if missing:
+        logger.warning("missing shipment_audit partitions: %s", ", ".join(missing))
+
+
+async def _warm_up(app: FastAPI) -> None:
+    # Runs before the worker starts accepting, so no client pays for the first
+    # connections, prepared statements and compiled queries.
+    if not WARMUP_ENABLED:
+        warmup_state.done = True
+        return
+    try:
+        await asyncio.wait_for(
+            warm_up(app, async_engine, WARMUP_CONNECTIONS), WARMUP_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        logger.warning("warm-up timed out after %.1fs", WARMUP_TIMEOUT)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    listener = InvalidationListener(
+        async_engine.url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+    )
+    listener.start()
+    await _ensure_audit_partitions()
+    await _warm_up(app)
+    yield
+    await listener.stop()
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+if QUERY_TRACKING_ENABLED:
+    app.add_middleware(
+        QueryBudgetMiddleware,
+        strict=QUERY_BUDGET_STRICT,
+        repeat_threshold=QUERY_REPEAT_THRESHOLD,
+    )
 
 app.include_router(vessels_router, prefix="/api")
+app.include_router(capacity_router, prefix="/api")
 app.include_router(bookings_router, prefix="/api")
 app.include_router(routes_router, prefix="/api")
 app.include_router(shipments_router, prefix="/api")
 
 
+@app.get("/health/pool", response_model=dict)
+async def pool_health():
+    pool = async_engine.pool
+    return api_response(
+        {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "threadpool_size": THREADPOOL_SIZE,
+            **pool_stats.snapshot(),
+        }
+    )
+
+
+@app.get("/health/ready", response_model=dict)
+async def readiness():
+    if not warmup_state.done:
+        return JSONResponse(
+            status_code=503,
+            content=api_response(success=False, error="Warm-up in progress"),
+        )
+    return api_response(
+        {
+            "warmup_seconds": warmup_state.seconds,
+            "warmup_requests": warmup_state.requests,
+            "warmup_errors": warmup_state.errors,
+        }
+    )
+
+
+@app.get("/health/cache", response_model=dict)
+async def cache_health():
+    return api_response(cache_registry.stats())
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(
+        render_metrics(async_engine.pool), media_type=PROMETHEUS_CONTENT_TYPE
+    )
+
+
 def _format_validation_errors(exc: RequestValidationError) -> str:
     errors = []
     for err in exc.errors():
@@ -1,6 +1,63 @@
-def api_response(data=None, success=True, error=None):
-    return {
+from functools import lru_cache
+from typing import Any, List, Mapping, Optional, Sequence, Type
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json
+
+
+def api_response(data=None, success=True, error=None, **meta):
+    response = {
         "success": success,
         "data": data if success else None,
         "error": error if not success else None,
     }
+    response.update(meta)
+    return response
+
+
+class ApiJSONResponse(Response):
+    media_type = "application/json"
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def _dump_data(data: Any, schema: Optional[Type[BaseModel]]) -> bytes:
+    if schema is None:
+        return to_json(data)
+    if isinstance(data, Sequence):
+        adapter = _list_adapter(schema)
+    else:
+        adapter = _adapter(schema)
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+def api_json_response(
+    data: Any = None,
+    schema: Optional[Type[BaseModel]] = None,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+    **meta: Any,
+) -> ApiJSONResponse:
+    """Build the ``api_response`` envelope straight to JSON bytes.
+
+    ORM rows are validated against ``schema`` in one pass with a cached
+    ``TypeAdapter`` and serialized by pydantic-core, skipping
+    ``jsonable_encoder``. The output matches ``api_response`` rendered by
+    FastAPI's ``JSONResponse`` byte for byte.
+    """
+    parts = [b'{"success":true,"data":', _dump_data(data, schema), b',"error":null']
+    for key, value in meta.items():
+        parts.append(b"," + to_json(key) + b":" + to_json(value))
+    parts.append(b"}")
+    return ApiJSONResponse(
+        content=b"".join(parts), status_code=status_code, headers=headers
+    )
@@ -0,0 +1,44 @@
+import hashlib
+from typing import Any, Callable, Iterable, Optional
+
+from fastapi import Response, status
+
+
+def compute_etag(*parts: Any) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def item_etag(obj: Any) -> str:
+    """ETag for a single row, or its cached response model, from id + updated_at."""
+    return compute_etag(obj.id, obj.updated_at)
+
+
+def row_version(row: Any) -> Any:
+    return row.id, row.updated_at
+
+
+def page_etag(rows: Iterable[Any], version: Callable[[Any], Any] = row_version) -> str:
+    """ETag for a list page from the version of every row, in page order.
+
+    Pass the ``limit + 1`` fetch, before it is trimmed, so the row that decides
+    ``next_cursor`` counts too. Any row entering, leaving or moving within the
+    page changes the tag, even when its ``updated_at`` is older than the rest.
+    """
+    return compute_etag([version(row) for row in rows])
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored.
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
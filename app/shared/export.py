@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterator, List, Literal, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from app.core.config import EXPORT_BATCH_SIZE
+from app.core.database.init import AsyncSessionLocal
+
+ExportFormat = Literal["ndjson", "csv"]
+
+_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _ndjson_chunk(columns: List[str], rows: Sequence[Sequence[Any]]) -> str:
+    return "".join(
+        json.dumps(
+            {col: _plain(val) for col, val in zip(columns, row)},
+            separators=(",", ":"),
+        )
+        + "\n"
+        for row in rows
+    )
+
+
+def _csv_chunk(rows: Sequence[Sequence[Any]]) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerows([_plain(val) for val in row] for row in rows)
+    return buf.getvalue()
+
+
+def export_response(
+    stmt: Select, filename: str, fmt: ExportFormat
+) -> StreamingResponse:
+    """Stream a Core select as NDJSON or CSV through a server-side cursor.
+
+    The session is opened inside the body iterator so it lives exactly as long
+    as the stream; only one ``EXPORT_BATCH_SIZE`` partition is held in memory.
+    """
+    columns = [col.key for col in stmt.selected_columns]
+    stmt = stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    async def body() -> AsyncIterator[str]:
+        if fmt == "csv":
+            yield _csv_chunk([columns])
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(stmt)
+            async for rows in result.partitions():
+                if fmt == "csv":
+                    yield _csv_chunk(rows)
+                else:
+                    yield _ndjson_chunk(columns, rows)
+
+    return StreamingResponse(
+        body(),
+        media_type=_MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{fmt}"',
+        },
+    )
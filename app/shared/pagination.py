@@ -0,0 +1,64 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+
+from fastapi import HTTPException, Query, status
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(
+            DEFAULT_PAGE_LIMIT,
+            ge=1,
+            le=MAX_PAGE_LIMIT,
+            description="Maximum number of items to return",
+        ),
+        cursor: Optional[str] = Query(
+            None, description="Opaque cursor from a previous page's next_cursor"
+        ),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor has wrong shape")
+        return [cast(value) for cast, value in zip(types, values)]
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+def split_page(
+    rows: List[T], limit: int, key: Callable[[T], Sequence[Any]]
+) -> Tuple[List[T], Optional[str]]:
+    """Trim a ``limit + 1`` fetch to ``limit`` rows and build the next cursor."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
@@ -0,0 +1,159 @@
+"""Compare per-row and per-statement shipment audit triggers.
+
+For each size, seeds that many shipments, installs one trigger variant and
+times a single ``UPDATE shipments SET status = ...`` over all of them. Every
+run happens inside a transaction that is rolled back, so the database is left
+untouched:
+
+    uv run python -m benchmarks.audit_trigger --sizes 1000 10000 100000
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List
+
+from sqlalchemy import text
+
+from app.core.database.init import engine
+
+VARIANTS: Dict[str, List[str]] = {
+    "row": [
+        """
+        CREATE OR REPLACE FUNCTION log_shipment_status_change()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF OLD.status IS DISTINCT FROM NEW.status THEN
+                INSERT INTO shipment_audit (
+                    shipment_id, old_status, new_status, changed_at
+                )
+                VALUES (NEW.id, OLD.status::text, NEW.status::text, now());
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER trigger_shipment_status_audit
+        AFTER UPDATE ON shipments
+        FOR EACH ROW
+        EXECUTE FUNCTION log_shipment_status_change()
+        """,
+    ],
+    "statement": [
+        """
+        CREATE OR REPLACE FUNCTION log_shipment_status_change()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            INSERT INTO shipment_audit (
+                shipment_id, old_status, new_status, changed_at
+            )
+            SELECT n.id, o.status::text, n.status::text, now()
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            WHERE o.status IS DISTINCT FROM n.status
+            ORDER BY n.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER trigger_shipment_status_audit
+        AFTER UPDATE ON shipments
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION log_shipment_status_change()
+        """,
+    ],
+}
+
+
+def run_once(variant: str, size: int) -> Dict:
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            conn.execute(
+                text(
+                    "DROP TRIGGER IF EXISTS trigger_shipment_status_audit ON shipments"
+                )
+            )
+            for ddl in VARIANTS[variant]:
+                conn.execute(text(ddl))
+            vessel_id = conn.execute(
+                text(
+                    """
+                    INSERT INTO vessels (
+                        name, imo_number, max_capacity, vessel_type, is_active
+                    )
+                    VALUES ('audit-bench', 'IMO8999999', 1, 'other', true)
+                    RETURNING id
+                    """
+                )
+            ).scalar_one()
+            booking_id = conn.execute(
+                text(
+                    """
+                    INSERT INTO bookings (
+                        vessel_id, reserved_capacity, start_time, end_time, port_name
+                    )
+                    VALUES (:vessel_id, 1, now(), now() + interval '1 day', 'Dubai')
+                    RETURNING id
+                    """
+                ),
+                {"vessel_id": vessel_id},
+            ).scalar_one()
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO shipments (booking_id, status)
+                    SELECT :booking_id, 'PENDING' FROM generate_series(1, :size)
+                    """
+                ),
+                {"booking_id": booking_id, "size": size},
+            )
+            start = time.perf_counter()
+            updated = conn.execute(
+                text(
+                    """
+                    UPDATE shipments SET status = 'IN_TRANSIT'
+                    WHERE booking_id = :booking_id
+                    """
+                ),
+                {"booking_id": booking_id},
+            ).rowcount
+            elapsed = time.perf_counter() - start
+            audited = conn.execute(
+                text(
+                    """
+                    SELECT count(*) FROM shipment_audit a
+                    JOIN shipments s ON s.id = a.shipment_id
+                    WHERE s.booking_id = :booking_id
+                    """
+                ),
+                {"booking_id": booking_id},
+            ).scalar_one()
+        finally:
+            trans.rollback()
+    return {
+        "variant": variant,
+        "rows": updated,
+        "audit_rows": audited,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "us_per_row": round(elapsed / updated * 1e6, 2) if updated else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+    results = [
+        run_once(variant, size)
+        for size in args.sizes
+        for variant in ("row", "statement")
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Booking throughput with many clients on one vessel, per create path.
+
+The old path (share-lock the vessel, lock the day buckets, check capacity in
+Python, insert, apply the deltas, commit, refresh) is reproduced here and run
+before the conditional ``BookingService.create`` and the group-commit
+coalescer (``--coalesce-window-ms``, ``--coalesce-max-batch``). Each run gets
+a fresh vessel. Every client books non-overlapping slots on the same
+day, so all requests contend for one bucket. The vessel only has room for
+``--capacity-share`` of the requests, so the tail of each run exercises the
+rejection path. Afterwards the run checks that the bucket equals the sum of
+the bookings created and never exceeds max_capacity. The vessels are deleted
+at the end.
+
+The pool bounds how many clients reach the database at once, so size it for
+the client count (within the server's ``max_connections``):
+
+    DB_POOL_SIZE=80 DB_MAX_OVERFLOW=0 uv run python -m \\
+        benchmarks.booking_contention --clients 200 --bookings 4000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database.init import AsyncSessionLocal, async_engine
+from app.features.bookings.coalescer import BookingCoalescer
+from app.features.bookings.model import Booking
+from app.features.bookings.schema import BookingCreate
+from app.features.bookings.service import (
+    OVERLAP_DETAIL,
+    BookingService,
+    _is_overlap_violation,
+)
+from app.features.capacity.model import VesselCapacityBucket
+from app.features.capacity.service import CapacityService, covered_days
+from app.features.vessels.model import Vessel
+from app.main import app  # noqa: F401  (configures mappers for all models)
+from benchmarks.http_load import percentile
+
+EPOCH = datetime(2042, 1, 1, tzinfo=timezone.utc)
+BENCH_PREFIX = "bench-contention-"
+
+
+async def legacy_create(db, payload: BookingCreate) -> Booking:
+    stmt = (
+        select(Vessel).where(Vessel.id == payload.vessel_id).with_for_update(read=True)
+    )
+    vessel = (await db.execute(stmt)).scalar_one_or_none()
+    if vessel is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Vessel not found")
+    if not vessel.is_active:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Cannot book inactive vessel")
+    span = (vessel.id, payload.start_time, payload.end_time)
+    reserved = await CapacityService.lock_buckets(db, [span])
+    peak = CapacityService.peak(
+        reserved, vessel.id, covered_days(payload.start_time, payload.end_time)
+    )
+    if peak + payload.reserved_capacity > vessel.max_capacity:
+        raise HTTPException(status.HTTP_409_CONFLICT, "Insufficient capacity")
+    booking = Booking(**payload.model_dump())
+    db.add(booking)
+    await CapacityService.apply(
+        db, CapacityService.span_deltas([(span, payload.reserved_capacity)])
+    )
+    try:
+        await db.commit()
+        await db.refresh(booking)
+    except IntegrityError as e:
+        await db.rollback()
+        if _is_overlap_violation(e):
+            raise HTTPException(status.HTTP_409_CONFLICT, OVERLAP_DETAIL)
+        raise
+    return booking
+
+
+async def create_vessel(label: str, capacity: float) -> int:
+    async with AsyncSessionLocal() as db:
+        vessel = Vessel(
+            name=f"{BENCH_PREFIX}{label}",
+            imo_number=f"IMO{random.randrange(10**7):07d}",
+            max_capacity=capacity,
+            vessel_type="container_ship",
+        )
+        db.add(vessel)
+        await db.commit()
+        return vessel.id
+
+
+async def run_one(args, label: str, create, coalescer=None) -> dict:
+    capacity = float(int(args.bookings * args.capacity_share))
+    vessel_id = await create_vessel(label, capacity)
+    # Shared by all clients, so each slot is booked once.
+    slots = iter(range(args.bookings))
+    latencies = []
+    codes: Counter = Counter()
+
+    async def client() -> None:
+        for n in slots:
+            start_time = EPOCH + timedelta(seconds=n * args.slot_seconds)
+            payload = BookingCreate(
+                vessel_id=vessel_id,
+                reserved_capacity=1,
+                start_time=start_time,
+                end_time=start_time + timedelta(seconds=args.slot_seconds),
+                port_name="Singapore",
+            )
+            start = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                try:
+                    await create(db, payload)
+                    codes[status.HTTP_201_CREATED] += 1
+                except HTTPException as e:
+                    codes[e.status_code] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.clients)))
+    elapsed = time.perf_counter() - start
+
+    async with AsyncSessionLocal() as db:
+        booked = (
+            await db.execute(
+                select(
+                    func.count(), func.coalesce(func.sum(Booking.reserved_capacity), 0)
+                ).where(Booking.vessel_id == vessel_id)
+            )
+        ).one()
+        bucket = (
+            await db.execute(
+                select(
+                    func.coalesce(func.sum(VesselCapacityBucket.reserved_capacity), 0)
+                ).where(VesselCapacityBucket.vessel_id == vessel_id)
+            )
+        ).scalar_one()
+    result = {
+        "label": label,
+        "clients": args.clients,
+        "requests": len(latencies),
+        "status_codes": dict(sorted(codes.items())),
+        "elapsed_s": round(elapsed, 3),
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_capacity": capacity,
+        "bookings_created": booked[0],
+        "consistent": booked[0] == codes[status.HTTP_201_CREATED]
+        and booked[1] == bucket <= capacity,
+    }
+    if coalescer is not None:
+        result["batches"] = coalescer.batches
+        result["mean_batch_size"] = round(coalescer.batched / coalescer.batches, 1)
+    return result
+
+
+async def run(args) -> list:
+    coalescer = BookingCoalescer(
+        args.coalesce_window_ms / 1000, args.coalesce_max_batch
+    )
+    results = [
+        await run_one(args, "lock_then_check", legacy_create),
+        await run_one(args, "conditional_upsert", BookingService.create),
+        await run_one(
+            args,
+            "coalesced",
+            lambda db, payload: coalescer.submit(payload),
+            coalescer,
+        ),
+    ]
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Vessel).where(Vessel.name.like(f"{BENCH_PREFIX}%")))
+        await db.commit()
+    await async_engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--bookings", type=int, default=4000)
+    parser.add_argument("--capacity-share", type=float, default=0.75)
+    parser.add_argument("--slot-seconds", type=int, default=10)
+    parser.add_argument("--coalesce-window-ms", type=float, default=2.0)
+    parser.add_argument("--coalesce-max-batch", type=int, default=64)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Measure how soon a freshly started server answers at steady-state latency.
+
+Starts a single uvicorn worker once with the startup warm-up and once without,
+and for each start records:
+
+- ``ready_s``: process spawn until the first 200 from ``/health/ready``;
+- the latency of the first burst of ``--concurrency`` clients, each sending
+  every hot read path once, against the steady-state p50 of ``--rounds``
+  later bursts;
+- ``first_fast_s``: spawn until the end of the first burst whose slowest
+  request stayed within ``--fast-factor`` times the steady-state p95.
+
+Run against a seeded database (see ``benchmarks.suite seed``):
+
+    uv run python -m benchmarks.cold_start --concurrency 10 --rounds 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+from sqlalchemy import text
+
+from app.core.database.init import engine
+from app.core.warmup import LISTS, hot_paths
+from benchmarks.http_load import percentile
+
+# (path, seconds since spawn at completion, latency in seconds)
+Sample = Tuple[str, float, float]
+
+
+def sample_ids() -> Dict[str, int]:
+    with engine.connect() as conn:
+        return {
+            name: conn.execute(
+                text(f"SELECT coalesce(min(id), 0) FROM {name}")
+            ).scalar_one()
+            for name in LISTS
+        }
+
+
+async def burst(
+    client: httpx.AsyncClient, paths: List[str], clients: int, spawned: float
+) -> List[Sample]:
+    async def one_client() -> List[Sample]:
+        samples = []
+        for path in paths:
+            start = time.perf_counter()
+            await client.get(path)
+            done = time.perf_counter()
+            samples.append((path, done - spawned, done - start))
+        return samples
+
+    results = await asyncio.gather(*(one_client() for _ in range(clients)))
+    return [sample for samples in results for sample in samples]
+
+
+async def measure(args, warmup: bool, paths: List[str]) -> Dict:
+    env = {**os.environ, "WARMUP_ENABLED": str(warmup).lower()}
+    command = [sys.executable, "-m", "uvicorn", "app.main:app"]
+    command += ["--port", str(args.port), "--log-level", "warning"]
+    spawned = time.perf_counter()
+    server = subprocess.Popen(command, env=env)
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60
+        ) as client:
+            while True:
+                try:
+                    if (await client.get("/health/ready")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None:
+                    raise RuntimeError("server exited during startup")
+                await asyncio.sleep(0.01)
+            ready = time.perf_counter() - spawned
+
+            bursts = [
+                await burst(client, paths, args.concurrency, spawned)
+                for _ in range(args.rounds + 1)
+            ]
+    finally:
+        server.terminate()
+        server.wait()
+
+    first = bursts[0]
+    steady = [sample for samples in bursts[1:] for sample in samples]
+    first_latencies = [s[2] for s in first]
+    steady_latencies = [s[2] for s in steady]
+    steady_p50 = {
+        path: percentile([s[2] for s in steady if s[0] == path], 50) for path in paths
+    }
+    limit = args.fast_factor * percentile(steady_latencies, 95)
+    first_fast = next(
+        (
+            max(s[1] for s in samples)
+            for samples in bursts
+            if max(s[2] for s in samples) <= limit
+        ),
+        None,
+    )
+    return {
+        "warmup": warmup,
+        "ready_s": round(ready, 3),
+        "first_fast_s": round(first_fast, 3) if first_fast is not None else None,
+        "first_burst_p50_ms": round(percentile(first_latencies, 50) * 1000, 2),
+        "first_burst_max_ms": round(max(first_latencies) * 1000, 2),
+        "steady_p50_ms": round(percentile(steady_latencies, 50) * 1000, 2),
+        "steady_p95_ms": round(percentile(steady_latencies, 95) * 1000, 2),
+        # Worst first-burst latency per path, relative to its steady p50.
+        "first_burst_slowdown": {
+            path: round(max(s[2] for s in first if s[0] == path) / steady_p50[path], 1)
+            for path in paths
+            if steady_p50[path]
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--fast-factor", type=float, default=1.5)
+    args = parser.parse_args()
+
+    paths = hot_paths(sample_ids())
+    engine.dispose()
+    results = [asyncio.run(measure(args, warmup, paths)) for warmup in (True, False)]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Measure throughput and server peak RSS of the streaming export endpoints.
+
+Start the API separately, then:
+
+    uv run python -m benchmarks.export_stream --seed 5000000 \
+        --server-pid $(pgrep -f "uvicorn app.main:app") --format ndjson
+
+Peak RSS is read from ``VmHWM`` in ``/proc/<pid>/status`` (Linux only), so it
+reflects the high-water mark of the server process over its whole lifetime;
+restart the server before each run for a clean number.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from app.core.database.init import engine
+from benchmarks.seed import seed_bookings
+
+
+def peak_rss_kib(pid: int) -> Optional[int]:
+    status = Path(f"/proc/{pid}/status")
+    if not status.exists():
+        return None
+    for line in status.read_text().splitlines():
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1])
+    return None
+
+
+def run(base_url: str, resource: str, fmt: str, server_pid: Optional[int]) -> dict:
+    rss_before = peak_rss_kib(server_pid) if server_pid else None
+    rows = 0
+    size = 0
+    start = time.perf_counter()
+    with httpx.Client(base_url=base_url, timeout=None) as client:
+        url = f"/api/{resource}/export"
+        with client.stream("GET", url, params={"format": fmt}) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes():
+                size += len(chunk)
+                rows += chunk.count(b"\n")
+    elapsed = time.perf_counter() - start
+    if fmt == "csv":
+        rows -= 1
+    return {
+        "resource": resource,
+        "format": fmt,
+        "rows": rows,
+        "bytes": size,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_s": round(rows / elapsed, 1) if elapsed else 0.0,
+        "mib_per_s": round(size / elapsed / 2**20, 2) if elapsed else 0.0,
+        "server_peak_rss_kib_before": rss_before,
+        "server_peak_rss_kib_after": peak_rss_kib(server_pid) if server_pid else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument(
+        "--resource",
+        default="bookings",
+        choices=["bookings", "shipments", "shipments/audit"],
+    )
+    parser.add_argument("--format", default="ndjson", choices=["ndjson", "csv"])
+    parser.add_argument("--seed", type=int, default=0, help="bookings to insert")
+    parser.add_argument("--server-pid", type=int)
+    args = parser.parse_args()
+
+    if args.seed:
+        with engine.begin() as conn:
+            seed_bookings(conn, args.seed)
+
+    result = run(args.base_url, args.resource, args.format, args.server_pid)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Overhead of the /metrics middleware and query events.
+
+Sends the same requests in-process (no network) to the app without
+instrumentation, then with ``MetricsMiddleware`` and the cursor events
+installed, and reports latency for both. Also times the middleware alone
+around a no-op ASGI app. Runs against the configured database:
+
+    uv run python -m benchmarks.metrics_overhead --requests 2000 \
+        --path /api/vessels/1 --path /api/routes/
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Dict, List
+
+os.environ["METRICS_ENABLED"] = "false"
+
+import httpx  # noqa: E402
+
+from app.core.database.init import async_engine  # noqa: E402
+from app.core.database.queries import instrument_queries  # noqa: E402
+from app.core.metrics import MetricsMiddleware  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.http_load import percentile  # noqa: E402
+
+
+def latency(label: str, samples: List[float]) -> Dict:
+    return {
+        "label": label,
+        "requests": len(samples),
+        "p50_us": round(percentile(samples, 50) * 1e6, 1),
+        "p95_us": round(percentile(samples, 95) * 1e6, 1),
+        "p99_us": round(percentile(samples, 99) * 1e6, 1),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 1),
+    }
+
+
+async def measure(asgi_app, paths: List[str], n: int) -> List[float]:
+    transport = httpx.ASGITransport(app=asgi_app)
+    samples = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        for i in range(n):
+            start = time.perf_counter()
+            await c.get(paths[i % len(paths)])
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def middleware_only(n: int) -> List[float]:
+    async def noop(scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message) -> None:
+        pass
+
+    wrapped = MetricsMiddleware(noop)
+    scope = {"type": "http", "method": "GET", "path": "/", "app": app}
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        await wrapped(scope, None, send)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def run(args) -> List[Dict]:
+    await measure(app, args.paths, args.warmup)
+    plain = await measure(app, args.paths, args.requests)
+    instrument_queries(async_engine.sync_engine)
+    instrumented_app = MetricsMiddleware(app)
+    await measure(instrumented_app, args.paths, args.warmup)
+    instrumented = await measure(instrumented_app, args.paths, args.requests)
+    bare = await middleware_only(args.requests)
+    await async_engine.dispose()
+    return [
+        latency("plain", plain),
+        latency("instrumented", instrumented),
+        latency("middleware_only", bare),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", action="append", dest="paths")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+    args.paths = args.paths or ["/api/vessels/1"]
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Query counts and timings for route creation and listing, old vs new path.
+
+The old path (flush, one INSERT per leg, commit, re-read with ``joinedload``)
+and the old ``joinedload`` listing are reproduced here for comparison; the
+listing outputs are checked to be byte-identical first. Runs
+against the configured database; routes it creates are deleted afterwards:
+
+    uv run python -m benchmarks.route_queries --routes 200 --legs 10
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import get_args
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import joinedload
+
+from app.core.database.init import AsyncSessionLocal, async_engine
+from app.features.routes.model import Leg, Route
+from app.features.routes.schema import LegCreate, RouteCreate, RouteResponse
+from app.features.routes.service import RouteService
+from app.main import app  # noqa: F401  (configures mappers for all models)
+from app.shared.api_response import api_json_response
+from app.shared.ports import AVAILABLE_PORTS
+from benchmarks.http_load import percentile
+
+PORTS = list(get_args(AVAILABLE_PORTS))
+
+
+class StatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+        event.listen(async_engine.sync_engine, "before_cursor_execute", self._on)
+
+    def _on(self, *args) -> None:
+        self.count += 1
+
+
+async def legacy_create(db, payload: RouteCreate) -> Route:
+    route = Route(name=payload.name)
+    db.add(route)
+    await db.flush()
+    for leg_data in sorted(payload.legs, key=lambda leg: leg.sequence):
+        db.add(Leg(route_id=route.id, **leg_data.model_dump()))
+    await db.commit()
+    result = await db.execute(
+        select(Route).where(Route.id == route.id).options(joinedload(Route.legs))
+    )
+    return result.unique().scalar_one()
+
+
+async def legacy_list(db, limit: int):
+    result = await db.execute(
+        select(Route).options(joinedload(Route.legs)).order_by(Route.id).limit(limit)
+    )
+    return result.unique().scalars().all()
+
+
+async def new_list(db, limit: int):
+    return (await RouteService.list_all(db, limit))[0]
+
+
+async def check_same_output(limit: int) -> None:
+    async with AsyncSessionLocal() as db:
+        legacy = api_json_response(await legacy_list(db, limit), RouteResponse).body
+        new = api_json_response(await new_list(db, limit), RouteResponse).body
+    if legacy != new:
+        raise SystemExit("route listing output differs from the joinedload output")
+
+
+def make_payload(i: int, legs: int) -> RouteCreate:
+    ports = [PORTS[(i + k) % len(PORTS)] for k in range(legs + 1)]
+    return RouteCreate(
+        name=f"bench-route-{i}",
+        legs=[
+            LegCreate(sequence=k, origin_port=ports[k], destination_port=ports[k + 1])
+            for k in range(legs)
+        ],
+    )
+
+
+async def measure(counter: StatementCounter, label: str, op, n: int) -> dict:
+    timings = []
+    start_count = counter.count
+    for i in range(n):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            await op(db, i)
+            timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "label": label,
+        "ops": n,
+        "statements_per_op": round((counter.count - start_count) / n, 2),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+    }
+
+
+async def run(args) -> list:
+    counter = StatementCounter()
+    payloads = [make_payload(i, args.legs) for i in range(args.routes)]
+    results = [
+        await measure(
+            counter,
+            "create_legacy",
+            lambda db, i: legacy_create(db, payloads[i]),
+            args.routes,
+        ),
+        await measure(
+            counter,
+            "create",
+            lambda db, i: RouteService.create(db, payloads[i]),
+            args.routes,
+        ),
+    ]
+    await check_same_output(args.page)
+    results += [
+        await measure(
+            counter,
+            f"list_legacy_joinedload_{args.page}",
+            lambda db, i: legacy_list(db, args.page),
+            args.lists,
+        ),
+        await measure(
+            counter,
+            f"list_json_agg_{args.page}",
+            lambda db, i: new_list(db, args.page),
+            args.lists,
+        ),
+    ]
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Route).where(Route.name.like("bench-route-%")))
+        await db.commit()
+    await async_engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", type=int, default=200)
+    parser.add_argument("--legs", type=int, default=10)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--lists", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark of the in-memory route graph used by ``/api/routes/search``.
+
+Builds a graph of synthetic legs chained into routes over ``AVAILABLE_PORTS``
+and times a full build, incremental route replacement and searches. No
+database is needed:
+
+    uv run python -m benchmarks.route_search --legs 100000 --searches 2000
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Dict, List, get_args
+
+from app.features.routes.graph import LegRef, RouteGraph
+from app.shared.ports import AVAILABLE_PORTS
+from benchmarks.http_load import percentile
+
+PORTS = list(get_args(AVAILABLE_PORTS))
+
+
+def make_route(rng: random.Random, route_id: int, first_leg_id: int, n: int):
+    ports = rng.sample(PORTS, n + 1)
+    return [
+        LegRef(
+            id=first_leg_id + i,
+            route_id=route_id,
+            sequence=i,
+            origin_port=ports[i],
+            destination_port=ports[i + 1],
+            vessel_id=rng.randrange(1, 500) if rng.random() < 0.3 else None,
+        )
+        for i in range(n)
+    ]
+
+
+def latency(samples_ms: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(percentile(samples_ms, 50), 4),
+        "p95_ms": round(percentile(samples_ms, 95), 4),
+        "p99_ms": round(percentile(samples_ms, 99), 4),
+    }
+
+
+def timed_ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--legs", type=int, default=100_000)
+    parser.add_argument("--legs-per-route", type=int, default=5)
+    parser.add_argument("--searches", type=int, default=2000)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--max-legs", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    routes = {}
+    leg_id = 1
+    while leg_id <= args.legs:
+        route_id = len(routes) + 1
+        routes[route_id] = make_route(rng, route_id, leg_id, args.legs_per_route)
+        leg_id += args.legs_per_route
+    legs = [leg for route in routes.values() for leg in route]
+
+    graph = RouteGraph("bench")
+    build_ms = timed_ms(lambda: graph.load(legs))
+
+    update_ms = []
+    for _ in range(args.updates):
+        route_id = rng.choice(list(routes))
+        new_legs = make_route(rng, route_id, leg_id, args.legs_per_route)
+        leg_id += args.legs_per_route
+        routes[route_id] = new_legs
+        update_ms.append(timed_ms(lambda: graph.replace_route(route_id, new_legs)))
+
+    results = {}
+    for vessel_assigned in (False, True):
+        search_ms = []
+        found = 0
+        for _ in range(args.searches):
+            origin, destination = rng.sample(PORTS, 2)
+            start = time.perf_counter()
+            paths = graph.search(
+                origin, destination, args.max_legs, vessel_assigned=vessel_assigned
+            )
+            search_ms.append((time.perf_counter() - start) * 1000)
+            found += len(paths)
+        label = "search_vessel_assigned" if vessel_assigned else "search"
+        results[label] = {
+            **latency(search_ms),
+            "avg_paths": round(found / args.searches, 2),
+        }
+
+    print(
+        json.dumps(
+            {
+                "legs": len(legs),
+                "routes": len(routes),
+                "build_ms": round(build_ms, 1),
+                "replace_route": latency(update_ms),
+                **results,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Bulk data seeding helpers for benchmarks.
+
+Rows are generated server-side with ``generate_series`` so seeding millions of
+rows does not round-trip through Python. ``seed_bookings`` adds vessels with
+IMO numbers starting with ``IMO9`` next to existing data; ``seed_dataset``
+replaces the whole database with a deterministic dataset for the suite.
+"""
+
+import math
+import time
+from datetime import date
+from typing import get_args
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.features.shipments.model import ShipmentStatus
+from app.shared.ports import AVAILABLE_PORTS
+
+BOOKINGS_PER_VESSEL = 10_000
+PORTS = list(get_args(AVAILABLE_PORTS))
+STATUSES = [status.value for status in ShipmentStatus]
+
+
+def seed_bookings(conn: Connection, total: int) -> None:
+    """Insert ``total`` non-overlapping bookings, each with one shipment."""
+    vessels = max(1, math.ceil(total / BOOKINGS_PER_VESSEL))
+    first_id = (
+        conn.execute(
+            text(
+                """
+            INSERT INTO vessels (
+                name, imo_number, max_capacity, vessel_type, is_active
+            )
+            SELECT 'bench-' || g,
+                   'IMO9' || lpad(g::text, 6, '0'),
+                   1e9, 'container_ship', true
+            FROM generate_series(1, :vessels) AS g
+            ON CONFLICT (imo_number) DO NOTHING
+            RETURNING id
+            """
+            ),
+            {"vessels": vessels},
+        )
+        .scalars()
+        .first()
+    )
+    if first_id is None:
+        first_id = conn.execute(
+            text("SELECT min(id) FROM vessels WHERE imo_number LIKE 'IMO9%'")
+        ).scalar_one()
+    conn.execute(
+        text(
+            """
+            INSERT INTO bookings (
+                vessel_id, reserved_capacity, start_time, end_time, port_name
+            )
+            SELECT :first_id + (g % :vessels),
+                   1,
+                   timestamptz '2030-01-01' + (g / :vessels) * interval '1 hour',
+                   timestamptz '2030-01-01' + (g / :vessels + 1) * interval '1 hour',
+                   (ARRAY['Singapore', 'Shanghai', 'Rotterdam', 'Dubai'])[g % 4 + 1]
+            FROM generate_series(0, :total - 1) AS g
+            """
+        ),
+        {"first_id": first_id, "vessels": vessels, "total": total},
+    )
+    conn.execute(
+        text(
+            """
+            INSERT INTO shipments (booking_id, status)
+            SELECT b.id, 'PENDING'
+            FROM bookings b
+            JOIN vessels v ON v.id = b.vessel_id
+            WHERE v.imo_number LIKE 'IMO9%'
+              AND NOT EXISTS (
+                  SELECT 1 FROM shipments s WHERE s.booking_id = b.id
+              )
+            """
+        )
+    )
+
+
+# Fixed epochs keep the generated dataset identical from run to run.
+BOOKINGS_FROM = "2027-01-01"
+AUDIT_FROM = "2025-01-01"
+AUDIT_TO = "2026-01-01"
+
+SEEDED_TABLES = (
+    "legs",
+    "routes",
+    "shipment_audit",
+    "shipment_status_counts",
+    "shipments",
+    "vessel_capacity_buckets",
+    "bookings",
+    "vessels",
+)
+
+
+def seed_dataset(
+    conn: Connection,
+    vessels: int,
+    bookings: int,
+    routes: int,
+    legs_per_route: int,
+    audit_rows: int,
+) -> dict:
+    """Empty the database and fill it with a deterministic dataset.
+
+    Every value is derived from the row number, so the same volumes always
+    produce the same rows and ids. Bookings on a vessel get one 12-hour slot
+    each and last at most 11 hours, so the exclusion constraint holds; their
+    capacity buckets are filled in from the bookings, and every booking gets
+    one shipment.
+    """
+    timings = {}
+
+    def step(name: str, sql: str, **params) -> None:
+        start = time.perf_counter()
+        conn.execute(text(sql), params)
+        timings[name] = round(time.perf_counter() - start, 2)
+
+    conn.execute(text(f"TRUNCATE {', '.join(SEEDED_TABLES)} RESTART IDENTITY CASCADE"))
+    step(
+        "vessels",
+        """
+        INSERT INTO vessels (
+            name, imo_number, max_capacity, vessel_type, is_active
+        )
+        SELECT 'vessel-' || g,
+               'IMO' || lpad(g::text, 7, '0'),
+               1000 + (g * 37) % 9000,
+               (ARRAY['bulk_carrier', 'container_ship', 'tanker',
+                      'general_cargo', 'roro', 'lng_carrier', 'lpg_carrier',
+                      'chemical_tanker', 'other'])[g % 9 + 1],
+               g % 20 <> 0
+        FROM generate_series(1, :vessels) AS g
+        """,
+        vessels=vessels,
+    )
+    step(
+        "bookings",
+        f"""
+        INSERT INTO bookings (
+            vessel_id, reserved_capacity, start_time, end_time, port_name
+        )
+        SELECT 1 + g % :vessels,
+               1 + (g * 31) % 50,
+               timestamptz '{BOOKINGS_FROM}'
+                   + (g / :vessels * 12 + (g * 7) % 3) * interval '1 hour',
+               timestamptz '{BOOKINGS_FROM}'
+                   + (g / :vessels * 12 + (g * 7) % 3 + 2 + (g * 13) % 8)
+                     * interval '1 hour',
+               (ARRAY{PORTS!r})[g % {len(PORTS)} + 1]
+        FROM generate_series(0, :bookings - 1) AS g
+        """,
+        vessels=vessels,
+        bookings=bookings,
+    )
+    step(
+        "capacity_buckets",
+        """
+        INSERT INTO vessel_capacity_buckets (vessel_id, day, reserved_capacity)
+        SELECT b.vessel_id, d::date, sum(b.reserved_capacity)
+        FROM bookings b,
+             generate_series(
+                 date_trunc('day', b.start_time AT TIME ZONE 'UTC'),
+                 date_trunc(
+                     'day', (b.end_time - interval '1 microsecond') AT TIME ZONE 'UTC'
+                 ),
+                 interval '1 day'
+             ) AS d
+        GROUP BY 1, 2
+        """,
+    )
+    step(
+        "shipments",
+        f"""
+        INSERT INTO shipments (booking_id, status)
+        SELECT id, (ARRAY{STATUSES!r})[id % {len(STATUSES)} + 1]::shipmentstatus
+        FROM bookings
+        """,
+    )
+    step(
+        "routes",
+        "INSERT INTO routes (name) "
+        "SELECT 'route-' || g FROM generate_series(1, :routes) AS g",
+        routes=routes,
+    )
+    # Each route walks the ports with a non-zero stride, so consecutive ports
+    # always differ and every leg starts where the previous one ended.
+    step(
+        "legs",
+        f"""
+        INSERT INTO legs (
+            route_id, sequence, origin_port, destination_port, vessel_id
+        )
+        SELECT r, i,
+               (ARRAY{PORTS!r})[(r * 3 + i * (1 + r % 9)) % {len(PORTS)} + 1],
+               (ARRAY{PORTS!r})[(r * 3 + (i + 1) * (1 + r % 9)) % {len(PORTS)} + 1],
+               CASE WHEN (r + i) % 3 = 0 THEN 1 + (r * :legs + i) % :vessels END
+        FROM generate_series(1, :routes) AS r,
+             generate_series(0, :legs - 1) AS i
+        """,
+        routes=routes,
+        legs=legs_per_route,
+        vessels=vessels,
+    )
+    conn.execute(
+        text("SELECT create_shipment_audit_partitions(:first, :last)"),
+        {"first": date.fromisoformat(AUDIT_FROM), "last": date.fromisoformat(AUDIT_TO)},
+    )
+    step(
+        "shipment_audit",
+        f"""
+        INSERT INTO shipment_audit (shipment_id, old_status, new_status, changed_at)
+        SELECT 1 + g % :shipments,
+               (ARRAY{STATUSES!r})[g % 5 + 1],
+               (ARRAY{STATUSES!r})[g % 5 + 2],
+               timestamp '{AUDIT_FROM}'
+                   + (timestamp '{AUDIT_TO}' - timestamp '{AUDIT_FROM}')
+                     * (g::float8 / :audit_rows)
+        FROM generate_series(0, :audit_rows - 1) AS g
+        """,
+        shipments=max(bookings, 1),
+        audit_rows=audit_rows,
+    )
+    step("analyze", "ANALYZE")
+    return timings
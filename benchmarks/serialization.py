@@ -0,0 +1,155 @@
+"""Micro-benchmark of list-response serialization per resource.
+
+Compares the original path (``model_validate`` per row, ``api_response`` dict,
+``jsonable_encoder``, ``JSONResponse``) with ``api_json_response``. Uses
+transient ORM objects, so no database is needed:
+
+    uv run python -m benchmarks.serialization --rows 1000 --repeat 20
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.features.bookings.model import Booking
+from app.features.bookings.schema import BookingResponse
+from app.features.routes.model import Leg, Route
+from app.features.routes.schema import RouteResponse
+from app.features.shipments.model import Shipment, ShipmentStatus
+from app.features.shipments.schema import ShipmentResponse
+from app.features.vessels.model import Vessel
+from app.features.vessels.schema import VesselResponse
+from app.main import app  # noqa: F401  (configures mappers for all models)
+from app.shared.api_response import api_json_response, api_response
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+START = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+def make_vessels(n: int) -> List[Vessel]:
+    return [
+        Vessel(
+            id=i,
+            name=f"Vessel {i}",
+            imo_number=f"IMO{i:07d}",
+            max_capacity=1000.0,
+            vessel_type="container_ship",
+            is_active=True,
+            created_at=NOW,
+            updated_at=NOW,
+        )
+        for i in range(n)
+    ]
+
+
+def make_bookings(n: int) -> List[Booking]:
+    return [
+        Booking(
+            id=i,
+            vessel_id=i % 50,
+            reserved_capacity=10.5,
+            start_time=START + timedelta(hours=i),
+            end_time=START + timedelta(hours=i + 1),
+            port_name="Rotterdam",
+            created_at=NOW,
+            updated_at=NOW,
+        )
+        for i in range(n)
+    ]
+
+
+def make_shipments(n: int) -> List[Shipment]:
+    return [
+        Shipment(
+            id=i,
+            booking_id=i,
+            status=ShipmentStatus.IN_TRANSIT,
+            created_at=NOW,
+            updated_at=NOW,
+        )
+        for i in range(n)
+    ]
+
+
+def make_routes(n: int) -> List[Route]:
+    ports = ["Singapore", "Shanghai", "Rotterdam", "Dubai", "Busan"]
+    routes = []
+    for i in range(n):
+        legs = [
+            Leg(
+                id=i * 4 + s,
+                route_id=i,
+                sequence=s,
+                origin_port=ports[s],
+                destination_port=ports[s + 1],
+                vessel_id=None,
+                created_at=NOW,
+                updated_at=NOW,
+            )
+            for s in range(4)
+        ]
+        routes.append(
+            Route(id=i, name=f"Route {i}", created_at=NOW, updated_at=NOW, legs=legs)
+        )
+    return routes
+
+
+RESOURCES: Dict[str, tuple] = {
+    "vessels": (make_vessels, VesselResponse),
+    "bookings": (make_bookings, BookingResponse),
+    "shipments": (make_shipments, ShipmentResponse),
+    "routes": (make_routes, RouteResponse),
+}
+
+
+def legacy(rows, schema) -> bytes:
+    data = [schema.model_validate(r) for r in rows]
+    content = jsonable_encoder(api_response(data, next_cursor=None))
+    return JSONResponse(content).body
+
+
+def fast(rows, schema) -> bytes:
+    return api_json_response(rows, schema, next_cursor=None).body
+
+
+def best_of(fn: Callable[[], bytes], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    results = []
+    for name, (factory, schema) in RESOURCES.items():
+        rows = factory(args.rows)
+        if legacy(rows, schema) != fast(rows, schema):
+            raise SystemExit(f"{name}: fast path output differs from legacy output")
+        legacy_s = best_of(lambda: legacy(rows, schema), args.repeat)
+        fast_s = best_of(lambda: fast(rows, schema), args.repeat)
+        results.append(
+            {
+                "resource": name,
+                "rows": args.rows,
+                "legacy_ms": round(legacy_s * 1000, 3),
+                "fast_ms": round(fast_s * 1000, 3),
+                "speedup": round(legacy_s / fast_s, 2),
+            }
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
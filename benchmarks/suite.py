@@ -0,0 +1,583 @@
+"""End-to-end benchmark suite over a seeded dataset and every /api endpoint.
+
+``seed`` empties the configured database and fills it with a deterministic
+dataset (see ``benchmarks.seed.seed_dataset``). ``run`` drives a server started
+separately with concurrent async clients through these scenarios:
+
+- ``read``: every GET endpoint on random ids of the seeded data;
+- ``write``: create/update/delete flows for vessels, bookings, shipments,
+  routes and legs, each client on its own vessel;
+- ``contention``: all clients booking short slots on one shared vessel, with
+  every tenth request overlapping an earlier slot;
+- ``export``: one full download of each streaming export.
+
+Results (req/s, p50/p95/p99 and status counts per endpoint) are written as
+JSON; ``compare`` reports p95 regressions between two result files:
+
+    uv run python -m benchmarks.suite seed --vessels 10000 --bookings 5000000 \
+        --routes 100000 --audit-rows 10000000
+    uv run python -m benchmarks.suite run --concurrency 64 --duration 30 \
+        --output baseline.json
+    uv run python -m benchmarks.suite compare baseline.json candidate.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import text
+
+from app.core.database.init import engine
+from benchmarks.http_load import summarize
+from benchmarks.seed import BOOKINGS_FROM, PORTS, seed_dataset
+
+SUITE_PREFIX = "suite-"
+WRITE_EPOCH = datetime(2040, 1, 1, tzinfo=timezone.utc)
+CONTENTION_EPOCH = datetime(2041, 1, 1, tzinfo=timezone.utc)
+EXPORT_PATHS = (
+    "/api/bookings/export",
+    "/api/shipments/export",
+    "/api/shipments/audit/export",
+)
+
+IdRange = Tuple[int, int]
+
+
+class Recorder:
+    """Latencies and status codes per endpoint label."""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.errors: Counter = Counter()
+
+    async def request(
+        self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs
+    ) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[label] += 1
+            self.statuses[label]["error"] += 1
+            return None
+        self.latencies[label].append(time.perf_counter() - start)
+        self.statuses[label][str(response.status_code)] += 1
+        if response.status_code >= 500:
+            self.errors[label] += 1
+        return response
+
+    def report(self, elapsed: float) -> Dict:
+        endpoints = {
+            label: {
+                **summarize(label, self.latencies[label], self.errors[label], elapsed),
+                "statuses": dict(sorted(self.statuses[label].items())),
+            }
+            for label in sorted(self.statuses)
+        }
+        overall = summarize(
+            "overall",
+            [x for samples in self.latencies.values() for x in samples],
+            sum(self.errors.values()),
+            elapsed,
+        )
+        return {**overall, "endpoints": endpoints}
+
+
+class Dataset:
+    def __init__(self, ranges: Dict[str, IdRange], counts: Dict[str, int]) -> None:
+        self.ranges = ranges
+        self.counts = counts
+
+    @classmethod
+    def discover(cls) -> "Dataset":
+        ranges, counts = {}, {}
+        with engine.connect() as conn:
+            for table in ("vessels", "bookings", "shipments", "routes"):
+                low, high, count = conn.execute(
+                    text(f"SELECT min(id), max(id), count(*) FROM {table}")
+                ).one()
+                ranges[table] = (low or 1, high or 1)
+                counts[table] = count
+            counts["shipment_audit"] = conn.execute(
+                text("SELECT count(*) FROM shipment_audit")
+            ).scalar_one()
+        return cls(ranges, counts)
+
+    def pick(self, rng: random.Random, table: str) -> int:
+        return rng.randint(*self.ranges[table])
+
+
+def _window(rng: random.Random, days: int) -> Dict[str, str]:
+    start = datetime.fromisoformat(BOOKINGS_FROM).replace(
+        tzinfo=timezone.utc
+    ) + timedelta(days=rng.randrange(365))
+    return {
+        "start": start.isoformat(),
+        "end": (start + timedelta(days=days)).isoformat(),
+    }
+
+
+ReadBuilder = Callable[[random.Random, Dataset], Tuple[str, Dict]]
+
+READS: List[Tuple[str, ReadBuilder]] = [
+    ("GET /api/vessels/", lambda rng, ds: ("/api/vessels/", {"limit": 50})),
+    (
+        "GET /api/vessels/{id}",
+        lambda rng, ds: (f"/api/vessels/{ds.pick(rng, 'vessels')}", {}),
+    ),
+    (
+        "GET /api/vessels/available",
+        lambda rng, ds: (
+            "/api/vessels/available",
+            {**_window(rng, 3), "min_capacity": 500, "limit": 50},
+        ),
+    ),
+    (
+        "GET /api/vessels/{id}/capacity",
+        lambda rng, ds: (
+            f"/api/vessels/{ds.pick(rng, 'vessels')}/capacity",
+            _window(rng, 14),
+        ),
+    ),
+    ("GET /api/bookings/", lambda rng, ds: ("/api/bookings/", {"limit": 50})),
+    (
+        "GET /api/bookings/{id}",
+        lambda rng, ds: (f"/api/bookings/{ds.pick(rng, 'bookings')}", {}),
+    ),
+    ("GET /api/shipments/", lambda rng, ds: ("/api/shipments/", {"limit": 50})),
+    (
+        "GET /api/shipments/{id}",
+        lambda rng, ds: (f"/api/shipments/{ds.pick(rng, 'shipments')}", {}),
+    ),
+    (
+        "GET /api/shipments/{id}/audit",
+        lambda rng, ds: (f"/api/shipments/{ds.pick(rng, 'shipments')}/audit", {}),
+    ),
+    (
+        "GET /api/shipments/stats",
+        lambda rng, ds: (
+            "/api/shipments/stats",
+            {"group_by": rng.choice(["vessel", "port", "status"])},
+        ),
+    ),
+    ("GET /api/routes/", lambda rng, ds: ("/api/routes/", {"limit": 50})),
+    (
+        "GET /api/routes/{id}",
+        lambda rng, ds: (f"/api/routes/{ds.pick(rng, 'routes')}", {}),
+    ),
+    (
+        "GET /api/routes/search",
+        lambda rng, ds: (
+            "/api/routes/search",
+            dict(zip(("from", "to"), rng.sample(PORTS, 2)), max_legs=3),
+        ),
+    ),
+]
+
+
+_imo_numbers = itertools.count()
+
+
+def _vessel_payload(name: str, capacity: float = 1e6) -> Dict:
+    # Suite vessels use IMO8xxxxxx; seeded ones count up from IMO0000001.
+    return {
+        "name": name,
+        "imo_number": f"IMO8{next(_imo_numbers) % 1_000_000:06d}",
+        "max_capacity": capacity,
+        "vessel_type": "container_ship",
+    }
+
+
+def _booking_payload(vessel_id: int, start: datetime, hours: int = 1) -> Dict:
+    return {
+        "vessel_id": vessel_id,
+        "reserved_capacity": 1,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=hours)).isoformat(),
+        "port_name": "Rotterdam",
+    }
+
+
+class WriteClient:
+    """One write-scenario client with its own vessel and booking slots."""
+
+    def __init__(
+        self, client: httpx.AsyncClient, rec: Recorder, rng: random.Random, index: int
+    ) -> None:
+        self.client = client
+        self.rec = rec
+        self.rng = rng
+        self.index = index
+        self.vessel_id = 0
+        self.slots = itertools.count()
+
+    def _slot(self) -> datetime:
+        return WRITE_EPOCH + timedelta(hours=2 * next(self.slots))
+
+    async def booking_flow(self) -> None:
+        rec, c = self.rec, self.client
+        r = await rec.request(
+            c,
+            "POST /api/bookings/",
+            "POST",
+            "/api/bookings/",
+            json=_booking_payload(self.vessel_id, self._slot()),
+        )
+        if r is None or r.status_code != 201:
+            return
+        booking_id = r.json()["data"]["id"]
+        r = await rec.request(
+            c,
+            "POST /api/shipments/",
+            "POST",
+            "/api/shipments/",
+            json={"booking_id": booking_id},
+        )
+        if r is not None and r.status_code == 201:
+            shipment_id = r.json()["data"]["id"]
+            await rec.request(
+                c,
+                "PATCH /api/shipments/{id}",
+                "PATCH",
+                f"/api/shipments/{shipment_id}",
+                json={"status": "CONFIRMED"},
+            )
+            await rec.request(
+                c,
+                "POST /api/shipments/bulk-status",
+                "POST",
+                "/api/shipments/bulk-status",
+                json={"status": "SHIPPED", "ids": [shipment_id]},
+            )
+        await rec.request(
+            c, "DELETE /api/bookings/{id}", "DELETE", f"/api/bookings/{booking_id}"
+        )
+
+    async def batch_flow(self) -> None:
+        items = [_booking_payload(self.vessel_id, self._slot()) for _ in range(10)]
+        await self.rec.request(
+            self.client,
+            "POST /api/bookings/batch",
+            "POST",
+            "/api/bookings/batch",
+            json={"items": items, "mode": "best_effort"},
+        )
+
+    async def vessel_flow(self) -> None:
+        rec, c = self.rec, self.client
+        r = await rec.request(
+            c,
+            "POST /api/vessels/",
+            "POST",
+            "/api/vessels/",
+            json=_vessel_payload(f"{SUITE_PREFIX}vessel-{self.index}"),
+        )
+        if r is None or r.status_code != 201:
+            return
+        vessel_id = r.json()["data"]["id"]
+        url = f"/api/vessels/{vessel_id}"
+        await rec.request(
+            c, "PUT /api/vessels/{id}", "PUT", url, json={"max_capacity": 2e6}
+        )
+        await rec.request(
+            c, "PATCH /api/vessels/{id}", "PATCH", url, json={"is_active": False}
+        )
+        await rec.request(c, "DELETE /api/vessels/{id}", "DELETE", url)
+
+    async def route_flow(self) -> None:
+        rec, c = self.rec, self.client
+        ports = self.rng.sample(PORTS, 4)
+        r = await rec.request(
+            c,
+            "POST /api/routes/",
+            "POST",
+            "/api/routes/",
+            json={
+                "name": f"{SUITE_PREFIX}route-{self.index}",
+                "legs": [
+                    {"sequence": i, "origin_port": a, "destination_port": b}
+                    for i, (a, b) in enumerate(zip(ports[:2], ports[1:3]))
+                ],
+            },
+        )
+        if r is None or r.status_code != 201:
+            return
+        route_id = r.json()["data"]["id"]
+        url = f"/api/routes/{route_id}"
+        await rec.request(
+            c, "PATCH /api/routes/{id}", "PATCH", url, json={"name": "renamed"}
+        )
+        r = await rec.request(
+            c,
+            "POST /api/routes/{id}/legs",
+            "POST",
+            f"{url}/legs",
+            json={"sequence": 2, "origin_port": ports[2], "destination_port": ports[3]},
+        )
+        if r is not None and r.status_code == 201:
+            leg_url = f"{url}/legs/{r.json()['data']['id']}"
+            await rec.request(
+                c,
+                "PATCH /api/routes/{id}/legs/{leg_id}",
+                "PATCH",
+                leg_url,
+                json={"vessel_id": self.vessel_id},
+            )
+            await rec.request(
+                c, "DELETE /api/routes/{id}/legs/{leg_id}", "DELETE", leg_url
+            )
+        await rec.request(c, "DELETE /api/routes/{id}", "DELETE", url)
+
+
+async def _create_vessel(client: httpx.AsyncClient, name: str) -> int:
+    r = await client.post("/api/vessels/", json=_vessel_payload(name))
+    r.raise_for_status()
+    return r.json()["data"]["id"]
+
+
+def _cleanup() -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            text("DELETE FROM routes WHERE name LIKE :p"), {"p": f"{SUITE_PREFIX}%"}
+        )
+        conn.execute(
+            text("DELETE FROM vessels WHERE name LIKE :p"), {"p": f"{SUITE_PREFIX}%"}
+        )
+
+
+async def _closed_loop(
+    concurrency: int,
+    duration: float,
+    worker: Callable[[int, float], Awaitable[None]],
+) -> float:
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(worker(i, deadline) for i in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def read_scenario(client, args, ds: Dataset) -> Dict:
+    rec = Recorder()
+
+    async def worker(i: int, deadline: float) -> None:
+        rng = random.Random(args.seed * 1000 + i)
+        while time.perf_counter() < deadline:
+            label, build = rng.choice(READS)
+            url, params = build(rng, ds)
+            await rec.request(client, label, "GET", url, params=params)
+
+    return rec.report(await _closed_loop(args.concurrency, args.duration, worker))
+
+
+async def write_scenario(client, args, ds: Dataset) -> Dict:
+    rec = Recorder()
+    writers = [
+        WriteClient(client, rec, random.Random(args.seed * 1000 + i), i)
+        for i in range(args.concurrency)
+    ]
+    for writer in writers:
+        writer.vessel_id = await _create_vessel(
+            client, f"{SUITE_PREFIX}writer-{writer.index}"
+        )
+
+    async def worker(i: int, deadline: float) -> None:
+        writer = writers[i]
+        flows = [
+            writer.booking_flow,
+            writer.booking_flow,
+            writer.vessel_flow,
+            writer.route_flow,
+            writer.batch_flow,
+        ]
+        while time.perf_counter() < deadline:
+            await writer.rng.choice(flows)()
+
+    return rec.report(await _closed_loop(args.concurrency, args.duration, worker))
+
+
+async def contention_scenario(client, args, ds: Dataset) -> Dict:
+    rec = Recorder()
+    vessel_id = await _create_vessel(client, f"{SUITE_PREFIX}contention")
+    requests = itertools.count(1)
+
+    async def worker(i: int, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            n = next(requests)
+            # One-hour slots share day buckets; every tenth overlaps slot n - 5.
+            slot = n - 5 if n % 10 == 0 else n
+            await rec.request(
+                client,
+                "POST /api/bookings/ (one vessel)",
+                "POST",
+                "/api/bookings/",
+                json=_booking_payload(
+                    vessel_id, CONTENTION_EPOCH + timedelta(hours=slot)
+                ),
+            )
+
+    return rec.report(await _closed_loop(args.concurrency, args.duration, worker))
+
+
+async def export_scenario(client, args, ds: Dataset) -> Dict:
+    results = {}
+    for path in EXPORT_PATHS:
+        rows = size = 0
+        start = time.perf_counter()
+        async with client.stream("GET", path, params={"format": "ndjson"}) as r:
+            async for line in r.aiter_lines():
+                rows += 1
+                size += len(line) + 1
+        elapsed = time.perf_counter() - start
+        results[f"GET {path}"] = {
+            "status": r.status_code,
+            "rows": rows,
+            "bytes": size,
+            "elapsed_s": round(elapsed, 3),
+            "rows_per_s": round(rows / elapsed, 1) if elapsed else 0.0,
+        }
+    return {"endpoints": results}
+
+
+SCENARIOS = {
+    "read": read_scenario,
+    "write": write_scenario,
+    "contention": contention_scenario,
+    "export": export_scenario,
+}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> Dict:
+    ds = Dataset.discover()
+    _cleanup()
+    limits = httpx.Limits(max_connections=args.concurrency)
+    timeout = httpx.Timeout(None if "export" in args.scenarios else 60.0)
+    results = {}
+    try:
+        async with httpx.AsyncClient(
+            base_url=args.base_url, limits=limits, timeout=timeout
+        ) as client:
+            for name in args.scenarios:
+                results[name] = await SCENARIOS[name](client, args, ds)
+    finally:
+        _cleanup()
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "seed": args.seed,
+            "dataset": ds.counts,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(base: Dict, new: Dict, threshold: float) -> List[str]:
+    """Print per-endpoint changes; return the endpoints whose p95 regressed."""
+    regressed = []
+    print(f"{'endpoint':<52} {'p95 base':>9} {'p95 new':>9} {'change':>8}")
+    for scenario, result in new["scenarios"].items():
+        base_endpoints = base["scenarios"].get(scenario, {}).get("endpoints", {})
+        for label, stats in result.get("endpoints", {}).items():
+            before = base_endpoints.get(label, {}).get("p95_ms")
+            after = stats.get("p95_ms")
+            if not before or after is None:
+                continue
+            change = after / before - 1
+            flag = " !" if change > threshold else ""
+            name = f"{scenario}: {label}"
+            print(f"{name:<52} {before:>9.2f} {after:>9.2f} {change:>+8.1%}{flag}")
+            if flag:
+                regressed.append(name)
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="empty the database and seed it")
+    seed.add_argument("--vessels", type=int, default=1000)
+    seed.add_argument("--bookings", type=int, default=100_000)
+    seed.add_argument("--routes", type=int, default=10_000)
+    seed.add_argument("--legs-per-route", type=int, default=4)
+    seed.add_argument("--audit-rows", type=int, default=200_000)
+
+    bench = commands.add_parser("run", help="run scenarios against a server")
+    bench.add_argument("--base-url", default="http://127.0.0.1:8000")
+    bench.add_argument(
+        "--scenario",
+        action="append",
+        dest="scenarios",
+        choices=list(SCENARIOS),
+        help="repeatable; defaults to read, write and contention",
+    )
+    bench.add_argument("--concurrency", type=int, default=64)
+    bench.add_argument("--duration", type=float, default=30.0)
+    bench.add_argument("--seed", type=int, default=42)
+    bench.add_argument("--output", help="write the JSON results to this file")
+
+    diff = commands.add_parser("compare", help="compare two result files")
+    diff.add_argument("base")
+    diff.add_argument("new")
+    diff.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed p95 increase"
+    )
+
+    args = parser.parse_args()
+    if args.command == "seed":
+        with engine.begin() as conn:
+            timings = seed_dataset(
+                conn,
+                args.vessels,
+                args.bookings,
+                args.routes,
+                args.legs_per_route,
+                args.audit_rows,
+            )
+        print(json.dumps({"seconds": timings}, indent=2))
+    elif args.command == "run":
+        args.scenarios = args.scenarios or ["read", "write", "contention"]
+        result = asyncio.run(run(args))
+        output = json.dumps(result, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(output + "\n")
+        print(output)
+    else:
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        if compare(base, new, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Shared setup for the API tests.
+
+The tests run the app in-process over httpx against the database in
+``DATABASE_URL``, which must be migrated (``uv run alembic upgrade head``).
+Requests go through a strict ``QueryBudgetMiddleware``, so going over an
+endpoint's query budget fails the test. Each test creates its own vessels with
+bookings far in the future and deletes them afterwards (bookings and capacity
+buckets go with them), so a scratch copy of the development database works.
+"""
+
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import httpx
+from sqlalchemy import delete
+
+from app.core.database.init import AsyncSessionLocal, async_engine
+from app.core.query_budget import QueryBudgetMiddleware
+from app.features.routes.model import Route
+from app.features.shipments.model import ShipmentAudit
+from app.features.vessels.model import Vessel
+from app.main import app
+
+# Far enough out that no seeded booking shares a day or a list page with them.
+EPOCH = datetime(9000, 1, 1, tzinfo=timezone.utc)
+
+
+def at(days: float, hours: float = 0) -> str:
+    """ISO timestamp ``days`` + ``hours`` after ``EPOCH``."""
+    return (EPOCH + timedelta(days=days, hours=hours)).isoformat()
+
+
+class ApiTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        # Strict whatever QUERY_BUDGET_STRICT says: an endpoint running more
+        # statements than its query_budget raises QueryBudgetExceeded.
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=QueryBudgetMiddleware(app, strict=True)),
+            base_url="http://test",
+        )
+        self.vessel_ids: List[int] = []
+        self.route_ids: List[int] = []
+        self.shipment_ids: List[int] = []
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+        if self.vessel_ids or self.route_ids:
+            async with AsyncSessionLocal() as db:
+                # Audit rows have no foreign key, so they would outlive the
+                # shipments the vessel delete cascades to.
+                await db.execute(
+                    delete(ShipmentAudit).where(
+                        ShipmentAudit.shipment_id.in_(self.shipment_ids)
+                    )
+                )
+                await db.execute(delete(Route).where(Route.id.in_(self.route_ids)))
+                await db.execute(delete(Vessel).where(Vessel.id.in_(self.vessel_ids)))
+                await db.commit()
+        # Each test runs on its own event loop; pooled asyncpg connections
+        # cannot outlive it.
+        await async_engine.dispose()
+
+    async def create_vessel(self, max_capacity: float = 10) -> int:
+        response = await self.client.post(
+            "/api/vessels/",
+            json={
+                "name": "test vessel",
+                "imo_number": f"IMO{random.randrange(10**7):07d}",
+                "max_capacity": max_capacity,
+                "vessel_type": "container_ship",
+            },
+        )
+        self.assertEqual(response.status_code, 201, response.text)
+        vessel_id = response.json()["data"]["id"]
+        self.vessel_ids.append(vessel_id)
+        return vessel_id
+
+    async def create_route(self, *ports: str, **leg_fields: Any) -> Dict[str, Any]:
+        """Route through ``ports`` in order, one leg per hop."""
+        response = await self.client.post(
+            "/api/routes/",
+            json={
+                "name": "test route",
+                "legs": [
+                    {
+                        "sequence": i,
+                        "origin_port": origin,
+                        "destination_port": destination,
+                        **leg_fields,
+                    }
+                    for i, (origin, destination) in enumerate(zip(ports, ports[1:]))
+                ],
+            },
+        )
+        self.assertEqual(response.status_code, 201, response.text)
+        route = response.json()["data"]
+        self.route_ids.append(route["id"])
+        return route
+
+    async def book(
+        self,
+        vessel_id: int,
+        start: str,
+        end: str,
+        reserved_capacity: float = 1,
+        expect: int = 201,
+    ) -> Dict[str, Any]:
+        response = await self.client.post(
+            "/api/bookings/",
+            json=booking(vessel_id, start, end, reserved_capacity),
+        )
+        self.assertEqual(response.status_code, expect, response.text)
+        return response.json()
+
+    async def create_shipment(self, booking_id: int) -> int:
+        response = await self.client.post(
+            "/api/shipments/", json={"booking_id": booking_id}
+        )
+        self.assertEqual(response.status_code, 201, response.text)
+        shipment_id = response.json()["data"]["id"]
+        self.shipment_ids.append(shipment_id)
+        return shipment_id
+
+    async def reserved(self, vessel_id: int, first: int, last: int) -> List[float]:
+        """Reserved capacity per day from ``EPOCH + first`` to ``EPOCH + last``."""
+        response = await self.client.get(
+            f"/api/vessels/{vessel_id}/capacity",
+            params={
+                "start": (EPOCH + timedelta(days=first)).date().isoformat(),
+                "end": (EPOCH + timedelta(days=last)).date().isoformat(),
+            },
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        return [day["reserved_capacity"] for day in response.json()["data"]["days"]]
+
+
+def booking(
+    vessel_id: int, start: str, end: str, reserved_capacity: float = 1
+) -> Dict[str, Any]:
+    return {
+        "vessel_id": vessel_id,
+        "reserved_capacity": reserved_capacity,
+        "start_time": start,
+        "end_time": end,
+        "port_name": "Singapore",
+    }
@@ -0,0 +1,147 @@
+import asyncio
+
+from fastapi import HTTPException
+
+from app.features.bookings.coalescer import BookingCoalescer
+from app.features.bookings.schema import BookingCreate
+from tests.support import ApiTestCase, at, booking
+
+
+class CapacityLedgerTests(ApiTestCase):
+    async def test_booking_charges_every_utc_day_it_touches(self):
+        vessel_id = await self.create_vessel(max_capacity=10)
+        # 22:00 on day 0 to 02:00 on day 1 covers two days.
+        await self.book(vessel_id, at(0, 22), at(1, 2), reserved_capacity=6)
+        # Ending exactly at midnight does not touch the next day.
+        await self.book(vessel_id, at(2, 10), at(3), reserved_capacity=4)
+        self.assertEqual(await self.reserved(vessel_id, 0, 3), [6, 6, 4, 0])
+
+    async def test_capacity_is_checked_per_day(self):
+        vessel_id = await self.create_vessel(max_capacity=10)
+        await self.book(vessel_id, at(0, 22), at(1, 2), reserved_capacity=6)
+        # Day 1 already has 6, so 5 more does not fit...
+        body = await self.book(
+            vessel_id, at(1, 5), at(1, 6), reserved_capacity=5, expect=409
+        )
+        self.assertEqual(body["detail"], "Insufficient capacity. Available: 4.00")
+        # ...but exactly the remainder does, and the next day is untouched.
+        await self.book(vessel_id, at(1, 5), at(1, 6), reserved_capacity=4)
+        await self.book(vessel_id, at(2), at(2, 1), reserved_capacity=10)
+        self.assertEqual(await self.reserved(vessel_id, 0, 2), [6, 10, 10])
+
+    async def test_rejected_booking_leaves_no_charge(self):
+        vessel_id = await self.create_vessel(max_capacity=10)
+        await self.book(vessel_id, at(1), at(1, 1), reserved_capacity=8)
+        # Fits on day 0 but not on day 1; the day 0 charge is rolled back.
+        await self.book(vessel_id, at(0, 20), at(1, 4), reserved_capacity=3, expect=409)
+        self.assertEqual(await self.reserved(vessel_id, 0, 1), [0, 8])
+
+    async def test_overlapping_booking_is_rejected(self):
+        vessel_id = await self.create_vessel(max_capacity=10)
+        await self.book(vessel_id, at(0, 8), at(0, 12))
+        body = await self.book(vessel_id, at(0, 11), at(0, 13), expect=409)
+        self.assertEqual(
+            body["detail"], "Vessel has overlapping booking for this time range"
+        )
+        # Back to back is not an overlap.
+        await self.book(vessel_id, at(0, 12), at(0, 13))
+        self.assertEqual(await self.reserved(vessel_id, 0, 0), [2])
+
+    async def test_unknown_and_inactive_vessels(self):
+        await self.book(10**9, at(0), at(0, 1), expect=404)
+        vessel_id = await self.create_vessel()
+        response = await self.client.patch(
+            f"/api/vessels/{vessel_id}", json={"is_active": False}
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        await self.book(vessel_id, at(0), at(0, 1), expect=400)
+
+    async def test_delete_releases_capacity(self):
+        vessel_id = await self.create_vessel(max_capacity=10)
+        body = await self.book(vessel_id, at(0, 20), at(1, 4), reserved_capacity=10)
+        await self.book(vessel_id, at(1, 6), at(1, 7), expect=409)
+
+        response = await self.client.delete(f"/api/bookings/{body['data']['id']}")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(await self.reserved(vessel_id, 0, 1), [0, 0])
+        await self.book(vessel_id, at(1, 6), at(1, 7), reserved_capacity=10)
+
+    async def test_concurrent_deletes_release_capacity_once(self):
+        vessel_id = await self.create_vessel(max_capacity=10)
+        await self.book(vessel_id, at(0, 1), at(0, 2), reserved_capacity=5)
+        body = await self.book(vessel_id, at(0, 3), at(0, 4), reserved_capacity=4)
+        url = f"/api/bookings/{body['data']['id']}"
+
+        responses = await asyncio.gather(*(self.client.delete(url) for _ in range(4)))
+        codes = sorted(response.status_code for response in responses)
+        self.assertEqual(codes, [204, 404, 404, 404])
+        self.assertEqual(await self.reserved(vessel_id, 0, 0), [5])
+        await self.book(vessel_id, at(0, 5), at(0, 6), reserved_capacity=6, expect=409)
+
+    async def test_max_capacity_cannot_drop_below_booked_peak(self):
+        vessel_id = await self.create_vessel(max_capacity=10)
+        await self.book(vessel_id, at(0), at(0, 1), reserved_capacity=7)
+        response = await self.client.patch(
+            f"/api/vessels/{vessel_id}", json={"max_capacity": 6}
+        )
+        self.assertEqual(response.status_code, 400, response.text)
+        response = await self.client.patch(
+            f"/api/vessels/{vessel_id}", json={"max_capacity": 7}
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+
+
+class BatchTests(ApiTestCase):
+    async def test_best_effort_reports_each_item(self):
+        vessel_id = await self.create_vessel(max_capacity=10)
+        await self.book(vessel_id, at(0, 8), at(0, 12))
+        items = [
+            booking(vessel_id, at(1), at(1, 1), 6),
+            booking(vessel_id, at(0, 10), at(0, 11)),  # overlaps the booking
+            booking(vessel_id, at(1, 2), at(1, 3), 6),  # day 1 is full
+            booking(vessel_id, at(1, 0.5), at(1, 1.5)),  # overlaps item 0
+            booking(10**9, at(0), at(0, 1)),
+            booking(vessel_id, at(2), at(2, 1), 4),
+        ]
+        response = await self.client.post(
+            "/api/bookings/batch", json={"items": items, "mode": "best_effort"}
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        data = response.json()["data"]
+        codes = [result["status_code"] for result in data["results"]]
+        self.assertEqual(codes, [201, 409, 409, 409, 404, 201])
+        self.assertEqual((data["created"], data["failed"]), (2, 4))
+        self.assertEqual(await self.reserved(vessel_id, 0, 2), [1, 6, 4])
+
+    async def test_all_or_nothing_creates_nothing_on_failure(self):
+        vessel_id = await self.create_vessel(max_capacity=10)
+        items = [
+            booking(vessel_id, at(0), at(0, 1), 6),
+            booking(vessel_id, at(0, 2), at(0, 3), 6),
+        ]
+        response = await self.client.post("/api/bookings/batch", json={"items": items})
+        codes = [r["status_code"] for r in response.json()["data"]["results"]]
+        self.assertEqual(codes, [424, 409])
+        self.assertEqual(await self.reserved(vessel_id, 0, 0), [0])
+
+
+class CoalescerTests(ApiTestCase):
+    async def test_concurrent_bookings_share_a_transaction(self):
+        vessel_id = await self.create_vessel(max_capacity=5)
+        coalescer = BookingCoalescer(window=0.05, max_batch=64)
+        payloads = [
+            BookingCreate(**booking(vessel_id, at(0, n), at(0, n + 1)))
+            for n in range(8)
+        ]
+        # The second request for hour 0 overlaps the first.
+        payloads.append(BookingCreate(**booking(vessel_id, at(0, 0.5), at(0, 2))))
+        outcomes = await asyncio.gather(
+            *(coalescer.submit(p) for p in payloads), return_exceptions=True
+        )
+
+        self.assertEqual(coalescer.batches, 1)
+        created = [o for o in outcomes if not isinstance(o, BaseException)]
+        errors = [o for o in outcomes if isinstance(o, HTTPException)]
+        self.assertEqual(len(created), 5)
+        self.assertEqual([e.status_code for e in errors], [409] * 4)
+        self.assertEqual(await self.reserved(vessel_id, 0, 0), [5])
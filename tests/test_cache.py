@@ -0,0 +1,80 @@
+import asyncio
+
+from sqlalchemy import update
+
+from app.core.cache import InvalidationListener, notify_invalidation
+from app.core.database.init import AsyncSessionLocal, async_engine
+from app.features.vessels.model import Vessel
+from app.features.vessels.service import vessel_cache
+from tests.support import ApiTestCase
+
+
+async def eventually(check, timeout: float = 5.0) -> bool:
+    """Poll ``check`` until it returns true or ``timeout`` seconds pass."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not await check():
+        if asyncio.get_running_loop().time() > deadline:
+            return False
+        await asyncio.sleep(0.05)
+    return True
+
+
+class VesselCacheTests(ApiTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        # The app's lifespan does not run under ASGITransport.
+        self.listener = InvalidationListener(
+            async_engine.url.set(drivername="postgresql").render_as_string(
+                hide_password=False
+            )
+        )
+        self.listener.start()
+
+        async def active():
+            return vessel_cache.active
+
+        self.assertTrue(await eventually(active), "listener did not connect")
+
+    async def asyncTearDown(self) -> None:
+        await self.listener.stop()
+        await super().asyncTearDown()
+
+    async def get(self, vessel_id):
+        response = await self.client.get(f"/api/vessels/{vessel_id}")
+        self.assertEqual(response.status_code, 200, response.text)
+        return response
+
+    async def test_repeat_reads_are_served_from_the_cache(self):
+        vessel_id = await self.create_vessel()
+        self.assertEqual((await self.get(vessel_id)).headers["X-DB-Queries"], "1")
+        self.assertEqual((await self.get(vessel_id)).headers["X-DB-Queries"], "0")
+
+    async def test_another_workers_write_invalidates_the_entry(self):
+        vessel_id = await self.create_vessel()
+        await self.get(vessel_id)
+
+        # Another worker's update: this worker only learns of it through the
+        # notification, so the cached row is served until that arrives.
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Vessel).where(Vessel.id == vessel_id).values(name="renamed")
+            )
+            await db.commit()
+            self.assertEqual(
+                (await self.get(vessel_id)).json()["data"]["name"], "test vessel"
+            )
+            await notify_invalidation(db, vessel_cache, vessel_id)
+            await db.commit()
+
+        async def renamed():
+            return (await self.get(vessel_id)).json()["data"]["name"] == "renamed"
+
+        self.assertTrue(await eventually(renamed))
+
+    async def test_cache_is_bypassed_without_the_listener(self):
+        vessel_id = await self.create_vessel()
+        await self.get(vessel_id)
+        await self.listener.stop()
+
+        self.assertFalse(vessel_cache.active)
+        self.assertEqual((await self.get(vessel_id)).headers["X-DB-Queries"], "1")
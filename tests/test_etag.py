@@ -0,0 +1,49 @@
+from tests.support import ApiTestCase, at
+
+
+class ETagTests(ApiTestCase):
+    async def test_item_etag_round_trip(self):
+        vessel_id = await self.create_vessel()
+        response = await self.client.get(f"/api/vessels/{vessel_id}")
+        etag = response.headers["ETag"]
+        response = await self.client.get(
+            f"/api/vessels/{vessel_id}", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 304)
+
+        await self.client.patch(f"/api/vessels/{vessel_id}", json={"name": "renamed"})
+        response = await self.client.get(
+            f"/api/vessels/{vessel_id}", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    async def test_list_etag_changes_when_a_row_is_pulled_into_the_page(self):
+        vessel_id = await self.create_vessel()
+        # Created in id order a, c, b, d; listed by start_time as a, b, d, c.
+        a = await self.book(vessel_id, at(3), at(3, 1))
+        await self.book(vessel_id, at(0), at(0, 1))  # c
+        b = await self.book(vessel_id, at(2), at(2, 1))
+        d = await self.book(vessel_id, at(1), at(1, 1))
+        page = {"limit": 2}
+
+        response = await self.client.get("/api/bookings/", params=page)
+        etag = response.headers["ETag"]
+        ids = [row["id"] for row in response.json()["data"]]
+        self.assertEqual(ids, [a["data"]["id"], b["data"]["id"]])
+        response = await self.client.get(
+            "/api/bookings/", params=page, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 304)
+
+        # Deleting b pulls c into the lookahead row. Count, id bounds and the
+        # newest updated_at of the fetched rows all stay the same.
+        response = await self.client.delete(f"/api/bookings/{b['data']['id']}")
+        self.assertEqual(response.status_code, 204)
+        response = await self.client.get(
+            "/api/bookings/", params=page, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+        ids = [row["id"] for row in response.json()["data"]]
+        self.assertEqual(ids, [a["data"]["id"], d["data"]["id"]])
+        self.assertNotEqual(response.headers["ETag"], etag)
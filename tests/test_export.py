@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+
+from tests.support import ApiTestCase, at
+
+
+class ExportTests(ApiTestCase):
+    async def test_bookings_export_as_ndjson_and_csv(self):
+        vessel_id = await self.create_vessel()
+        ids = [
+            (await self.book(vessel_id, at(day), at(day, 1)))["data"]["id"]
+            for day in range(3)
+        ]
+
+        response = await self.client.get("/api/bookings/export")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        ours = [row for row in rows if row["vessel_id"] == vessel_id]
+        self.assertEqual([row["id"] for row in ours], ids)
+        self.assertEqual(ours[0]["reserved_capacity"], 1)
+        self.assertEqual(ours[0]["port_name"], "Singapore")
+
+        response = await self.client.get(
+            "/api/bookings/export", params={"format": "csv"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'filename="bookings.csv"', response.headers["content-disposition"]
+        )
+        header, *records = csv.reader(io.StringIO(response.text))
+        self.assertEqual(header, list(rows[0]))
+        column = header.index("vessel_id")
+        exported = [r for r in records if r[column] == str(vessel_id)]
+        self.assertEqual([int(r[header.index("id")]) for r in exported], ids)
+
+    async def test_unknown_format_is_rejected(self):
+        response = await self.client.get(
+            "/api/bookings/export", params={"format": "xml"}
+        )
+        self.assertEqual(response.status_code, 422)
@@ -0,0 +1,186 @@
+import io
+import json
+import unittest
+
+from sqlalchemy import text
+
+from app.core.database.bulk_import import run_import, write_rejects
+from app.core.database.init import engine
+from app.features.bookings.importer import FILE_OVERLAP_DETAIL, booking_import
+from app.features.bookings.service import OVERLAP_DETAIL
+from app.features.routes.importer import route_import
+from app.features.vessels.importer import vessel_import
+
+
+def source(*lines: str) -> io.BytesIO:
+    return io.BytesIO("".join(line + "\n" for line in lines).encode())
+
+
+class ImportTests(unittest.TestCase):
+    """Each import runs in a transaction that is rolled back afterwards."""
+
+    def setUp(self) -> None:
+        self.conn = engine.connect()
+        self.transaction = self.conn.begin()
+
+    def tearDown(self) -> None:
+        self.transaction.rollback()
+        self.conn.close()
+
+    def errors(self):
+        return dict(
+            self.conn.execute(
+                text("SELECT line, error FROM import_rows WHERE error IS NOT NULL")
+            ).all()
+        )
+
+    def vessel(self, max_capacity: float) -> int:
+        return self.conn.execute(
+            text(
+                "INSERT INTO vessels (name, imo_number, max_capacity, vessel_type, "
+                "is_active) VALUES ('import test', 'IMO' || lpad("
+                "(floor(random() * 1e7))::text, 7, '0'), :cap, 'other', true) "
+                "RETURNING id"
+            ),
+            {"cap": max_capacity},
+        ).scalar_one()
+
+    def test_vessel_csv_rejects_bad_and_repeated_lines(self):
+        result = run_import(
+            self.conn,
+            vessel_import,
+            source(
+                "name,imo_number,max_capacity,vessel_type",
+                "First,imo9900001,100,container_ship",
+                "Bad IMO,IMO99,100,container_ship",
+                "Repeat,IMO9900001,100,container_ship",
+                "No room,IMO9900002,0,other",
+                "Odd type,IMO9900003,5,submarine",
+            ),
+            "csv",
+        )
+        self.assertEqual(tuple(result), (5, 1, 4))
+        self.assertEqual(
+            self.errors(),
+            {
+                3: "IMO number must be in format IMO followed by 7 digits",
+                4: "duplicate imo_number in file (first on line 2)",
+                5: "max_capacity must be greater than 0",
+                6: "invalid vessel_type",
+            },
+        )
+        self.assertEqual(
+            self.conn.execute(
+                text("SELECT name FROM vessels WHERE imo_number = 'IMO9900001'")
+            ).scalar_one(),
+            "First",
+        )
+
+        out = io.BytesIO()
+        write_rejects(self.conn, vessel_import.columns, "csv", out)
+        header, first, *_ = out.getvalue().decode().splitlines()
+        self.assertEqual(
+            header, "line,error,name,imo_number,max_capacity,vessel_type,is_active"
+        )
+        self.assertTrue(first.startswith("3,IMO number must be"))
+
+    def test_unknown_csv_column_is_refused(self):
+        with self.assertRaisesRegex(ValueError, "current_reserved_capacity"):
+            run_import(
+                self.conn,
+                vessel_import,
+                source("name,imo_number,max_capacity,current_reserved_capacity"),
+                "csv",
+            )
+
+    def test_booking_ndjson_admits_lines_in_file_order(self):
+        vessel_id = self.vessel(max_capacity=10)
+        self.conn.execute(
+            text(
+                "INSERT INTO bookings (vessel_id, reserved_capacity, start_time, "
+                "end_time, port_name) VALUES (:id, 1, '9000-01-02 00:00+00', "
+                "'9000-01-02 01:00+00', 'Dubai')"
+            ),
+            {"id": vessel_id},
+        )
+
+        def line(start, end, reserved=4):
+            return json.dumps(
+                {
+                    "vessel_id": vessel_id,
+                    "reserved_capacity": reserved,
+                    "start_time": f"9000-01-0{start}",
+                    "end_time": f"9000-01-0{end}",
+                    "port_name": "Dubai",
+                }
+            )
+
+        result = run_import(
+            self.conn,
+            booking_import,
+            source(
+                line("1T00:00", "1T02:00"),
+                line("1T01:00", "1T03:00"),
+                line("1T04:00", "1T05:00", reserved=7),
+                line("1T05:00", "1T06:00"),
+                "",
+                "[1]",
+                line("2T00:30", "2T02:00"),
+            ),
+            "ndjson",
+        )
+        self.assertEqual(tuple(result), (6, 2, 4))
+        self.assertEqual(
+            self.errors(),
+            {
+                2: FILE_OVERLAP_DETAIL,
+                # Line 1 took 4 of the day's 10; line 3 was never admitted.
+                3: "Insufficient capacity. Available: 6.00",
+                6: "not a JSON object",
+                7: OVERLAP_DETAIL,
+            },
+        )
+        self.assertEqual(
+            self.conn.execute(
+                text(
+                    "SELECT reserved_capacity FROM vessel_capacity_buckets "
+                    "WHERE vessel_id = :id AND day = '9000-01-01'"
+                ),
+                {"id": vessel_id},
+            ).scalar_one(),
+            8,
+        )
+
+    def test_routes_with_a_rejected_leg_are_skipped_whole(self):
+        result = run_import(
+            self.conn,
+            route_import,
+            source(
+                "route_name,sequence,origin_port,destination_port",
+                "import test A,0,Singapore,Dubai",
+                "import test A,1,Dubai,Rotterdam",
+                "import test B,0,Busan,Shanghai",
+                "import test B,1,Dubai,Hamburg",
+                "import test B,2,Hamburg,Hamburg",
+            ),
+            "csv",
+        )
+        self.assertEqual(tuple(result), (5, 2, 3))
+        self.assertEqual(
+            self.errors(),
+            {
+                5: "Leg 1: origin_port must match previous leg's destination_port "
+                "(Shanghai -> Dubai)",
+                6: "origin_port and destination_port must be different",
+                4: "route has rejected legs",
+            },
+        )
+        self.assertEqual(
+            self.conn.execute(
+                text(
+                    "SELECT array_agg(l.sequence ORDER BY l.sequence) FROM routes r "
+                    "JOIN legs l ON l.route_id = r.id WHERE r.name LIKE 'import test %'"
+                )
+            ).scalar_one(),
+            [0, 1],
+        )
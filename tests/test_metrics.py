@@ -0,0 +1,60 @@
+import re
+import unittest
+
+from app.core.metrics import UNMATCHED_ROUTE, Counter, Histogram
+from tests.support import ApiTestCase
+
+
+class HistogramTests(unittest.TestCase):
+    def test_buckets_render_cumulatively_with_sum_and_count(self):
+        histogram = Histogram("latency", "Latency.", ("route",), (0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(("/a",), value)
+        self.assertEqual(
+            histogram.render(),
+            [
+                "# HELP latency Latency.",
+                "# TYPE latency histogram",
+                'latency_bucket{route="/a",le="0.1"} 2',
+                'latency_bucket{route="/a",le="1"} 3',
+                'latency_bucket{route="/a",le="+Inf"} 4',
+                'latency_sum{route="/a"} 3.65',
+                'latency_count{route="/a"} 4',
+            ],
+        )
+
+    def test_label_values_are_escaped(self):
+        counter = Counter("hits", "Hits.", ("path",))
+        counter.inc(('say "hi"\\\n',), 2)
+        self.assertEqual(counter.render()[-1], 'hits{path="say \\"hi\\"\\\\\\n"} 2')
+
+
+class MetricsEndpointTests(ApiTestCase):
+    async def requests_total(self, route: str, status: int) -> float:
+        response = await self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        match = re.search(
+            rf'^http_requests_total{{method="GET",route="{re.escape(route)}",'
+            rf'status="{status}"}} (\S+)$',
+            response.text,
+            re.MULTILINE,
+        )
+        return float(match[1]) if match else 0
+
+    async def test_requests_are_counted_by_route_template(self):
+        vessel_id = await self.create_vessel()
+        route = "/api/vessels/{vessel_id}"
+        ok = await self.requests_total(route, 200)
+        missing = await self.requests_total(UNMATCHED_ROUTE, 404)
+
+        await self.client.get(f"/api/vessels/{vessel_id}")
+        await self.client.get(f"/api/vessels/{vessel_id}")
+        await self.client.get("/no/such/path")
+
+        self.assertEqual(await self.requests_total(route, 200), ok + 2)
+        self.assertEqual(await self.requests_total(UNMATCHED_ROUTE, 404), missing + 1)
+        response = await self.client.get("/metrics")
+        self.assertIn(
+            f'http_request_db_queries_bucket{{method="GET",route="{route}",le="1"}}',
+            response.text,
+        )
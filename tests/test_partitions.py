@@ -0,0 +1,77 @@
+import unittest
+
+from sqlalchemy import text
+
+from app.core.database.init import engine
+from app.features.shipments.partitions import (
+    detach_expired_audit_partitions,
+    ensure_audit_partitions,
+    missing_audit_partitions,
+)
+
+
+class AuditPartitionTests(unittest.TestCase):
+    """Partition DDL runs in a transaction that is rolled back afterwards."""
+
+    def setUp(self) -> None:
+        self.conn = engine.connect()
+        self.transaction = self.conn.begin()
+
+    def tearDown(self) -> None:
+        self.transaction.rollback()
+        self.conn.close()
+
+    def partition_of(self, shipment_id: int) -> str:
+        return self.conn.execute(
+            text(
+                "SELECT tableoid::regclass::text FROM shipment_audit "
+                "WHERE shipment_id = :id"
+            ),
+            {"id": shipment_id},
+        ).scalar_one()
+
+    def create(self, first_month: str, last_month: str) -> int:
+        return self.conn.execute(
+            text("SELECT create_shipment_audit_partitions(:first, :last)"),
+            {"first": first_month, "last": last_month},
+        ).scalar_one()
+
+    def test_new_partition_takes_its_rows_from_the_default_partition(self):
+        self.conn.execute(
+            text(
+                "INSERT INTO shipment_audit (shipment_id, new_status, changed_at) "
+                "VALUES (-1, 'PENDING', '2999-02-14 12:00')"
+            )
+        )
+        self.assertEqual(self.partition_of(-1), "shipment_audit_default")
+
+        self.assertEqual(self.create("2999-01-01", "2999-03-01"), 3)
+        self.assertEqual(self.partition_of(-1), "shipment_audit_p299902")
+        self.assertEqual(self.create("2999-01-01", "2999-03-01"), 0)
+
+    def test_ensure_leaves_no_month_missing(self):
+        ensure_audit_partitions(self.conn, 3)
+        self.assertEqual(missing_audit_partitions(self.conn, 3), [])
+
+    def test_expired_partitions_are_detached_or_dropped(self):
+        self.create("1990-01-01", "1990-02-01")
+        expired = detach_expired_audit_partitions(self.conn, 24)
+        self.assertIn("shipment_audit_p199001", expired)
+        self.assertIn("shipment_audit_p199002", expired)
+        # Detached, not dropped: the table stays behind for archiving.
+        self.assertIsNotNone(
+            self.conn.execute(
+                text("SELECT to_regclass('shipment_audit_p199001')")
+            ).scalar()
+        )
+
+        self.create("1991-01-01", "1991-01-01")
+        self.assertIn(
+            "shipment_audit_p199101",
+            detach_expired_audit_partitions(self.conn, 24, drop=True),
+        )
+        self.assertIsNone(
+            self.conn.execute(
+                text("SELECT to_regclass('shipment_audit_p199101')")
+            ).scalar()
+        )
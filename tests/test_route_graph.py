@@ -0,0 +1,67 @@
+import unittest
+
+from app.features.routes.graph import LegRef, RouteGraph
+
+
+def leg(leg_id, route_id, origin, destination, vessel_id=None):
+    return LegRef(leg_id, route_id, leg_id, origin, destination, vessel_id)
+
+
+class RouteGraphSearchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.graph = RouteGraph("test", max_age=60)
+        self.graph.load(
+            [
+                leg(1, 1, "Singapore", "Dubai"),
+                leg(2, 1, "Dubai", "Rotterdam"),
+                leg(3, 2, "Singapore", "Dubai", vessel_id=7),
+                leg(4, 3, "Singapore", "Rotterdam"),
+                leg(5, 4, "Rotterdam", "Singapore", vessel_id=7),
+                leg(6, 4, "Singapore", "Hamburg", vessel_id=7),
+            ]
+        )
+
+    def ports(self, *args, **kwargs):
+        return [path.ports for path in self.graph.search(*args, **kwargs)]
+
+    def test_paths_come_fewest_hops_first_without_revisiting_ports(self):
+        self.assertEqual(
+            self.ports("Singapore", "Rotterdam", 3),
+            [["Singapore", "Rotterdam"], ["Singapore", "Dubai", "Rotterdam"]],
+        )
+        self.assertEqual(
+            self.ports("Dubai", "Hamburg", 3),
+            [["Dubai", "Rotterdam", "Singapore", "Hamburg"]],
+        )
+        self.assertEqual(self.ports("Dubai", "Hamburg", 2), [])
+        self.assertEqual(
+            self.ports("Singapore", "Rotterdam", 3, limit=1),
+            [["Singapore", "Rotterdam"]],
+        )
+
+    def test_hops_list_assigned_legs_first(self):
+        (path,) = self.graph.search("Singapore", "Dubai", 1)
+        (hop,) = path.legs
+        self.assertEqual(hop.leg_count, 2)
+        self.assertEqual([option.id for option in hop.options], [3, 1])
+
+        (path,) = self.graph.search("Singapore", "Dubai", 1, vessel_assigned=True)
+        self.assertEqual([option.id for option in path.legs[0].options], [3])
+        self.assertEqual(
+            self.ports("Singapore", "Rotterdam", 3, vessel_assigned=True), []
+        )
+
+    def test_replacing_a_route_updates_its_edges(self):
+        self.graph.replace_route(1, [leg(7, 1, "Dubai", "Hamburg")])
+        self.assertEqual(
+            self.ports("Singapore", "Rotterdam", 3), [["Singapore", "Rotterdam"]]
+        )
+        self.assertEqual(
+            self.ports("Singapore", "Hamburg", 2),
+            [["Singapore", "Hamburg"], ["Singapore", "Dubai", "Hamburg"]],
+        )
+        (path,) = self.graph.search("Singapore", "Dubai", 1)
+        self.assertEqual(path.legs[0].leg_count, 1)
+
+        self.graph.replace_route(4, [])
+        self.assertEqual(self.ports("Rotterdam", "Singapore", 3), [])
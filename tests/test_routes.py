@@ -0,0 +1,270 @@
+from sqlalchemy import text
+
+from app.core.database.init import AsyncSessionLocal
+from app.features.routes.schema import RouteResponse
+from app.features.routes.service import RouteService
+from app.shared.pagination import encode_cursor
+from tests.support import ApiTestCase
+
+
+class LegQueryBudgetTests(ApiTestCase):
+    """Each leg endpoint's longest branch, run through the strict middleware."""
+
+    async def test_leg_edits_stay_within_their_query_budgets(self):
+        vessel_id = await self.create_vessel()
+        route = await self.create_route("Singapore", "Dubai", "Rotterdam")
+        route_id = route["id"]
+
+        # Lock, vessel check, neighbours, INSERT, notify, refresh.
+        response = await self.client.post(
+            f"/api/routes/{route_id}/legs",
+            json={
+                "sequence": 5,
+                "origin_port": "Rotterdam",
+                "destination_port": "Hamburg",
+                "vessel_id": vessel_id,
+            },
+        )
+        self.assertEqual(response.status_code, 201, response.text)
+        self.assertEqual(response.headers["X-DB-Queries"], "6")
+        leg_id = response.json()["data"]["id"]
+
+        # Lock, leg, vessel check, old and new neighbours, UPDATE, notify,
+        # refresh.
+        response = await self.client.patch(
+            f"/api/routes/{route_id}/legs/{leg_id}",
+            json={"sequence": 9, "destination_port": "Antwerp", "vessel_id": vessel_id},
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(response.headers["X-DB-Queries"], "8")
+
+        # Lock, leg, neighbours, DELETE, notify.
+        response = await self.client.delete(
+            f"/api/routes/{route_id}/legs/{route['legs'][0]['id']}"
+        )
+        self.assertEqual(response.status_code, 204, response.text)
+        self.assertEqual(response.headers["X-DB-Queries"], "5")
+
+
+class RouteSearchTests(ApiTestCase):
+    async def leg_counts(self, origin, destination, **params):
+        """Legs per hop on every path the search returns, by (origin, dest)."""
+        response = await self.client.get(
+            "/api/routes/search",
+            params={"from": origin, "to": destination, "limit": 50, **params},
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        return {
+            (hop["origin_port"], hop["destination_port"]): hop["leg_count"]
+            for path in response.json()["data"]
+            for hop in path["legs"]
+        }
+
+    async def test_search_sees_leg_edits_at_the_next_request(self):
+        # Other routes may already use these ports, so compare counts with a
+        # baseline taken before the edits.
+        hop = ("Rotterdam", "Hamburg")
+        before = await self.leg_counts(*hop, max_legs=1)
+        assigned = await self.leg_counts(*hop, max_legs=1, vessel_assigned=True)
+        route = await self.create_route("Singapore", "Rotterdam")
+
+        response = await self.client.post(
+            f"/api/routes/{route['id']}/legs",
+            json={
+                "sequence": 1,
+                "origin_port": "Rotterdam",
+                "destination_port": "Hamburg",
+            },
+        )
+        self.assertEqual(response.status_code, 201, response.text)
+        leg_id = response.json()["data"]["id"]
+        counts = await self.leg_counts(*hop, max_legs=1)
+        self.assertEqual(counts[hop], before.get(hop, 0) + 1)
+
+        vessel_id = await self.create_vessel()
+        await self.client.patch(
+            f"/api/routes/{route['id']}/legs/{leg_id}", json={"vessel_id": vessel_id}
+        )
+        counts = await self.leg_counts(*hop, max_legs=1, vessel_assigned=True)
+        self.assertEqual(counts[hop], assigned.get(hop, 0) + 1)
+
+        await self.client.delete(f"/api/routes/{route['id']}/legs/{leg_id}")
+        counts = await self.leg_counts(*hop, max_legs=1)
+        self.assertEqual(counts.get(hop, 0), before.get(hop, 0))
+
+
+class RouteCreateAndListTests(ApiTestCase):
+    async def test_create_runs_one_statement_and_orders_legs(self):
+        vessel_id = await self.create_vessel()
+        response = await self.client.post(
+            "/api/routes/",
+            json={
+                "name": "out of order",
+                "legs": [
+                    {
+                        "sequence": 4,
+                        "origin_port": "Dubai",
+                        "destination_port": "Busan",
+                    },
+                    {
+                        "sequence": 1,
+                        "origin_port": "Singapore",
+                        "destination_port": "Dubai",
+                        "vessel_id": vessel_id,
+                    },
+                ],
+            },
+        )
+        self.assertEqual(response.status_code, 201, response.text)
+        self.assertEqual(response.headers["X-DB-Queries"], "1")
+        route = response.json()["data"]
+        self.route_ids.append(route["id"])
+        self.assertEqual([leg["sequence"] for leg in route["legs"]], [1, 4])
+        self.assertEqual(route["legs"][0]["vessel_id"], vessel_id)
+        self.assertEqual({leg["route_id"] for leg in route["legs"]}, {route["id"]})
+
+        response = await self.client.get(f"/api/routes/{route['id']}")
+        self.assertEqual(response.json()["data"], route)
+
+    async def test_list_pages_carry_each_routes_legs(self):
+        first = await self.create_route("Singapore", "Dubai", "Rotterdam")
+        second = await self.create_route("Busan", "Shanghai")
+
+        response = await self.client.get(
+            "/api/routes/",
+            params={"limit": 1, "cursor": encode_cursor([first["id"] - 1])},
+        )
+        self.assertEqual(response.headers["X-DB-Queries"], "1")
+        body = response.json()
+        self.assertEqual([route["id"] for route in body["data"]], [first["id"]])
+        self.assertEqual(
+            [leg["id"] for leg in body["data"][0]["legs"]],
+            [leg["id"] for leg in first["legs"]],
+        )
+
+        response = await self.client.get(
+            "/api/routes/", params={"limit": 1, "cursor": body["next_cursor"]}
+        )
+        (listed,) = response.json()["data"]
+        self.assertEqual(listed["id"], second["id"])
+        self.assertEqual(
+            [(leg["origin_port"], leg["destination_port"]) for leg in listed["legs"]],
+            [("Busan", "Shanghai")],
+        )
+
+    async def test_listed_legs_match_the_item_whatever_the_session_time_zone(self):
+        route = await self.create_route("Singapore", "Dubai", "Rotterdam")
+        response = await self.client.get(f"/api/routes/{route['id']}")
+        item = response.json()["data"]
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SET TimeZone = 'America/St_Johns'"))
+            rows, _, _ = await RouteService.list_all(
+                db, 1, encode_cursor([route["id"] - 1])
+            )
+        (listed,) = [
+            RouteResponse.model_validate(row).model_dump(mode="json") for row in rows
+        ]
+        self.assertEqual(listed["legs"], item["legs"])
+
+
+class LegChainTests(ApiTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        response = await self.client.post(
+            "/api/routes/",
+            json={
+                "name": "gapped",
+                "legs": [
+                    {"sequence": s, "origin_port": o, "destination_port": d}
+                    for s, o, d in [
+                        (1, "Singapore", "Dubai"),
+                        (10, "Dubai", "Rotterdam"),
+                        (20, "Rotterdam", "Hamburg"),
+                    ]
+                ],
+            },
+        )
+        self.assertEqual(response.status_code, 201, response.text)
+        self.route = response.json()["data"]
+        self.route_ids.append(self.route["id"])
+        self.legs = [leg["id"] for leg in self.route["legs"]]
+        self.path = f"/api/routes/{self.route['id']}/legs"
+
+    async def chain(self):
+        response = await self.client.get(f"/api/routes/{self.route['id']}")
+        return [
+            (leg["sequence"], leg["origin_port"], leg["destination_port"])
+            for leg in response.json()["data"]["legs"]
+        ]
+
+    async def add(self, sequence, origin, destination, expect):
+        response = await self.client.post(
+            self.path,
+            json={
+                "sequence": sequence,
+                "origin_port": origin,
+                "destination_port": destination,
+            },
+        )
+        self.assertEqual(response.status_code, expect, response.text)
+
+    async def edit(self, leg_id, expect, **payload):
+        response = await self.client.patch(f"{self.path}/{leg_id}", json=payload)
+        self.assertEqual(response.status_code, expect, response.text)
+
+    async def test_insert_checks_both_neighbours(self):
+        await self.add(5, "Dubai", "Busan", expect=400)
+        await self.add(10, "Dubai", "Rotterdam", expect=409)
+        await self.add(0, "Busan", "Dubai", expect=400)
+        await self.add(0, "Busan", "Singapore", expect=201)
+        await self.add(30, "Hamburg", "Antwerp", expect=201)
+        self.assertEqual(
+            await self.chain(),
+            [
+                (0, "Busan", "Singapore"),
+                (1, "Singapore", "Dubai"),
+                (10, "Dubai", "Rotterdam"),
+                (20, "Rotterdam", "Hamburg"),
+                (30, "Hamburg", "Antwerp"),
+            ],
+        )
+
+    async def test_move_checks_the_old_and_new_neighbours(self):
+        # Pulling the middle leg out would join Dubai to Rotterdam's successor.
+        await self.edit(self.legs[1], 400, sequence=30)
+        # The first leg cannot follow the last one.
+        await self.edit(self.legs[0], 400, sequence=30)
+        await self.edit(self.legs[1], 400, destination_port="Busan")
+        await self.edit(self.legs[2], 409, sequence=10)
+        await self.edit(
+            self.legs[2],
+            200,
+            sequence=0,
+            origin_port="Hamburg",
+            destination_port="Singapore",
+        )
+        self.assertEqual(
+            await self.chain(),
+            [
+                (0, "Hamburg", "Singapore"),
+                (1, "Singapore", "Dubai"),
+                (10, "Dubai", "Rotterdam"),
+            ],
+        )
+
+    async def test_delete_keeps_the_chain_linked_and_non_empty(self):
+        response = await self.client.delete(f"{self.path}/{self.legs[1]}")
+        self.assertEqual(response.status_code, 400, response.text)
+        for leg_id in self.legs[:0:-1]:
+            response = await self.client.delete(f"{self.path}/{leg_id}")
+            self.assertEqual(response.status_code, 204, response.text)
+        response = await self.client.delete(f"{self.path}/{self.legs[0]}")
+        self.assertEqual(response.status_code, 400, response.text)
+        self.assertEqual(await self.chain(), [(1, "Singapore", "Dubai")])
+
+    async def test_legs_of_another_route_are_not_found(self):
+        other = await self.create_route("Busan", "Shanghai")
+        await self.edit(other["legs"][0]["id"], 404, vessel_id=None)
+        response = await self.client.delete(f"{self.path}/{other['legs'][0]['id']}")
+        self.assertEqual(response.status_code, 404, response.text)
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.core import server
+from app.core.server import available_cpus, worker_pool_sizes
+
+
+class WorkerPoolSizeTests(unittest.TestCase):
+    def test_configured_sizes_are_kept_when_they_fit(self):
+        self.assertEqual(worker_pool_sizes(4, 100, 10, 10, 5), (10, 5))
+
+    def test_overflow_gives_way_before_the_pool(self):
+        # 90 usable connections over 8 workers, one LISTEN connection each.
+        self.assertEqual(worker_pool_sizes(8, 100, 10, 8, 10), (8, 2))
+        self.assertEqual(worker_pool_sizes(8, 100, 10, 20, 10), (10, 0))
+
+    def test_too_many_workers_is_an_error(self):
+        with self.assertRaisesRegex(ValueError, "do not fit"):
+            worker_pool_sizes(50, 100, 10, 5, 5)
+
+
+class AvailableCpuTests(unittest.TestCase):
+    def cpus_with_quota(self, cpu_max: str) -> int:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "cpu.max")
+            path.write_text(cpu_max)
+            with (
+                mock.patch.object(server, "CGROUP_CPU_MAX", path),
+                mock.patch.object(
+                    os, "sched_getaffinity", return_value=set(range(8)), create=True
+                ),
+            ):
+                return available_cpus()
+
+    def test_cgroup_quota_caps_the_affinity_count(self):
+        self.assertEqual(self.cpus_with_quota("250000 100000"), 3)
+        self.assertEqual(self.cpus_with_quota("50000 100000"), 1)
+        self.assertEqual(self.cpus_with_quota("max 100000"), 8)
+        self.assertEqual(self.cpus_with_quota("garbage"), 8)
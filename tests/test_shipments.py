@@ -0,0 +1,148 @@
+from tests.support import ApiTestCase, at
+
+
+class BulkStatusTests(ApiTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.vessel_id = await self.create_vessel()
+        self.booking_ids = [
+            (await self.book(self.vessel_id, at(day), at(day, 1)))["data"]["id"]
+            for day in range(2)
+        ]
+        # Two shipments on the first booking, one on the second.
+        self.ids = [
+            await self.create_shipment(booking_id)
+            for booking_id in (self.booking_ids[0], *self.booking_ids)
+        ]
+
+    async def bulk(self, expect: int = 200, **payload):
+        response = await self.client.post("/api/shipments/bulk-status", json=payload)
+        self.assertEqual(response.status_code, expect, response.text)
+        return response.json()["data"]
+
+    async def statuses(self):
+        statuses = []
+        for shipment_id in self.ids:
+            response = await self.client.get(f"/api/shipments/{shipment_id}")
+            statuses.append(response.json()["data"]["status"])
+        return statuses
+
+    async def test_selectors_pick_the_matching_shipments(self):
+        result = await self.bulk(status="CONFIRMED", ids=[self.ids[2], self.ids[0]])
+        self.assertEqual(result, {"updated": 2, "ids": [self.ids[0], self.ids[2]]})
+        result = await self.bulk(status="SHIPPED", booking_id=self.booking_ids[0])
+        self.assertEqual(result["ids"], self.ids[:2])
+        self.assertEqual(await self.statuses(), ["SHIPPED", "SHIPPED", "CONFIRMED"])
+        result = await self.bulk(status="IN_TRANSIT", vessel_id=self.vessel_id)
+        self.assertEqual(result["ids"], self.ids)
+
+    async def test_rows_already_in_the_status_are_skipped(self):
+        await self.bulk(status="CONFIRMED", ids=self.ids[:1])
+        result = await self.bulk(status="CONFIRMED", vessel_id=self.vessel_id)
+        self.assertEqual(result["ids"], self.ids[1:])
+        result = await self.bulk(status="CONFIRMED", vessel_id=self.vessel_id)
+        self.assertEqual(result, {"updated": 0, "ids": []})
+
+    async def test_a_selector_is_required(self):
+        await self.bulk(expect=422, status="CONFIRMED")
+        await self.bulk(expect=422, status="LOST", ids=self.ids)
+
+
+class AuditTriggerTests(ApiTestCase):
+    async def audit(self, shipment_id):
+        response = await self.client.get(f"/api/shipments/{shipment_id}/audit")
+        self.assertEqual(response.status_code, 200, response.text)
+        return [(r["old_status"], r["new_status"]) for r in response.json()["data"]]
+
+    async def test_each_changed_row_gets_one_audit_row(self):
+        vessel_id = await self.create_vessel()
+        booking_id = (await self.book(vessel_id, at(0), at(1)))["data"]["id"]
+        ids = [await self.create_shipment(booking_id) for _ in range(3)]
+
+        response = await self.client.patch(
+            f"/api/shipments/{ids[0]}", json={"status": "CONFIRMED"}
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        response = await self.client.post(
+            "/api/shipments/bulk-status",
+            json={"status": "CONFIRMED", "booking_id": booking_id},
+        )
+        self.assertEqual(response.json()["data"]["ids"], ids[1:])
+        # A PATCH to the current status is not a change.
+        await self.client.patch(
+            f"/api/shipments/{ids[2]}", json={"status": "CONFIRMED"}
+        )
+        await self.client.post(
+            "/api/shipments/bulk-status",
+            json={"status": "SHIPPED", "ids": ids[:2]},
+        )
+
+        self.assertEqual(
+            await self.audit(ids[0]),
+            [("PENDING", "CONFIRMED"), ("CONFIRMED", "SHIPPED")],
+        )
+        self.assertEqual(
+            await self.audit(ids[1]),
+            [("PENDING", "CONFIRMED"), ("CONFIRMED", "SHIPPED")],
+        )
+        self.assertEqual(await self.audit(ids[2]), [("PENDING", "CONFIRMED")])
+
+
+class StatusCountTests(ApiTestCase):
+    async def counts(self, vessel_id):
+        """by_status for ``vessel_id``'s group, or None without shipments."""
+        response = await self.client.get(
+            "/api/shipments/stats", params={"group_by": "vessel"}
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        for group in response.json()["data"]:
+            if group["group"] == vessel_id:
+                return {k: v for k, v in group["by_status"].items() if v}
+        return None
+
+    async def test_counters_follow_creates_changes_and_deletes(self):
+        vessel_id = await self.create_vessel()
+        bookings = [
+            (await self.book(vessel_id, at(day), at(day, 1)))["data"]["id"]
+            for day in range(2)
+        ]
+        self.assertIsNone(await self.counts(vessel_id))
+
+        ids = [await self.create_shipment(b) for b in (bookings[0], *bookings)]
+        self.assertEqual(await self.counts(vessel_id), {"PENDING": 3})
+
+        await self.client.patch(f"/api/shipments/{ids[0]}", json={"status": "SHIPPED"})
+        await self.client.post(
+            "/api/shipments/bulk-status",
+            json={"status": "CONFIRMED", "ids": ids[1:]},
+        )
+        self.assertEqual(await self.counts(vessel_id), {"SHIPPED": 1, "CONFIRMED": 2})
+
+        # Deleting a booking takes its shipments with it.
+        response = await self.client.delete(f"/api/bookings/{bookings[0]}")
+        self.assertEqual(response.status_code, 204, response.text)
+        self.assertEqual(await self.counts(vessel_id), {"CONFIRMED": 1})
+        await self.client.delete(f"/api/bookings/{bookings[1]}")
+        self.assertIsNone(await self.counts(vessel_id))
+
+    async def test_port_and_status_groups_total_the_same_shipments(self):
+        vessel_id = await self.create_vessel()
+        booking_id = (await self.book(vessel_id, at(0), at(1)))["data"]["id"]
+
+        async def singapore_pending():
+            response = await self.client.get(
+                "/api/shipments/stats", params={"group_by": "port"}
+            )
+            by_port = {g["group"]: g["by_status"] for g in response.json()["data"]}
+            response = await self.client.get("/api/shipments/stats")
+            by_status = {g["group"]: g["total"] for g in response.json()["data"]}
+            return (
+                by_port.get("Singapore", {}).get("PENDING", 0),
+                by_status.get("PENDING", 0),
+            )
+
+        before = await singapore_pending()
+        await self.create_shipment(booking_id)
+        await self.create_shipment(booking_id)
+        after = await singapore_pending()
+        self.assertEqual((after[0] - before[0], after[1] - before[1]), (2, 2))
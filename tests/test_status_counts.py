@@ -0,0 +1,160 @@
+import threading
+import time
+import unittest
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import Connection, text
+
+from app.core.database.init import engine
+
+
+class StatusCountRaceTests(unittest.TestCase):
+    """A booking change racing a shipment write must leave the counters exact.
+
+    The shipment write is left uncommitted on one connection while the booking
+    change starts on another; the write then commits and the booking change
+    finishes.
+    """
+
+    def setUp(self) -> None:
+        self.vessel_ids: List[int] = []
+        self.shipment_ids: List[int] = []
+        with engine.begin() as conn:
+            self.old_vessel = self.vessel(conn)
+            self.new_vessel = self.vessel(conn)
+            self.booking = conn.execute(
+                text(
+                    "INSERT INTO bookings (vessel_id, reserved_capacity, "
+                    "start_time, end_time, port_name) VALUES (:id, 1, "
+                    "'9000-01-01 00:00+00', '9000-01-01 01:00+00', 'Singapore') "
+                    "RETURNING id"
+                ),
+                {"id": self.old_vessel},
+            ).scalar_one()
+
+    def tearDown(self) -> None:
+        with engine.begin() as conn:
+            conn.execute(
+                text("DELETE FROM vessels WHERE id = ANY (:ids)"),
+                {"ids": self.vessel_ids},
+            )
+            # Whatever a failing run left behind.
+            conn.execute(
+                text("DELETE FROM shipment_status_counts WHERE vessel_id = ANY (:ids)"),
+                {"ids": self.vessel_ids},
+            )
+            conn.execute(
+                text("DELETE FROM shipment_audit WHERE shipment_id = ANY (:ids)"),
+                {"ids": self.shipment_ids},
+            )
+
+    def vessel(self, conn: Connection) -> int:
+        vessel_id = conn.execute(
+            text(
+                "INSERT INTO vessels (name, imo_number, max_capacity, vessel_type, "
+                "is_active) VALUES ('count race', 'IMO' || lpad("
+                "(floor(random() * 1e7))::text, 7, '0'), 10, 'other', true) "
+                "RETURNING id"
+            )
+        ).scalar_one()
+        self.vessel_ids.append(vessel_id)
+        return vessel_id
+
+    def insert_shipment(self, conn: Connection) -> int:
+        shipment_id = conn.execute(
+            text(
+                "INSERT INTO shipments (booking_id, status) VALUES (:id, 'PENDING') "
+                "RETURNING id"
+            ),
+            {"id": self.booking},
+        ).scalar_one()
+        self.shipment_ids.append(shipment_id)
+        return shipment_id
+
+    def counts(self) -> Dict[Tuple[int, str], int]:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT vessel_id, status, shipment_count "
+                    "FROM shipment_status_counts WHERE vessel_id = ANY (:ids)"
+                ),
+                {"ids": self.vessel_ids},
+            )
+            return {(v, s): n for v, s, n in rows}
+
+    def race(self, write: Callable[[Connection], None], change_booking: str) -> None:
+        """Run ``change_booking`` while ``write`` holds its transaction open."""
+        errors: List[BaseException] = []
+        started = threading.Event()
+        pid: List[int] = []
+
+        def booking_change() -> None:
+            try:
+                with engine.begin() as conn:
+                    pid.append(conn.execute(text("SELECT pg_backend_pid()")).scalar())
+                    started.set()
+                    conn.execute(text(change_booking), {"id": self.booking})
+            except BaseException as e:  # surfaced in the test thread
+                errors.append(e)
+                started.set()
+
+        with engine.connect() as writer:
+            with writer.begin():
+                write(writer)
+                thread = threading.Thread(target=booking_change)
+                thread.start()
+                started.wait(5)
+                # Let the booking change run into the writer's locks, if it
+                # takes any, before the writer commits.
+                deadline = time.monotonic() + 2
+                while time.monotonic() < deadline and thread.is_alive():
+                    waiting = writer.execute(
+                        text(
+                            "SELECT wait_event_type = 'Lock' FROM pg_stat_activity "
+                            "WHERE pid = :pid"
+                        ),
+                        {"pid": pid[0]} if pid else {"pid": 0},
+                    ).scalar()
+                    if waiting:
+                        break
+                    time.sleep(0.02)
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        if errors:
+            raise errors[0]
+
+    def test_booking_delete_during_a_status_change(self):
+        with engine.begin() as conn:
+            shipment_id = self.insert_shipment(conn)
+
+        def confirm(conn: Connection) -> None:
+            conn.execute(
+                text("UPDATE shipments SET status = 'CONFIRMED' WHERE id = :id"),
+                {"id": shipment_id},
+            )
+
+        self.race(confirm, "DELETE FROM bookings WHERE id = :id")
+        self.assertEqual(self.counts(), {})
+
+    def test_booking_move_during_a_status_change(self):
+        with engine.begin() as conn:
+            shipment_id = self.insert_shipment(conn)
+
+        def confirm(conn: Connection) -> None:
+            conn.execute(
+                text("UPDATE shipments SET status = 'CONFIRMED' WHERE id = :id"),
+                {"id": shipment_id},
+            )
+
+        self.race(
+            confirm,
+            f"UPDATE bookings SET vessel_id = {self.new_vessel} WHERE id = :id",
+        )
+        self.assertEqual(self.counts(), {(self.new_vessel, "CONFIRMED"): 1})
+
+    def test_booking_move_during_a_shipment_insert(self):
+        self.race(
+            self.insert_shipment,
+            f"UPDATE bookings SET vessel_id = {self.new_vessel} WHERE id = :id",
+        )
+        self.assertEqual(self.counts(), {(self.new_vessel, "PENDING"): 1})
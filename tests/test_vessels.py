@@ -0,0 +1,78 @@
+import random
+
+from tests.support import ApiTestCase, at
+
+
+class VesselUpdateTests(ApiTestCase):
+    async def test_worst_case_update_stays_within_its_query_budget(self):
+        vessel_id = await self.create_vessel(max_capacity=10)
+        # A booking in the future makes the capacity reduction read the peak.
+        await self.book(vessel_id, at(0), at(1), reserved_capacity=4)
+
+        for method in ("PUT", "PATCH"):
+            response = await self.client.request(
+                method,
+                f"/api/vessels/{vessel_id}",
+                json={
+                    "imo_number": f"IMO{random.randrange(10**7):07d}",
+                    "max_capacity": 8 if method == "PUT" else 6,
+                },
+            )
+            self.assertEqual(response.status_code, 200, response.text)
+            self.assertEqual(response.headers["X-DB-Queries"], "6")
+
+    async def test_capacity_cannot_drop_below_booked_peak(self):
+        vessel_id = await self.create_vessel(max_capacity=10)
+        await self.book(vessel_id, at(0), at(1), reserved_capacity=4)
+
+        response = await self.client.patch(
+            f"/api/vessels/{vessel_id}", json={"max_capacity": 3}
+        )
+        self.assertEqual(response.status_code, 400, response.text)
+        response = await self.client.patch(
+            f"/api/vessels/{vessel_id}", json={"max_capacity": 4}
+        )
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertNotIn("current_reserved_capacity", response.json()["data"])
+
+
+class AvailabilityTests(ApiTestCase):
+    async def available(self, **params):
+        """Ids and free capacity of this test's vessels that are available."""
+        params = {"start": at(0, 2), "end": at(0, 3), "limit": 500, **params}
+        response = await self.client.get("/api/vessels/available", params=params)
+        self.assertEqual(response.status_code, 200, response.text)
+        return [
+            (row["id"], row["free_capacity"])
+            for row in response.json()["data"]
+            if row["id"] in self.vessel_ids
+        ]
+
+    async def test_window_capacity_and_port_filters(self):
+        small = await self.create_vessel(max_capacity=10)
+        large = await self.create_vessel(max_capacity=20)
+        busy = await self.create_vessel(max_capacity=30)
+        inactive = await self.create_vessel(max_capacity=40)
+        # Same day, outside the window: only lowers the free capacity.
+        await self.book(large, at(0), at(0, 1), reserved_capacity=15)
+        # Overlaps the window.
+        await self.book(busy, at(0, 2), at(0, 4))
+        await self.client.patch(f"/api/vessels/{inactive}", json={"is_active": False})
+
+        self.assertEqual(await self.available(), [(small, 10), (large, 5)])
+        self.assertEqual(await self.available(min_capacity=6), [(small, 10)])
+        # The next day's window sees the busy vessel's overlap end.
+        self.assertEqual(
+            await self.available(start=at(1), end=at(1, 1)),
+            [(busy, 30), (large, 20), (small, 10)],
+        )
+
+        await self.create_route("Singapore", "Dubai", vessel_id=large)
+        self.assertEqual(await self.available(port="Dubai"), [(large, 5)])
+        self.assertEqual(await self.available(port="Busan"), [])
+
+    async def test_empty_window_is_rejected(self):
+        response = await self.client.get(
+            "/api/vessels/available", params={"start": at(1), "end": at(1)}
+        )
+        self.assertEqual(response.status_code, 422)
@@ -0,0 +1,41 @@
+from unittest import mock
+
+from app.core.database.init import async_engine
+from app.core.metrics import http_metrics
+from app.core.warmup import LISTS, hot_paths, warm_up, warmup_state
+from app.main import app
+from tests.support import ApiTestCase, at
+
+
+def requests_handled() -> float:
+    """Total of ``http_requests_total`` over all its series."""
+    return sum(
+        float(line.rsplit(" ", 1)[1])
+        for line in http_metrics.requests.render()
+        if not line.startswith("#")
+    )
+
+
+class WarmupTests(ApiTestCase):
+    async def test_warm_up_reports_ready_without_counting_its_requests(self):
+        vessel_id = await self.create_vessel()
+        await self.book(vessel_id, at(0), at(1))
+
+        with mock.patch.multiple(
+            warmup_state, done=False, seconds=None, requests=0, errors=0
+        ):
+            response = await self.client.get("/health/ready")
+            self.assertEqual(response.status_code, 503)
+
+            handled = requests_handled()
+            await warm_up(app, async_engine, connections=2)
+            self.assertEqual(requests_handled(), handled)
+
+            response = await self.client.get("/health/ready")
+            self.assertEqual(response.status_code, 200, response.text)
+            data = response.json()["data"]
+            self.assertEqual(data["warmup_errors"], 0)
+            self.assertEqual(
+                data["warmup_requests"],
+                len(LISTS) + 2 * len(hot_paths({}.fromkeys(LISTS, 1))),
+            )